@@ -0,0 +1,213 @@
+"""Headless interaction benchmark for MyCustomPlot.
+
+Opens synthetic text data files of increasing size through the normal
+loading path (background parsing, or the memmap cache for large files),
+replays scripted zoom, pan and cursor-move sequences and prints a JSON
+report with load time, peak memory and replot latency percentiles.
+
+    python benchmark.py --sizes 1e5 1e6 1e7 1e8 --output report.json
+
+Every size runs in its own process so peak memory is not inherited from
+the previous one. Data files are written once to --data-dir and reused.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+
+PERCENTILES = [50, 90, 99]
+WRITE_CHUNK = 1 << 20  # samples formatted per write
+LOAD_TIMEOUT = 3600.0  # seconds
+
+
+def data_file(data_dir, samples, seed=0):
+    """Path of a synthetic BLM-like text file, written on first use"""
+    path = os.path.join(data_dir, f"bench_{samples}_{seed}.txt")
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(data_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    tmp = path + ".part"
+    with open(tmp, "w") as f:
+        for a in range(0, samples, WRITE_CHUNK):
+            i = np.arange(a, min(samples, a + WRITE_CHUNK))
+            # slow ripple, noise and rare loss spikes
+            y = 3.0 * np.sin(2 * np.pi * i / 200_000) + rng.normal(0.0, 1.0, len(i))
+            y[rng.random(len(i)) < 1e-5] += 50.0
+            f.write("\n".join(np.char.mod("%.4f", y)))
+            f.write("\n")
+    os.replace(tmp, path)
+    return path
+
+
+def latency_stats(times):
+    """Summary of frame latencies in milliseconds"""
+    ms = np.asarray(times) * 1000.0
+    stats = {f"p{p}": float(np.percentile(ms, p)) for p in PERCENTILES}
+    stats.update(frames=len(ms), mean=float(ms.mean()), max=float(ms.max()))
+    return stats
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_size(path, frames, density, width, height):
+    """Benchmark one data file in this process, returns a result dict"""
+    from PyQt5.QtCore import QEvent, QPointF, Qt
+    from PyQt5.QtGui import QMouseEvent
+    from PyQt5.QtWidgets import QApplication
+
+    from memmap_cache import cache_dir_for
+    from mycustomplot import MyCustomPlot
+
+    app = QApplication.instance() or QApplication([])
+    window = MyCustomPlot()
+    window.resize(width, height)
+    window.density_check.setChecked(density)
+    window.show()
+    app.processEvents()
+    baseline_mb = peak_rss_mb()
+
+    def load():
+        """Open the file through the same path as the file dialog"""
+        start = time.perf_counter()
+        window.open_file(path)
+        while window.loader is not None:
+            if time.perf_counter() - start > LOAD_TIMEOUT:
+                raise TimeoutError(f"Loading {path} took too long")
+            app.processEvents()
+            time.sleep(0.001)
+        app.processEvents()
+        if not window.data_loaded:
+            raise ValueError(window.file_label.text())
+        return time.perf_counter() - start
+
+    # Cold load: parse, or build the memmap cache of a large file
+    shutil.rmtree(cache_dir_for(path), ignore_errors=True)
+    load_s = load()
+
+    plot = window.plot
+    samples = len(window.y_data)
+
+    def frame(action):
+        """Time an interaction up to the end of the frame it queues"""
+        t = time.perf_counter()
+        action()
+        window.request_replot()
+        app.processEvents()  # runs the queued frame
+        return time.perf_counter() - t
+
+    # Zoom in from the full view down to ~1000 samples and back out
+    window.reset_view()
+    app.processEvents()
+    factor = (1000.0 / samples) ** (1.0 / max(1, frames // 2)) if samples > 1000 else 1.0
+    zoom = []
+    for i in range(frames):
+        f = factor if i < frames // 2 else 1.0 / factor
+        zoom.append(frame(lambda: plot.xAxis.scaleRange(f, plot.xAxis.range().center())))
+
+    # Pan across a view of 1% of the data, 5% of the view per step
+    window.reset_view()
+    app.processEvents()
+    view = max(10.0, samples / 100)
+    plot.xAxis.setRange(0, view)
+    pan = []
+    for _ in range(frames):
+        pan.append(frame(lambda: plot.xAxis.moveRange(view / 20)))
+
+    # Cursor sweeps over the full view, only the cursor layer is redrawn
+    window.reset_view()
+    app.processEvents()
+    rect = plot.axisRect().rect()
+    cursor = []
+    for i in range(frames):
+        x = rect.left() + (i * 37) % max(1, rect.width())
+        event = QMouseEvent(
+            QEvent.MouseMove, QPointF(x, rect.center().y()), Qt.NoButton, Qt.NoButton, Qt.NoModifier
+        )
+        t = time.perf_counter()
+        QApplication.sendEvent(plot, event)
+        app.processEvents()
+        cursor.append(time.perf_counter() - t)
+
+    # Warm load: a cached file is only mapped again
+    reopen_s = load()
+    window.close()
+    return {
+        "samples": samples,
+        "file_mb": os.path.getsize(path) / (1024 * 1024),
+        "load_s": load_s,
+        "reopen_s": reopen_s,
+        "baseline_rss_mb": baseline_mb,
+        "peak_rss_mb": peak_rss_mb(),
+        "zoom_ms": latency_stats(zoom),
+        "pan_ms": latency_stats(pan),
+        "cursor_ms": latency_stats(cursor),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1e5, 1e6, 1e7, 1e8])
+    parser.add_argument("--frames", type=int, default=100, help="frames per sequence")
+    parser.add_argument("--density", action="store_true", help="density heatmap mode")
+    parser.add_argument("--size", type=int, nargs=2, default=[1200, 800], metavar=("W", "H"))
+    parser.add_argument(
+        "--data-dir", default=os.path.join(tempfile.gettempdir(), "mycustomplot_bench")
+    )
+    parser.add_argument("--output", help="JSON report file, default stdout")
+    parser.add_argument("--child", help=argparse.SUPPRESS)  # internal: one data file
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_size(args.child, args.frames, args.density, *args.size)
+        json.dump(result, sys.stdout)
+        return
+
+    results = []
+    for size in args.sizes:
+        path = data_file(args.data_dir, int(size))
+        cmd = [sys.executable, os.path.abspath(__file__), "--child", path]
+        cmd += ["--frames", str(args.frames), "--size", *map(str, args.size)]
+        if args.density:
+            cmd.append("--density")
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            error = (proc.stderr.strip().splitlines() or ["failed"])[-1]
+            results.append({"samples": int(size), "error": error})
+        else:
+            results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        print(f"{int(size)} samples done", file=sys.stderr)
+
+    report = {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "qpa": os.environ["QT_QPA_PLATFORM"],
+        "density": args.density,
+        "frames": args.frames,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
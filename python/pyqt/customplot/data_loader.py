@@ -0,0 +1,79 @@
+import os
+import re
+
+import numpy as np
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+COMMENT_PREFIX = b"==="
+COMMENT_LINE = re.compile(rb"^===.*$", re.MULTILINE)
+
+
+def parse_numeric_block(block):
+    """Parse a block of complete text lines into a float64 array.
+
+    Lines starting with '===' are comments, blank lines are skipped and every
+    other whitespace separated token must be a number.
+    """
+    if COMMENT_PREFIX in block:
+        block = COMMENT_LINE.sub(b"", block)
+    # C-level tokenizing and conversion, no Python float() per line
+    return np.array(block.split(), dtype=np.float64)
+
+
+def iter_numeric_blocks(f, block_size, first_block_size=None):
+    """Yield (array, bytes_consumed) for each block of a binary text stream"""
+    remainder = b""
+    size = first_block_size or block_size
+    while True:
+        data = f.read(size)
+        size = block_size
+        if not data:
+            break
+        data = remainder + data
+
+        # Only parse complete lines, carry the partial last one over
+        cut = data.rfind(b"\n") + 1
+        if cut == 0:
+            remainder = data
+            continue
+        remainder = data[cut:]
+        yield parse_numeric_block(data[:cut]), f.tell()
+
+    if remainder:
+        yield parse_numeric_block(remainder), f.tell()
+
+
+class DataFileLoader(QThread):
+    """Parse a text data file in a worker thread, emitting samples as they arrive"""
+
+    BLOCK_SIZE = 8 * 1024 * 1024
+    FIRST_BLOCK_SIZE = 256 * 1024  # small first block for a quick first view
+
+    chunk_loaded = pyqtSignal(object)  # np.ndarray of new samples
+    progress = pyqtSignal(int)  # percent of the file read
+
+    def __init__(self, filename, parent=None):
+        super().__init__(parent)
+        self.filename = filename
+        self.cancelled = False
+        self.error = None  # set when parsing fails, checked once finished
+
+    def cancel(self):
+        """Ask the worker to stop after the current block"""
+        self.cancelled = True
+
+    def run(self):
+        try:
+            total = max(1, os.path.getsize(self.filename))
+            with open(self.filename, "rb") as f:
+                for samples, position in iter_numeric_blocks(
+                    f, DataFileLoader.BLOCK_SIZE, DataFileLoader.FIRST_BLOCK_SIZE
+                ):
+                    if self.cancelled:
+                        return
+                    if len(samples):
+                        self.chunk_loaded.emit(samples)
+                    self.progress.emit(int(100 * position / total))
+        except Exception as e:
+            self.error = str(e)
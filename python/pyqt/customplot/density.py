@@ -0,0 +1,86 @@
+import numpy as np
+
+
+# Color stops (position, r, g, b) of the density colormap, low to high
+DENSITY_STOPS = [
+    (0.0, 68, 1, 84),
+    (0.25, 59, 82, 139),
+    (0.5, 33, 145, 140),
+    (0.75, 94, 201, 98),
+    (1.0, 253, 231, 37),
+]
+
+
+def make_lut(stops=DENSITY_STOPS, size=256):
+    """ARGB32 lookup table interpolated between color stops"""
+    pos = np.array([s[0] for s in stops])
+    t = np.linspace(0.0, 1.0, size)
+    channels = [np.interp(t, pos, [s[i] for s in stops]).astype(np.uint32) for i in (1, 2, 3)]
+    return (0xFF << 24) | (channels[0] << 16) | (channels[1] << 8) | channels[2]
+
+
+DENSITY_LUT = make_lut()
+
+
+def envelope_blocks(indices, values, stop):
+    """Split a pyramid query result into (starts, lows, highs, counts)
+
+    Raw samples are blocks of one sample; decimated data comes as
+    (min, max) pairs per block, the last block ending at stop.
+    """
+    if len(indices) < 2 or indices[-1] - indices[0] == len(indices) - 1:
+        return indices, values, values, np.ones(len(indices))
+    starts = indices[0::2]
+    return starts, values[0::2], values[1::2], np.diff(starts, append=stop)
+
+
+def density_histogram(keys, lows, highs, counts, x_range, y_range, columns, rows):
+    """Samples per (pixel column, value bucket) of a set of blocks.
+
+    keys are the x values of the block starts. Each block spreads its sample
+    count evenly over the buckets between its min and max, since only the
+    envelope is known below the raw level.
+    Returns a (rows, columns) float array, row 0 being the lowest bucket.
+    """
+    x_lo, x_hi = x_range
+    y_lo, y_hi = y_range
+    if len(keys) == 0 or x_hi <= x_lo or y_hi <= y_lo:
+        return np.zeros((rows, columns))
+
+    # Blocks without data (e.g. not summarized yet) are NaN
+    finite = np.isfinite(lows) & np.isfinite(highs)
+    if not finite.all():
+        keys, lows, highs = keys[finite], lows[finite], highs[finite]
+        counts = np.asarray(counts)[finite]
+
+    column = np.floor((keys - x_lo) * (columns / (x_hi - x_lo))).astype(np.int64)
+    scale = rows / (y_hi - y_lo)
+    b_lo = np.floor((lows - y_lo) * scale).astype(np.int64)
+    b_hi = np.floor((highs - y_lo) * scale).astype(np.int64)
+
+    visible = (column >= 0) & (column < columns) & (b_hi >= 0) & (b_lo < rows)
+    column, b_lo, b_hi = column[visible], b_lo[visible], b_hi[visible]
+    b_lo = np.clip(b_lo, 0, rows - 1)
+    b_hi = np.clip(b_hi, 0, rows - 1)
+
+    # Difference array along the value axis: +w at the lowest bucket of a
+    # block and -w past its highest one, then one cumulative sum
+    w = np.asarray(counts, dtype=np.float64)[visible] / (b_hi - b_lo + 1)
+    flat = np.bincount(column * (rows + 1) + b_lo, weights=w, minlength=columns * (rows + 1))
+    flat -= np.bincount(column * (rows + 1) + b_hi + 1, weights=w, minlength=columns * (rows + 1))
+    hist = np.cumsum(flat.reshape(columns, rows + 1), axis=1)
+    return hist[:, :rows].T
+
+
+def density_argb(hist, lut=DENSITY_LUT):
+    """Map a histogram to ARGB32 pixels, log scaled, top row = highest bucket
+
+    Empty cells are fully transparent so the grid stays visible.
+    """
+    peak = hist.max()
+    if peak <= 0:
+        return np.zeros(hist.shape, dtype=np.uint32)
+    level = np.log1p(np.maximum(hist, 0)) / np.log1p(peak)
+    pixels = lut[np.minimum((level * (len(lut) - 1)).astype(np.int64), len(lut) - 1)]
+    pixels[hist <= 1e-12] = 0
+    return np.ascontiguousarray(pixels[::-1])
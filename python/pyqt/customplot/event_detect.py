@@ -0,0 +1,276 @@
+import numpy as np
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, QThread, pyqtSignal
+
+EVENT_KINDS = ["crossing", "peak", "burst"]
+CROSSING, PEAK, BURST = range(len(EVENT_KINDS))
+
+
+def iter_array_blocks(y, block_size):
+    """Yield consecutive blocks of an array or memmap as float64"""
+    for a in range(0, len(y), block_size):
+        yield np.asarray(y[a : a + block_size], dtype=np.float64)
+
+
+def _runs(mask):
+    """(starts, stops) of the runs of True in a boolean array"""
+    edges = np.diff(mask.astype(np.int8), prepend=0, append=0)
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+class _BlockDetector:
+    """Base for detectors fed block by block.
+
+    ``_detect`` sees the unfinished tail of the previous blocks plus the new
+    block and returns its events together with the position up to which they
+    are final; everything after it is carried over to the next block, so
+    events spanning block boundaries are found exactly once.
+    """
+
+    MAX_CARRY = 16 * 1024 * 1024  # samples, forces a result on endless runs
+
+    def __init__(self):
+        self.carry = np.empty(0)
+        self.offset = 0  # global index of carry[0]
+        self.prev = None  # sample before carry[0]
+
+    def feed(self, block, final=False):
+        data = np.concatenate((self.carry, block)) if len(self.carry) else block
+        if len(data) == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, np.empty(0), empty
+        final = final or len(data) > _BlockDetector.MAX_CARRY
+        index, value, length, safe = self._detect(data, final)
+
+        if safe > 0:
+            self.prev = data[safe - 1]
+        self.carry = data[safe:]
+        result = (index + self.offset, value, length)
+        self.offset += safe
+        return result
+
+    def _detect(self, data, final):
+        raise NotImplementedError
+
+
+class CrossingDetector(_BlockDetector):
+    """Upward crossings of a threshold"""
+
+    kind = CROSSING
+
+    def __init__(self, threshold):
+        super().__init__()
+        self.threshold = threshold
+
+    def _detect(self, data, final):
+        above = data >= self.threshold
+        below_before = np.empty(len(data), dtype=bool)
+        below_before[1:] = ~above[:-1]
+        below_before[:1] = self.prev is not None and self.prev < self.threshold
+        index = np.flatnonzero(above & below_before)
+        return index, data[index], np.ones(len(index), dtype=np.int64), len(data)
+
+
+class PeakDetector(_BlockDetector):
+    """One peak per run of samples above baseline + height"""
+
+    kind = PEAK
+
+    def __init__(self, baseline, height):
+        super().__init__()
+        self.level = baseline + height
+
+    def _detect(self, data, final):
+        starts, stops = _runs(data > self.level)
+        safe = len(data)
+        if not final and len(stops) and stops[-1] == len(data):
+            # The last run may continue in the next block
+            safe = starts[-1]
+            starts, stops = starts[:-1], stops[:-1]
+        if len(starts) == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, np.empty(0), empty, safe
+
+        end = stops[-1]
+        peaks = np.maximum.reduceat(data[:end], starts)
+        # First sample of each run that reaches the run's peak
+        run_start = np.zeros(end, dtype=np.int8)
+        run_start[starts] = 1
+        run_of = np.cumsum(run_start) - 1
+        inside = data[:end] > self.level
+        hits = np.flatnonzero(inside & (data[:end] == peaks[run_of]))
+        _, first = np.unique(run_of[hits], return_index=True)
+        return hits[first], peaks, stops - starts, safe
+
+
+class BurstDetector(_BlockDetector):
+    """Groups of at least min_edges rising edges steeper than slope, at most
+    gap samples apart"""
+
+    kind = BURST
+
+    def __init__(self, slope, gap, min_edges):
+        super().__init__()
+        self.slope = slope
+        self.gap = gap
+        self.min_edges = min_edges
+
+    def _detect(self, data, final):
+        before = np.empty(len(data))
+        before[1:] = data[:-1]
+        before[:1] = data[0] if self.prev is None else self.prev
+        rise = data - before
+        edges = np.flatnonzero(rise > self.slope)
+
+        empty = np.empty(0, dtype=np.int64)
+        safe = len(data)
+        if len(edges) == 0:
+            return empty, np.empty(0), empty, safe
+
+        first = np.flatnonzero(np.diff(edges, prepend=-self.gap - 1) > self.gap)
+        last = np.append(first[1:], len(edges)) - 1
+        if not final and len(data) - 1 - edges[-1] <= self.gap:
+            # The last burst may continue in the next block
+            safe = edges[first[-1]]
+            first, last = first[:-1], last[:-1]
+
+        counts = last - first + 1
+        keep = counts >= self.min_edges
+        first, last = first[keep], last[keep]
+        if len(first) == 0:
+            return empty, np.empty(0), empty, safe
+        # value: total rise over the burst's edges
+        rises = np.concatenate(([0.0], np.cumsum(rise[edges])))
+        total_rise = rises[last + 1] - rises[first]
+        return edges[first], total_rise, edges[last] - edges[first] + 1, safe
+
+
+class EventIndex:
+    """Detected events sorted by sample index"""
+
+    def __init__(self, index, kind, value, length):
+        order = np.lexsort((kind, index))
+        self.index = index[order]
+        self.kind = kind[order]
+        self.value = value[order]
+        self.length = length[order]
+
+    def __len__(self):
+        return len(self.index)
+
+    def next_after(self, sample):
+        """Position of the first event after sample, or None"""
+        pos = int(np.searchsorted(self.index, sample, side="right"))
+        return pos if pos < len(self.index) else None
+
+    def prev_before(self, sample):
+        """Position of the last event before sample, or None"""
+        pos = int(np.searchsorted(self.index, sample, side="left")) - 1
+        return pos if pos >= 0 else None
+
+    def counts(self):
+        """Number of events per kind"""
+        return {name: int(np.sum(self.kind == k)) for k, name in enumerate(EVENT_KINDS)}
+
+
+def detect_events(blocks, detectors, total=None, progress=None, cancelled=None):
+    """Run detectors over an iterator of blocks, returning an EventIndex"""
+    results = {id(d): [] for d in detectors}
+    done = 0
+    for block in blocks:
+        if cancelled and cancelled():
+            return None
+        for detector in detectors:
+            results[id(detector)].append(detector.feed(block))
+        done += len(block)
+        if progress and total:
+            progress(min(100, int(100 * done / total)))
+
+    index, kind, value, length = [], [], [], []
+    for detector in detectors:
+        parts = results[id(detector)] + [detector.feed(np.empty(0), final=True)]
+        for i, v, n in parts:
+            index.append(i)
+            value.append(v)
+            length.append(n)
+            kind.append(np.full(len(i), detector.kind, dtype=np.int8))
+    return EventIndex(
+        np.concatenate(index).astype(np.int64),
+        np.concatenate(kind),
+        np.concatenate(value).astype(np.float64),
+        np.concatenate(length).astype(np.int64),
+    )
+
+
+class EventDetector(QThread):
+    """Detect loss events over a full capture in a worker thread"""
+
+    BLOCK_SIZE = 4 * 1024 * 1024  # samples per block for in-memory data
+
+    progress = pyqtSignal(int)  # percent of samples processed
+
+    def __init__(self, blocks, total, detectors, parent=None):
+        super().__init__(parent)
+        self.blocks = blocks  # callable returning an iterator of sample blocks
+        self.total = total
+        self.detectors = detectors
+        self.cancelled = False
+        self.error = None  # set when detection fails, checked once finished
+        self.events = None
+
+    def cancel(self):
+        """Ask the worker to stop after the current block"""
+        self.cancelled = True
+
+    def run(self):
+        try:
+            self.events = detect_events(
+                self.blocks(),
+                self.detectors,
+                self.total,
+                progress=self.progress.emit,
+                cancelled=lambda: self.cancelled,
+            )
+        except Exception as e:
+            self.error = str(e)
+
+
+class EventTableModel(QAbstractTableModel):
+    """Table of an EventIndex, rows are formatted only when shown"""
+
+    COLUMNS = ["X", "Kind", "Value", "Samples"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.events = None
+        self.x_values = None  # x of each event, fixed at detection time
+
+    def set_events(self, events, x_values):
+        self.beginResetModel()
+        self.events = events
+        self.x_values = x_values
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if self.events is None or parent.isValid() else len(self.events)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(EventTableModel.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return EventTableModel.COLUMNS[section]
+        return str(section + 1)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        if column == 0:
+            return f"{self.x_values[row]:.6g}"
+        if column == 1:
+            return EVENT_KINDS[self.events.kind[row]]
+        if column == 2:
+            return f"{self.events.value[row]:.4g}"
+        return str(self.events.length[row])
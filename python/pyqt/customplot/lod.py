@@ -0,0 +1,191 @@
+import numpy as np
+
+
+class MinMaxPyramid:
+    """Min/max decimation pyramid over a 1D sample array.
+
+    Level 0 is the raw data, level k > 0 stores the min and max of consecutive
+    blocks of ``base_block * factor ** (k - 1)`` samples. Drawing the min and max
+    of each block keeps every peak visible at any zoom level.
+
+    The pyramid can be built from a complete array (used in place) or grown
+    with ``append`` while data is still arriving; appending only recomputes the
+    last block of every level.
+    """
+
+    def __init__(self, y=None, base_block=16, factor=4):
+        self.y = np.empty(0) if y is None else y
+        self.base_block = base_block
+        self.factor = factor
+        self.block_sizes = [1]
+        self.mins = [self.y]
+        self.maxs = [self.y]
+
+        # Growable storage, only allocated once append() is used
+        self._buffer = None
+        self._level_buffers = []
+
+        self._update_levels(0)
+
+    def __len__(self):
+        return len(self.y)
+
+    @staticmethod
+    def _reduce(mins, maxs, k):
+        """Reduce min/max arrays by blocks of k, keeping a partial tail block"""
+        n_full = (len(mins) // k) * k
+        new_min = mins[:n_full].reshape(-1, k).min(axis=1)
+        new_max = maxs[:n_full].reshape(-1, k).max(axis=1)
+        if n_full < len(mins):
+            new_min = np.append(new_min, mins[n_full:].min())
+            new_max = np.append(new_max, maxs[n_full:].max())
+        return new_min, new_max
+
+    @staticmethod
+    def _grow(buffer, length, keep):
+        """Return a buffer holding at least length items, keeping the first keep"""
+        if length <= len(buffer):
+            return buffer
+        grown = np.empty(max(length, 2 * len(buffer)), dtype=buffer.dtype)
+        grown[:keep] = buffer[:keep]
+        return grown
+
+    def append(self, samples):
+        """Append samples and update the affected blocks of every level"""
+        samples = np.asarray(samples)
+        if len(samples) == 0:
+            return
+
+        old_n = len(self.y)
+        new_n = old_n + len(samples)
+        if self._buffer is None:
+            # First append: take over the current data into an owned buffer
+            self._buffer = np.empty(
+                max(new_n, 2 * old_n), dtype=np.result_type(self.y, samples)
+            )
+            self._buffer[:old_n] = self.y
+        else:
+            self._buffer = self._grow(self._buffer, new_n, old_n)
+        self._buffer[old_n:new_n] = samples
+
+        self.y = self._buffer[:new_n]
+        self.mins[0] = self.maxs[0] = self.y
+        self._update_levels(old_n)
+
+    def _update_levels(self, dirty):
+        """Recompute all blocks that contain raw samples from index dirty on"""
+        level = 1
+        k = self.base_block
+        block_size = self.base_block
+        while len(self.mins[level - 1]) > 1:
+            src_min, src_max = self.mins[level - 1], self.maxs[level - 1]
+            first = dirty // k
+            new_min, new_max = self._reduce(src_min[first * k :], src_max[first * k :], k)
+            count = first + len(new_min)
+
+            if level == len(self.block_sizes):
+                self.block_sizes.append(block_size)
+                self.mins.append(None)
+                self.maxs.append(None)
+                self._level_buffers.append((None, None))
+
+            if self._buffer is None and first == 0:
+                # Complete static build, no spare capacity needed
+                self.mins[level], self.maxs[level] = new_min, new_max
+            else:
+                min_buf, max_buf = self._level_buffers[level - 1]
+                if min_buf is None:
+                    # Take over levels built statically before the first append
+                    min_buf, max_buf = self.mins[level], self.maxs[level]
+                if min_buf is None:
+                    # Level created by this append
+                    min_buf = np.empty(count, dtype=new_min.dtype)
+                    max_buf = np.empty(count, dtype=new_max.dtype)
+                min_buf = self._grow(min_buf, count, first)
+                max_buf = self._grow(max_buf, count, first)
+                min_buf[first:count] = new_min
+                max_buf[first:count] = new_max
+                self._level_buffers[level - 1] = (min_buf, max_buf)
+                self.mins[level], self.maxs[level] = min_buf[:count], max_buf[:count]
+
+            dirty = first
+            level += 1
+            block_size *= self.factor
+            k = self.factor
+
+    def _read(self, level, b0, b1):
+        """Return (mins, maxs) of blocks [b0, b1) at the given level"""
+        return self.mins[level][b0:b1], self.maxs[level][b0:b1]
+
+    def range_min_max(self, start, stop):
+        """Exact (min, max) of samples [start, stop) in O(log n)
+
+        Whole blocks are taken from the coarsest level that fits, only the
+        partial blocks at both ends are read from finer levels.
+        """
+        start = max(0, int(start))
+        stop = min(len(self.y), int(stop))
+        if stop <= start:
+            raise ValueError("Empty sample range")
+
+        lo_parts, hi_parts = [], []
+        level, a, b = 0, start, stop
+        while True:
+            k = self.base_block if level == 0 else self.factor
+            if level + 1 == len(self.block_sizes) or b - a < 2 * k:
+                mins, maxs = self._read(level, a, b)
+                lo_parts.append(np.min(mins))
+                hi_parts.append(np.max(maxs))
+                break
+
+            # Partial blocks at this level, whole blocks one level up
+            a_up, b_up = -(-a // k), b // k
+            for b0, b1 in ((a, a_up * k), (b_up * k, b)):
+                if b1 > b0:
+                    mins, maxs = self._read(level, b0, b1)
+                    lo_parts.append(np.min(mins))
+                    hi_parts.append(np.max(maxs))
+            level, a, b = level + 1, a_up, b_up
+        return min(lo_parts), max(hi_parts)
+
+    def select_level(self, start, stop, max_points):
+        """Finest level whose blocks over [start, stop) fit into max_points"""
+        span = max(1, stop - start)
+        if span <= max_points:
+            return 0
+        max_blocks = max(1, max_points // 2)
+        for level in range(1, len(self.block_sizes)):
+            if span // self.block_sizes[level] + 2 <= max_blocks:
+                return level
+        return len(self.block_sizes) - 1
+
+    def query(self, start, stop, max_points):
+        """Decimate samples [start, stop) to at most ~max_points points
+
+        Returns (indices, values) sorted by index. At fine zoom the raw samples
+        are returned, otherwise each block contributes its min and max.
+        """
+        n = len(self.y)
+        start = max(0, int(start))
+        stop = min(n, int(stop))
+        if stop <= start:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        level = self.select_level(start, stop, max_points)
+        if level == 0:
+            return np.arange(start, stop), np.asarray(self._read(0, start, stop)[0])
+
+        block_size = self.block_sizes[level]
+        b0 = start // block_size
+        b1 = -(-stop // block_size)
+        mins, maxs = self._read(level, b0, b1)
+
+        # min at block start, max at block middle
+        block_starts = np.arange(b0, b1, dtype=np.int64) * block_size
+        indices = np.empty(2 * len(mins), dtype=np.int64)
+        indices[0::2] = block_starts
+        indices[1::2] = np.minimum(block_starts + block_size // 2, n - 1)
+        values = np.empty(2 * len(mins), dtype=np.result_type(mins, np.float64))
+        values[0::2] = mins
+        values[1::2] = maxs
+        return indices, values
@@ -0,0 +1,329 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from data_loader import iter_numeric_blocks
+from lod import MinMaxPyramid
+from window_stats import PrefixSums
+
+
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "mycustomplot_cache")
+CACHE_VERSION = 2
+DATA_FILE = "data.npy"
+SUMS_FILE = "prefix_sums.npy"
+SQUARES_FILE = "prefix_squares.npy"
+META_FILE = "meta.json"
+
+
+def cache_dir_for(filename):
+    """Cache directory of a source file, keyed by its absolute path"""
+    key = hashlib.sha1(os.path.abspath(filename).encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, key)
+
+
+def _source_stamp(filename):
+    """Size and mtime identify an unchanged source file"""
+    st = os.stat(filename)
+    return {
+        "source": os.path.abspath(filename),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "version": CACHE_VERSION,
+    }
+
+
+def _level_file(level, kind):
+    return f"level{level}_{kind}.npy"
+
+
+class TileCache:
+    """LRU cache of tiles copied out of memory-mapped arrays, bounded in bytes
+
+    Safe to share between threads: lookups, loads and evictions run under
+    a lock, so a worker thread and the GUI thread may read the same cache.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.tiles = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _tile_bytes(tile):
+        mins, maxs = tile
+        return mins.nbytes if mins is maxs else mins.nbytes + maxs.nbytes
+
+    def get(self, key, load):
+        """Return the tile for key, calling load() on a miss"""
+        with self.lock:
+            tile = self.tiles.get(key)
+            if tile is not None:
+                self.tiles.move_to_end(key)
+                self.hits += 1
+                return tile
+
+            self.misses += 1
+            tile = load()
+            self.tiles[key] = tile
+            self.nbytes += self._tile_bytes(tile)
+
+            # Evict least recently used tiles, always keeping the newest one
+            while self.nbytes > self.max_bytes and len(self.tiles) > 1:
+                _, evicted = self.tiles.popitem(last=False)
+                self.nbytes -= self._tile_bytes(evicted)
+            return tile
+
+    def clear(self):
+        with self.lock:
+            self.tiles.clear()
+            self.nbytes = 0
+
+
+class TiledPyramid(MinMaxPyramid):
+    """Read-only MinMaxPyramid over memory-mapped cache files.
+
+    Raw samples and every level stay on disk; reads go through a TileCache of
+    fixed-size tiles so memory use is bounded regardless of capture length.
+    """
+
+    TILE_SIZE = 64 * 1024  # elements per tile
+    CACHE_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, y, mins, maxs, block_sizes, base_block, factor, cache=None):
+        self.y = y
+        self.base_block = base_block
+        self.factor = factor
+        self.block_sizes = list(block_sizes)
+        self.mins = [y] + list(mins)
+        self.maxs = [y] + list(maxs)
+        self._buffer = None
+        self._level_buffers = []
+        self.cache = cache or TileCache(TiledPyramid.CACHE_BYTES)
+
+    def append(self, samples):
+        raise TypeError("Memory-mapped pyramids are read-only")
+
+    def _load_tile(self, level, tile_no):
+        """Copy one tile of a level from the memory maps into RAM"""
+        a = tile_no * TiledPyramid.TILE_SIZE
+        b = a + TiledPyramid.TILE_SIZE
+        mins = np.array(self.mins[level][a:b])
+        maxs = mins if level == 0 else np.array(self.maxs[level][a:b])
+        return mins, maxs
+
+    def _read(self, level, b0, b1):
+        """Return (mins, maxs) of blocks [b0, b1), assembled from cached tiles"""
+        b1 = min(b1, len(self.mins[level]))
+        if b1 <= b0:
+            empty = self.mins[level][0:0]
+            return empty, empty
+
+        tile = TiledPyramid.TILE_SIZE
+        parts_min, parts_max = [], []
+        for tile_no in range(b0 // tile, (b1 - 1) // tile + 1):
+            mins, maxs = self.cache.get(
+                (level, tile_no), lambda: self._load_tile(level, tile_no)
+            )
+            lo = max(b0 - tile_no * tile, 0)
+            hi = min(b1 - tile_no * tile, tile)
+            parts_min.append(mins[lo:hi])
+            parts_max.append(maxs[lo:hi])
+
+        if len(parts_min) == 1:
+            return parts_min[0], parts_max[0]
+        return np.concatenate(parts_min), np.concatenate(parts_max)
+
+
+def open_cache(filename):
+    """Open the memmap cache of a file as (TiledPyramid, PrefixSums)
+
+    Returns None if the cache is missing or stale.
+    """
+    cache_dir = cache_dir_for(filename)
+    try:
+        with open(os.path.join(cache_dir, META_FILE)) as f:
+            meta = json.load(f)
+        stamp = _source_stamp(filename)
+    except (OSError, ValueError):
+        return None
+    if any(meta.get(key) != value for key, value in stamp.items()):
+        return None
+
+    y = np.load(os.path.join(cache_dir, DATA_FILE), mmap_mode="r")
+    levels = range(1, len(meta["block_sizes"]))
+    mins = [np.load(os.path.join(cache_dir, _level_file(i, "min")), mmap_mode="r") for i in levels]
+    maxs = [np.load(os.path.join(cache_dir, _level_file(i, "max")), mmap_mode="r") for i in levels]
+    pyramid = TiledPyramid(
+        y, mins, maxs, meta["block_sizes"], meta["base_block"], meta["factor"]
+    )
+    prefix = PrefixSums.from_arrays(
+        np.load(os.path.join(cache_dir, SUMS_FILE), mmap_mode="r"),
+        np.load(os.path.join(cache_dir, SQUARES_FILE), mmap_mode="r"),
+    )
+    return pyramid, prefix
+
+
+def _write_text_as_npy(filename, path, progress=None, cancelled=None):
+    """Stream-parse a text data file into a float64 .npy file"""
+    total = max(1, os.path.getsize(filename))
+    header = {"descr": "<f8", "fortran_order": False, "shape": (0,)}
+    count = 0
+    with open(filename, "rb") as src, open(path, "wb") as dst:
+        # Placeholder header, the shape is only known at the end
+        np.lib.format.write_array_header_1_0(dst, header)
+        data_offset = dst.tell()
+
+        for samples, position in iter_numeric_blocks(src, 8 * 1024 * 1024):
+            if cancelled and cancelled():
+                return None
+            samples.astype("<f8", copy=False).tofile(dst)
+            count += len(samples)
+            if progress:
+                progress(position / total)
+
+        dst.seek(0)
+        header["shape"] = (count,)
+        np.lib.format.write_array_header_1_0(dst, header)
+        if dst.tell() != data_offset:
+            raise ValueError("Unexpected .npy header size")
+    return count
+
+
+def _write_levels(cache_dir, y, base_block, factor, progress=None, chunk=1 << 22):
+    """Build the pyramid levels chunk by chunk into .npy files"""
+    block_sizes = [1]
+    src_min = src_max = y
+    k = base_block
+    level = 1
+    while len(src_min) > 1:
+        count = -(-len(src_min) // k)
+        out_min = np.lib.format.open_memmap(
+            os.path.join(cache_dir, _level_file(level, "min")),
+            mode="w+",
+            dtype=src_min.dtype,
+            shape=(count,),
+        )
+        out_max = np.lib.format.open_memmap(
+            os.path.join(cache_dir, _level_file(level, "max")),
+            mode="w+",
+            dtype=src_max.dtype,
+            shape=(count,),
+        )
+
+        step = k * max(1, chunk // k)
+        for a in range(0, len(src_min), step):
+            mins, maxs = MinMaxPyramid._reduce(
+                src_min[a : a + step], src_max[a : a + step], k
+            )
+            out_min[a // k : a // k + len(mins)] = mins
+            out_max[a // k : a // k + len(maxs)] = maxs
+            if progress and level == 1:
+                progress(min(1.0, (a + step) / len(src_min)))
+
+        out_min.flush()
+        out_max.flush()
+        block_sizes.append(block_sizes[-1] * k)
+        src_min, src_max = out_min, out_max
+        level += 1
+        k = factor
+    return block_sizes
+
+
+def _write_prefix_sums(cache_dir, y, progress=None, chunk=1 << 22):
+    """Write the prefix sums of y and y**2 chunk by chunk"""
+    sums, squares = (
+        np.lib.format.open_memmap(
+            os.path.join(cache_dir, name),
+            mode="w+",
+            dtype=np.float64,
+            shape=(len(y) + 1,),
+        )
+        for name in (SUMS_FILE, SQUARES_FILE)
+    )
+    sums[0] = squares[0] = 0.0
+    for a in range(0, len(y), chunk):
+        block = np.asarray(y[a : a + chunk], dtype=np.float64)
+        b = a + len(block)
+        np.cumsum(block, out=sums[a + 1 : b + 1])
+        sums[a + 1 : b + 1] += sums[a]
+        np.cumsum(block * block, out=squares[a + 1 : b + 1])
+        squares[a + 1 : b + 1] += squares[a]
+        if progress:
+            progress(b / len(y))
+    sums.flush()
+    squares.flush()
+
+
+def build_cache(filename, base_block=16, factor=4, progress=None, cancelled=None):
+    """Convert a text data file to a .npy cache plus pyramid and prefix sum files
+
+    The metadata file is written last and marks the cache as complete.
+    Returns False if cancelled.
+    """
+    cache_dir = cache_dir_for(filename)
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.makedirs(cache_dir)
+
+    stamp = _source_stamp(filename)
+    data_path = os.path.join(cache_dir, DATA_FILE)
+    parse_progress = (lambda f: progress(0.8 * f)) if progress else None
+    count = _write_text_as_npy(filename, data_path, parse_progress, cancelled)
+    if count is None:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        return False
+    if count == 0:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        raise ValueError("no data in file")
+
+    y = np.load(data_path, mmap_mode="r")
+    level_progress = (lambda f: progress(0.8 + 0.1 * f)) if progress else None
+    block_sizes = _write_levels(cache_dir, y, base_block, factor, level_progress)
+    sums_progress = (lambda f: progress(0.9 + 0.1 * f)) if progress else None
+    _write_prefix_sums(cache_dir, y, sums_progress)
+
+    meta = dict(
+        stamp,
+        samples=count,
+        base_block=base_block,
+        factor=factor,
+        block_sizes=block_sizes,
+    )
+    with open(os.path.join(cache_dir, META_FILE), "w") as f:
+        json.dump(meta, f)
+    return True
+
+
+class CacheBuilder(QThread):
+    """Build the memmap cache of a data file in a worker thread"""
+
+    progress = pyqtSignal(int)  # percent done
+
+    def __init__(self, filename, parent=None):
+        super().__init__(parent)
+        self.filename = filename
+        self.cancelled = False
+        self.error = None  # set when conversion fails, checked once finished
+
+    def cancel(self):
+        """Ask the worker to stop after the current block"""
+        self.cancelled = True
+
+    def run(self):
+        try:
+            build_cache(
+                self.filename,
+                progress=lambda f: self.progress.emit(int(100 * f)),
+                cancelled=lambda: self.cancelled,
+            )
+        except Exception as e:
+            self.error = str(e)
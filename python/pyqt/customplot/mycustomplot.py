@@ -1,3 +1,8 @@
+import os
+import time
+import zipfile
+from collections import deque
+
 import numpy as np
 from PyQt5.QtWidgets import (
     QApplication,
@@ -7,9 +12,22 @@ from PyQt5.QtWidgets import (
     QPushButton,
     QFileDialog,
     QLabel,
+    QProgressBar,
+    QCheckBox,
+    QInputDialog,
+    QDialog,
+    QDialogButtonBox,
+    QDockWidget,
+    QDoubleSpinBox,
+    QFormLayout,
+    QSpinBox,
+    QTableView,
+    QAbstractItemView,
+    QComboBox,
+    QHBoxLayout,
 )
-from PyQt5.QtCore import Qt, QPointF, QMargins
-from PyQt5.QtGui import QFont, QPen, QColor, QBrush
+from PyQt5.QtCore import Qt, QPointF, QMargins, QTimer
+from PyQt5.QtGui import QFont, QPen, QColor, QBrush, QImage, QPixmap
 from QCustomPlot_PyQt5 import (
     QCustomPlot,
     QCP,
@@ -17,25 +35,107 @@ from QCustomPlot_PyQt5 import (
     QCPItemText,
     QCPItemEllipse,
     QCPItemPosition,
+    QCPItemPixmap,
+    QCPLayer,
+    QCPAxis,
+    QCPAxisRect,
+    QCPMarginGroup,
+    QCPAxisTickerLog,
+)
+
+from data_loader import DataFileLoader
+from density import density_argb, density_histogram, envelope_blocks
+from event_detect import (
+    BurstDetector,
+    CrossingDetector,
+    EventDetector,
+    EventTableModel,
+    PeakDetector,
+    iter_array_blocks,
 )
+from lod import MinMaxPyramid
+from memmap_cache import CacheBuilder, open_cache
+from sample_axis import UniformAxis
+from spectrum import METHODS, WINDOWS, WELCH, SampleRange, SpectrumCache, SpectrumWorker
+from sr_session import SessionIndexer, SrSession
+from stream_source import RingBuffer, StreamReader
+from window_stats import PrefixSums, window_stats
 
 
 class MyCustomPlot(QMainWindow):
     ZOOM_IN_FACTOR = 0.95
     ZOOM_OUT_FACTOR = 1.05
+    LOD_POINTS_PER_PIXEL = 2  # min + max per horizontal pixel
+    FRAME_BUDGET_MS = 16.0  # 60 fps
+    FRAME_HISTORY = 120
+    MAX_MARKERS = 50  # per kind, max and min
+    MARKER_GAP_PX = 24  # at most one marker per this many pixels
+    DENSITY_BUDGET = 1 << 20  # max blocks binned per density image
+    DENSITY_MAX_ROWS = 400  # value buckets
+    CHANNEL_COLORS = [
+        QColor(31, 119, 180),
+        QColor(255, 127, 14),
+        QColor(44, 160, 44),
+        QColor(214, 39, 40),
+        QColor(148, 103, 189),
+        QColor(140, 86, 75),
+        QColor(227, 119, 194),
+        QColor(127, 127, 127),
+    ]
+    OUT_OF_CORE_THRESHOLD = 256 * 1024 * 1024  # bytes of text
+    STREAM_CAPACITY = 2_000_000  # samples kept in live mode
+    STREAM_FPS = 30
+    SPECTRUM_DEBOUNCE_MS = 200  # quiet time after pan/zoom before recomputing
+    SPECTRUM_MAX_DELAY_MS = 1000  # recompute at least this often while moving
+    SPECTRUM_NFFT = [256, 1024, 4096, 16384, 65536]
 
     def __init__(self):
         super().__init__()
-        self.setup_ui()
         self.data_loaded = False
-        self.x_data = None
+        self.x_axis = None  # implicit UniformAxis, every source is evenly sampled
         self.y_data = None
+        self.pyramid = None
+        self.prefix = None  # PrefixSums for O(1) window statistics
+        self.lod_dirty = False
+
+        # Plotted channels as (name, pyramid), channel 0 is self.pyramid and
+        # the one cursor, markers and statistics refer to
+        self.channels = []
+        self.channel_rects = []  # extra axis rects when channels are stacked
+        self.session = None  # open SrSession, if any
+
+        # Background file loading or cache building
+        self.loader = None
+        self.follow_loading = False  # keep showing everything loaded so far
+
+        # Live streaming into a ring buffer, drawn at a fixed frame rate
+        self.stream_reader = None
+        self.stream_total = 0
+
+        # Frame scheduling: input events only mark work, one queued frame renders it
+        self.full_replot_pending = False
+        self.pending_cursor_px = None
+        self.frame_start = None
+        self.frame_times = deque(maxlen=MyCustomPlot.FRAME_HISTORY)
+        self.setup_ui()
         self.current_index = None
         self.show_markers = False
-        self.max_indicators = []
-        self.max_points = []
+        self.max_indicators = []  # pooled, created on first use
         self.min_indicators = []
-        self.min_points = []
+
+        # Statistics cursors A and B, stored as x values
+        self.stats_cursor_x = {"A": None, "B": None}
+
+        # Detected events, their x values are fixed by the axis at detection time
+        self.event_detector = None
+        self.events = None
+        self.event_axis = None
+
+        # Spectrum of the visible range, computed in a worker thread
+        self.spectrum_worker = None
+        self.spectrum_cache = SpectrumCache()
+        self.spectrum_key = None  # key of the spectrum shown
+        self.spectrum_wait_start = None
 
     def setup_ui(self):
         self.setWindowTitle("My CustomPlot")
@@ -57,15 +157,48 @@ class MyCustomPlot(QMainWindow):
         self.file_label = QLabel("No file selected")
         self.select_btn = QPushButton("Select Data File")
         self.select_btn.clicked.connect(self.load_data_file)
+        self.stream_btn = QPushButton("Live Stream...")
+        self.stream_btn.clicked.connect(self.open_stream)
+        self.events_btn = QPushButton("Detect Events...")
+        self.events_btn.clicked.connect(self.open_event_detection)
 
         self.cursor_label = QLabel("Cursor: Not available")
+        self.frame_label = QLabel("Frame: -")
+        self.view_stats_label = QLabel("Visible: -")
+        self.cursor_stats_label = QLabel(
+            "Cursors A-B: press A / B to place at the cursor, C to clear"
+        )
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.hide()
+        self.out_of_core_check = QCheckBox("Out-of-core cache for large files")
+        self.out_of_core_check.setChecked(True)
+        self.stack_check = QCheckBox("Stack channels")
+        self.stack_check.setChecked(True)
+        self.stack_check.toggled.connect(self.on_stack_toggled)
+        self.density_check = QCheckBox("Density heatmap")
+        self.density_check.toggled.connect(self.on_density_toggled)
+        self.spectrum_check = QCheckBox("Spectrum panel")
+        self.spectrum_check.toggled.connect(self.on_spectrum_toggled)
         control_layout.addWidget(self.file_label)
+        control_layout.addWidget(self.progress_bar)
         control_layout.addWidget(self.select_btn)
+        control_layout.addWidget(self.stream_btn)
+        control_layout.addWidget(self.events_btn)
+        control_layout.addWidget(self.out_of_core_check)
+        control_layout.addWidget(self.stack_check)
+        control_layout.addWidget(self.density_check)
+        control_layout.addWidget(self.spectrum_check)
         control_layout.addWidget(self.cursor_label)
+        control_layout.addWidget(self.frame_label)
+        control_layout.addWidget(self.view_stats_label)
+        control_layout.addWidget(self.cursor_stats_label)
 
         # Plot area (90%)
         self.plot = QCustomPlot()
         self.plot.setInteractions(QCP.iRangeDrag | QCP.iRangeZoom)
+        # Antialiasing dense lines roughly doubles the cost of a drag frame
+        self.plot.setNoAntialiasingOnDrag(True)
 
         # Configure default interactions
         self.plot.axisRect().setRangeZoom(Qt.Horizontal)  # Default horizontal zoom
@@ -77,35 +210,105 @@ class MyCustomPlot(QMainWindow):
         self.plot.mousePress.connect(self.handle_mouse_press)
         self.plot.mouseRelease.connect(self.handle_mouse_release)
         self.plot.mouseMove.connect(self.handle_mouse_move)
+        self.plot.xAxis.rangeChanged.connect(self.mark_lod_dirty)
+        self.plot.yAxis.rangeChanged.connect(self.mark_density_dirty)
+        self.plot.beforeReplot.connect(self.on_before_replot)
+        self.plot.afterReplot.connect(self.on_after_replot)
+
+        # Single-shot 0 ms timer: all events queued before it fires share one frame
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setSingleShot(True)
+        self.frame_timer.setInterval(0)
+        self.frame_timer.timeout.connect(self.render_frame)
+
+        # Live mode redraws at a fixed rate, independent of the data rate
+        self.stream_timer = QTimer(self)
+        self.stream_timer.setInterval(1000 // MyCustomPlot.STREAM_FPS)
+        self.stream_timer.timeout.connect(self.on_stream_frame)
 
         # Initialize cursor lines
         self.init_cursor()
 
+        # Density image, replaces the line of channel 0 in density mode
+        self.density_item = QCPItemPixmap(self.plot)
+        self.density_item.setScaled(True, Qt.IgnoreAspectRatio)
+        self.density_item.setVisible(False)
+
         # Set stretch factors
         main_layout.addWidget(control_widget, stretch=0)
         main_layout.addWidget(self.plot, stretch=9)
 
+        # Event table, rows are only formatted when visible
+        self.event_model = EventTableModel(self)
+        self.event_table = QTableView()
+        self.event_table.setModel(self.event_model)
+        self.event_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.event_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.event_table.clicked.connect(lambda index: self.go_to_event(index.row()))
+        self.event_dock = QDockWidget("Events", self)
+        self.event_dock.setWidget(self.event_table)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.event_dock)
+        self.event_dock.hide()
+
+        self.setup_spectrum_ui()
+
+    def setup_spectrum_ui(self):
+        """Spectrum dock: settings row above a log-scaled plot"""
+        self.spectrum_method = QComboBox()
+        self.spectrum_method.addItems(METHODS)
+        self.spectrum_window = QComboBox()
+        self.spectrum_window.addItems(list(WINDOWS))
+        self.spectrum_nfft = QComboBox()
+        self.spectrum_nfft.addItems([str(n) for n in MyCustomPlot.SPECTRUM_NFFT])
+        self.spectrum_nfft.setCurrentText("4096")
+        self.spectrum_label = QLabel("")
+        for combo in (self.spectrum_method, self.spectrum_window, self.spectrum_nfft):
+            combo.setFocusPolicy(Qt.NoFocus)  # keys keep navigating the time plot
+            combo.currentIndexChanged.connect(self.update_spectrum)
+
+        settings = QHBoxLayout()
+        settings.addWidget(self.spectrum_method)
+        settings.addWidget(QLabel("Window:"))
+        settings.addWidget(self.spectrum_window)
+        settings.addWidget(QLabel("nfft:"))
+        settings.addWidget(self.spectrum_nfft)
+        settings.addWidget(self.spectrum_label, stretch=1)
+
+        self.spectrum_plot = QCustomPlot()
+        self.spectrum_plot.setMinimumHeight(200)
+        self.spectrum_plot.setInteractions(QCP.iRangeDrag | QCP.iRangeZoom)
+        self.spectrum_plot.yAxis.setScaleType(QCPAxis.stLogarithmic)
+        self.spectrum_plot.yAxis.setTicker(QCPAxisTickerLog())
+        self.spectrum_plot.addGraph()
+
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(settings)
+        layout.addWidget(self.spectrum_plot)
+        self.spectrum_dock = QDockWidget("Spectrum", self)
+        self.spectrum_dock.setWidget(widget)
+        self.addDockWidget(Qt.BottomDockWidgetArea, self.spectrum_dock)
+        self.spectrum_dock.hide()
+        self.spectrum_dock.visibilityChanged.connect(self.spectrum_check.setChecked)
+
+        # Restarted by every view change, so pan and zoom compute only once
+        # they pause, or every SPECTRUM_MAX_DELAY_MS during long drags
+        self.spectrum_timer = QTimer(self)
+        self.spectrum_timer.setSingleShot(True)
+        self.spectrum_timer.setInterval(MyCustomPlot.SPECTRUM_DEBOUNCE_MS)
+        self.spectrum_timer.timeout.connect(self.update_spectrum)
+
     def toggle_markers(self):
         """Toggle display of max and min value text markers"""
         self.show_markers = not self.show_markers
 
         self.clear_all_markers()
-
         if self.show_markers and self.data_loaded:
-            max_val = np.max(self.y_data)
-            min_val = np.min(self.y_data)
-            max_indices = np.where(self.y_data == max_val)[0]
-            min_indices = np.where(self.y_data == min_val)[0]
+            # Placed by update_lod against the decimated data of the view
+            self.mark_lod_dirty()
 
-            for idx in max_indices:
-                x, y = self.x_data[idx], self.y_data[idx]
-                self.create_text_marker(x, y, f"Max: {y:.2f}", QColor(255, 0, 0))
-
-            for idx in min_indices:
-                x, y = self.x_data[idx], self.y_data[idx]
-                self.create_text_marker(x, y, f"Min: {y:.2f}", QColor(0, 0, 255))
-
-        self.plot.replot()
+        self.request_replot()
 
     def get_dynamic_marker_size(self):
         """Calculate marker size based on current view scale"""
@@ -119,25 +322,13 @@ class MyCustomPlot(QMainWindow):
         return base_size * avg_range
 
     def clear_all_markers(self):
-        """Remove all existing text markers"""
-        all_markers = [*self.max_indicators, *self.min_indicators]
-
-        for marker in all_markers:
-            try:
-                self.plot.removeItem(marker)
-            except (RuntimeError, AttributeError):
-                continue
-
-        self.max_indicators.clear()
-        self.min_indicators.clear()
-
-    def create_text_marker(self, x, y, text, color):
-        """Create vertical text marker"""
-        marker_size = self.get_dynamic_marker_size()
-        text_offset = marker_size * 2.5
+        """Hide all text markers, the items are kept for reuse"""
+        for marker in [*self.max_indicators, *self.min_indicators]:
+            marker.setVisible(False)
 
+    def create_text_marker(self, color):
+        """Create a hidden vertical text marker"""
         indicator = QCPItemText(self.plot)
-        indicator.setText(text)
         indicator.position.setType(QCPItemPosition.ptPlotCoords)
 
         indicator.setRotation(-90)
@@ -151,26 +342,67 @@ class MyCustomPlot(QMainWindow):
         indicator.setPen(QPen(color))
         indicator.setBrush(QBrush(Qt.white))
         indicator.setPadding(QMargins(2, 1, 2, 1))
+        indicator.setVisible(False)
+        return indicator
 
-        x_pos = x
-        y_pos = y
+    def cluster_marker_indices(self, indices):
+        """Keep at most MAX_MARKERS indices, one per MARKER_GAP_PX wide bucket"""
+        if len(indices) == 0:
+            return indices
 
-        if "Max" in text:
-            # x_pos = x + text_offset
-            y_pos = y + text_offset
-        else:
-            # x_pos = x - text_offset
-            y_pos = y - text_offset
+        x_range = self.plot.xAxis.range()
+        width = self.plot.axisRect().width() or self.plot.width()
+        px = (self.x_axis.values(indices) - x_range.lower) * (width / x_range.size())
+        buckets = np.floor(px / MyCustomPlot.MARKER_GAP_PX)
+        _, first = np.unique(buckets, return_index=True)
+        indices = indices[first]
+
+        if len(indices) > MyCustomPlot.MAX_MARKERS:
+            keep = np.linspace(0, len(indices) - 1, MyCustomPlot.MAX_MARKERS)
+            indices = indices[np.round(keep).astype(np.int64)]
+        return indices
+
+    def update_markers(self, indices, values):
+        """Place the max and min markers against the decimated view data.
+
+        Matches are searched among the LOD points of the view, so the cost
+        depends on the plot width, not on the number of equal extremes. A
+        matching block is at most one pixel wide, which bounds the position
+        error of a marker placed at its LOD point.
+        """
+        if not self.max_indicators:
+            self.max_indicators = [
+                self.create_text_marker(QColor(255, 0, 0))
+                for _ in range(MyCustomPlot.MAX_MARKERS)
+            ]
+            self.min_indicators = [
+                self.create_text_marker(QColor(0, 0, 255))
+                for _ in range(MyCustomPlot.MAX_MARKERS)
+            ]
+        self.clear_all_markers()
 
-        indicator.position.setCoords(x_pos, y_pos)
+        # Extremes of the whole dataset, from the pyramid in O(log n)
+        min_val, max_val = self.pyramid.range_min_max(0, len(self.y_data))
+        text_offset = self.get_dynamic_marker_size() * 2.5
 
-        if "Max" in text:
-            self.max_indicators.append(indicator)
-        else:
-            self.min_indicators.append(indicator)
+        for markers, value, label, offset in (
+            (self.max_indicators, max_val, "Max", text_offset),
+            (self.min_indicators, min_val, "Min", -text_offset),
+        ):
+            hits = self.cluster_marker_indices(indices[values == value])
+            for marker, idx in zip(markers, hits):
+                marker.setText(f"{label}: {value:.2f}")
+                marker.position.setCoords(self.x_axis.value(idx), value + offset)
+                marker.setVisible(True)
 
     def init_cursor(self):
         """Initialize cursor lines and text labels"""
+        # Cursor items live on their own buffered layer above the graph, so
+        # moving them only repaints this layer instead of the whole plot
+        self.plot.addLayer("cursor", self.plot.layer("main"), QCustomPlot.limAbove)
+        self.cursor_layer = self.plot.layer("cursor")
+        self.cursor_layer.setMode(QCPLayer.lmBuffered)
+
         # Create vertical cursor line (X)
         self.cursor_line_x = QCPItemStraightLine(self.plot)
         self.cursor_line_x.setPen(QPen(QColor(255, 100, 0), 1, Qt.DashLine))
@@ -195,6 +427,91 @@ class MyCustomPlot(QMainWindow):
         self.cursor_text_x.setVisible(False)
         self.cursor_text_y.setVisible(False)
 
+        # Statistics cursors A and B
+        self.stats_cursor_lines = {}
+        for name, color in (("A", QColor(0, 160, 0)), ("B", QColor(160, 0, 160))):
+            line = QCPItemStraightLine(self.plot)
+            line.setPen(QPen(color, 1, Qt.SolidLine))
+            line.setVisible(False)
+            self.stats_cursor_lines[name] = line
+
+        # Currently selected event
+        self.event_line = QCPItemStraightLine(self.plot)
+        self.event_line.setPen(QPen(QColor(200, 0, 0), 2, Qt.DotLine))
+        self.event_line.setVisible(False)
+
+        for item in (
+            self.cursor_line_x,
+            self.cursor_line_y,
+            self.cursor_text_x,
+            self.cursor_text_y,
+            *self.stats_cursor_lines.values(),
+            self.event_line,
+        ):
+            item.setLayer(self.cursor_layer)
+
+    def request_frame(self):
+        """Queue a frame unless one is already pending"""
+        if not self.frame_timer.isActive():
+            self.frame_timer.start()
+
+    def request_replot(self):
+        """Queue a full replot, coalesced with any other pending work"""
+        self.full_replot_pending = True
+        self.request_frame()
+
+    def render_frame(self):
+        """Render all work queued since the last frame"""
+        cursor_moved = False
+        if self.pending_cursor_px is not None:
+            cursor_moved = self.move_cursor_to_pixel(self.pending_cursor_px)
+            self.pending_cursor_px = None
+
+        if self.full_replot_pending:
+            self.full_replot_pending = False
+            # timed by on_before_replot / on_after_replot
+            self.plot.replot(QCustomPlot.rpImmediateRefresh)
+        elif cursor_moved:
+            # Only the cursor layer buffer is redrawn, the graph buffers are reused
+            start = time.perf_counter()
+            self.cursor_layer.replot()
+            self.plot.repaint()
+            self.record_frame_time(time.perf_counter() - start)
+
+    def on_before_replot(self):
+        """Refresh the decimated data once per frame, before drawing"""
+        self.frame_start = time.perf_counter()
+        if self.lod_dirty:
+            self.update_lod()
+
+    def on_after_replot(self):
+        """Record the duration of a full replot"""
+        if self.frame_start is not None:
+            self.record_frame_time(time.perf_counter() - self.frame_start)
+            self.frame_start = None
+
+    def record_frame_time(self, seconds):
+        """Add a frame to the frame-time history and update the counter"""
+        self.frame_times.append(seconds * 1000.0)
+        stats = self.frame_stats()
+        self.frame_label.setText(
+            f"Frame: {stats['last']:.1f} ms (avg {stats['avg']:.1f}, "
+            f"max {stats['max']:.1f}, over {MyCustomPlot.FRAME_BUDGET_MS:.0f} ms: "
+            f"{stats['over_budget']}/{len(self.frame_times)})"
+        )
+
+    def frame_stats(self):
+        """Summary of the recent frame times in milliseconds"""
+        if not self.frame_times:
+            return {"last": 0.0, "avg": 0.0, "max": 0.0, "over_budget": 0}
+        times = self.frame_times
+        return {
+            "last": times[-1],
+            "avg": sum(times) / len(times),
+            "max": max(times),
+            "over_budget": sum(t > MyCustomPlot.FRAME_BUDGET_MS for t in times),
+        }
+
     def update_cursor(self, x, y):
         """Update cursor position and display data values"""
         if not self.data_loaded:
@@ -220,27 +537,38 @@ class MyCustomPlot(QMainWindow):
         self.cursor_line_y.setVisible(True)
         self.cursor_text_x.setVisible(True)
         self.cursor_text_y.setVisible(True)
-        self.plot.replot()
 
     def handle_mouse_move(self, event):
         """Handle mouse movement to update cursor (only on data points)"""
         if not self.data_loaded:
             return
 
-        mouse_x = self.plot.xAxis.pixelToCoord(event.pos().x())
-        closest_index = np.argmin(np.abs(self.x_data - mouse_x))
+        # Only the latest position matters, it is applied in the next frame
+        self.pending_cursor_px = event.pos().x()
+        self.request_frame()
+
+    def move_cursor_to_pixel(self, pixel_x):
+        """Snap the cursor to the sample closest to a pixel column"""
+        if not self.data_loaded:
+            return False
+
+        # O(1) for uniform axes, binary search for sorted non-uniform ones
+        mouse_x = self.plot.xAxis.pixelToCoord(pixel_x)
+        closest_index = self.x_axis.nearest_index(mouse_x)
 
-        if 0 <= closest_index < len(self.x_data):
-            x = self.x_data[closest_index]
-            y = self.y_data[closest_index]
-            self.current_index = closest_index
-            self.update_cursor(x, y)
+        x = self.x_axis.value(closest_index)
+        y = self.y_data[closest_index]
+        self.current_index = closest_index
+        self.update_cursor(x, y)
+        return True
 
     def keyPressEvent(self, event):
         """Handle keyboard events for plot navigation"""
         if not self.data_loaded:
             return
 
+        self.follow_loading = False
+
         # Get current axis ranges
         x_range = self.plot.xAxis.range()
         y_range = self.plot.yAxis.range()
@@ -279,19 +607,27 @@ class MyCustomPlot(QMainWindow):
         # Handle other keys
         elif event.key() == Qt.Key_M:
             self.toggle_markers()
+        elif event.key() in (Qt.Key_A, Qt.Key_B):
+            self.place_stats_cursor("A" if event.key() == Qt.Key_A else "B")
+        elif event.key() == Qt.Key_C:
+            self.clear_stats_cursors()
+        elif event.key() in (Qt.Key_N, Qt.Key_P):
+            self.step_event(1 if event.key() == Qt.Key_N else -1)
         elif event.key() == Qt.Key_Q:
             self.close()
             return
         else:
             return
 
-        self.plot.replot()
+        self.request_replot()
 
     def handle_mouse_wheel(self, event):
         """Handle mouse wheel events for zooming"""
         if not self.data_loaded:
             return
 
+        self.follow_loading = False
+
         # Check Ctrl modifier
         if event.modifiers() & Qt.ControlModifier:
             # Vertical zoom when Ctrl is pressed
@@ -311,6 +647,8 @@ class MyCustomPlot(QMainWindow):
         if not self.data_loaded:
             return
 
+        self.follow_loading = False
+
         if event.modifiers() & Qt.ControlModifier:
             self.plot.axisRect().setRangeDrag(Qt.Horizontal | Qt.Vertical)
         else:
@@ -324,11 +662,264 @@ class MyCustomPlot(QMainWindow):
     def handle_double_click(self, event):
         """Handle plot double click to reset view"""
         if event.button() == Qt.LeftButton and self.data_loaded:
+            if self.stream_reader is not None:
+                self.follow_loading = True  # resume the rolling window
             self.reset_view()
 
+    def resizeEvent(self, event):
+        """Recompute the decimated view for the new plot width"""
+        super().resizeEvent(event)
+        self.mark_lod_dirty()
+
+    def mark_lod_dirty(self, *args):
+        """Defer the decimation to the next replot"""
+        self.lod_dirty = True
+
+    def mark_density_dirty(self, *args):
+        """Value buckets follow the y-axis, rebin on vertical zoom and pan"""
+        if self.density_check.isChecked():
+            self.lod_dirty = True
+
+    def on_density_toggled(self, checked):
+        """Switch channel 0 between line and density heatmap"""
+        if self.plot.graphCount():
+            self.plot.graph(0).setVisible(not checked)
+        self.density_item.setVisible(checked and self.data_loaded)
+        self.mark_lod_dirty()
+        self.request_replot()
+
+    def update_density(self, start, stop):
+        """Bin the samples of the view into a pixel column x value bucket image
+
+        The pyramid level is chosen so at most DENSITY_BUDGET blocks are
+        binned, which keeps the cost independent of the number of samples.
+        """
+        rect = self.plot.axisRect()
+        columns = max(1, rect.width())
+        rows = max(1, min(MyCustomPlot.DENSITY_MAX_ROWS, rect.height()))
+        x_range = self.plot.xAxis.range()
+        y_range = self.plot.yAxis.range()
+
+        indices, values = self.pyramid.query(start, stop, MyCustomPlot.DENSITY_BUDGET)
+        starts, lows, highs, counts = envelope_blocks(indices, values, stop)
+        hist = density_histogram(
+            self.x_axis.values(starts),
+            lows,
+            highs,
+            counts,
+            (x_range.lower, x_range.upper),
+            (y_range.lower, y_range.upper),
+            columns,
+            rows,
+        )
+        pixels = density_argb(hist)
+        image = QImage(pixels.data, columns, rows, 4 * columns, QImage.Format_ARGB32)
+        self.density_item.setPixmap(QPixmap.fromImage(image))  # copies the pixels
+        self.density_item.topLeft.setCoords(x_range.lower, y_range.upper)
+        self.density_item.bottomRight.setCoords(x_range.upper, y_range.lower)
+        self.density_item.setVisible(True)
+
+    def update_lod(self):
+        """Feed the graph only ~2 points per pixel of the visible x-range"""
+        self.lod_dirty = False
+        if not self.data_loaded or self.plot.graphCount() == 0:
+            return
+
+        x_range = self.plot.xAxis.range()
+        # includes one extra sample on each side so the line reaches the edges
+        start, stop = self.x_axis.index_range(x_range.lower, x_range.upper)
+
+        width = self.plot.axisRect().width() or self.plot.width()
+        max_points = max(2, MyCustomPlot.LOD_POINTS_PER_PIXEL * width)
+
+        indices, values = self.pyramid.query(start, stop, max_points)
+        keys = self.x_axis.values(indices)
+        self.plot.graph(0).setData(keys, values, True)
+        if self.density_check.isChecked():
+            self.update_density(start, stop)
+
+        # Channels of a session decimate to the same blocks and share the keys
+        for graph_no, (_, channel) in enumerate(self.channels[1:], 1):
+            _, channel_values = channel.query(start, stop, max_points)
+            self.plot.graph(graph_no).setData(keys, channel_values, True)
+        if self.show_markers and len(indices):
+            self.update_markers(indices, values)
+        self.update_stats()
+        self.schedule_spectrum()
+
+    def place_stats_cursor(self, name):
+        """Put statistics cursor A or B on the sample under the cursor"""
+        if self.current_index is None:
+            return
+        x = self.x_axis.value(self.current_index)
+        self.stats_cursor_x[name] = x
+        line = self.stats_cursor_lines[name]
+        line.point1.setCoords(x, 0)
+        line.point2.setCoords(x, 1)
+        line.setVisible(True)
+        self.update_stats()
+
+    def clear_stats_cursors(self):
+        """Remove both statistics cursors"""
+        for name, line in self.stats_cursor_lines.items():
+            self.stats_cursor_x[name] = None
+            line.setVisible(False)
+        self.update_stats()
+
+    def range_stats(self, x_lower, x_upper):
+        """Statistics of the samples between two x values"""
+        start = self.x_axis.nearest_index(min(x_lower, x_upper))
+        stop = self.x_axis.nearest_index(max(x_lower, x_upper)) + 1
+        return window_stats(self.pyramid, self.prefix, start, stop, self.x_axis.step)
+
+    @staticmethod
+    def format_stats(stats):
+        if stats is None:
+            return "-"
+        text = (
+            f"n={stats['samples']}, min={stats['min']:.4g}, max={stats['max']:.4g}, "
+            f"mean={stats['mean']:.4g}, RMS={stats['rms']:.4g}"
+        )
+        if stats["integral"] is not None:
+            text += f", integral={stats['integral']:.4g}"
+        return text
+
+    def update_stats(self):
+        """Refresh the statistics of the visible range and between the cursors"""
+        if not self.data_loaded or len(self.y_data) == 0:
+            self.view_stats_label.setText("Visible: -")
+            return
+
+        x_range = self.plot.xAxis.range()
+        visible = self.range_stats(x_range.lower, x_range.upper)
+        self.view_stats_label.setText(f"Visible: {self.format_stats(visible)}")
+
+        a, b = self.stats_cursor_x["A"], self.stats_cursor_x["B"]
+        if a is None or b is None:
+            placed = "A" if a is not None else "B" if b is not None else None
+            self.cursor_stats_label.setText(
+                f"Cursors A-B: cursor {placed} placed" if placed else
+                "Cursors A-B: press A / B to place at the cursor, C to clear"
+            )
+        else:
+            between = self.range_stats(a, b)
+            self.cursor_stats_label.setText(f"Cursors A-B: {self.format_stats(between)}")
+
+    def on_spectrum_toggled(self, checked):
+        """Show or hide the spectrum dock"""
+        self.spectrum_dock.setVisible(checked)
+        if checked:
+            self.update_spectrum()
+
+    def schedule_spectrum(self):
+        """Debounce spectrum updates while the view is moving"""
+        if not self.spectrum_dock.isVisible():
+            return
+        now = time.perf_counter()
+        if self.spectrum_timer.isActive():
+            waited = (now - self.spectrum_wait_start) * 1000.0
+            if waited >= MyCustomPlot.SPECTRUM_MAX_DELAY_MS:
+                return  # let the pending update fire
+        else:
+            self.spectrum_wait_start = now
+        self.spectrum_timer.start()
+
+    def update_spectrum(self, *args):
+        """Show the spectrum of the visible range, from the cache or a worker"""
+        self.spectrum_timer.stop()
+        if not self.data_loaded or not self.spectrum_dock.isVisible():
+            return
+        x_range = self.plot.xAxis.range()
+        start, stop = self.x_axis.index_range(x_range.lower, x_range.upper)
+        start, stop = max(0, start), min(len(self.y_data), stop)
+        if stop - start < 2:
+            return
+
+        # Keyed by x values, which stay valid when a live window scrolls
+        first, last = self.x_axis.value(start), self.x_axis.value(stop - 1)
+        window = self.spectrum_window.currentText()
+        nfft = int(self.spectrum_nfft.currentText())
+        method = self.spectrum_method.currentText()
+        key = (first, last, window, nfft, method)
+        if key == self.spectrum_key:
+            return
+        if self.spectrum_worker is not None and self.spectrum_worker.key == key:
+            return  # already being computed
+
+        cached = self.spectrum_cache.get(key)
+        if cached is not None:
+            self.cancel_spectrum()
+            self.show_spectrum(key, cached)
+            return
+
+        y = self.y_data
+        if self.stream_reader is not None:
+            y, start, stop = np.array(y[start:stop]), 0, stop - start  # the ring keeps changing
+        step = (last - first) / (stop - start - 1)  # mean spacing for non-uniform axes
+
+        self.cancel_spectrum()
+        self.spectrum_worker = SpectrumWorker(
+            key, SampleRange(y, start, stop), step, window, nfft, method, self
+        )
+        self.spectrum_worker.finished.connect(self.on_spectrum_computed)
+        self.spectrum_label.setText("Computing...")
+        self.spectrum_worker.start()
+
+    def cancel_spectrum(self):
+        """Drop a running spectrum computation without waiting for it"""
+        if self.spectrum_worker is not None:
+            self.spectrum_worker.cancel()  # parented, deleted once finished
+            self.spectrum_worker = None
+
+    def on_spectrum_computed(self):
+        """Cache and show the result of a spectrum worker"""
+        worker = self.sender()
+        worker.deleteLater()
+        if worker is not self.spectrum_worker:
+            return  # cancelled or superseded
+
+        self.spectrum_worker = None
+        if worker.error is not None:
+            self.spectrum_label.setText(f"Spectrum failed: {worker.error}")
+        elif worker.result is not None:
+            self.spectrum_cache.put(worker.key, worker.result)
+            self.show_spectrum(worker.key, worker.result)
+
+    def show_spectrum(self, key, result):
+        """Plot a (frequencies, values) spectrum, DC left out of the log axes"""
+        first, last, window, nfft, method = key
+        freqs, values = result
+        freqs, values = freqs[1:], np.maximum(values[1:], np.finfo(float).tiny)
+        self.spectrum_key = key
+
+        time_axis = self.plot.xAxis.label() == "Time (s)"
+        self.spectrum_plot.xAxis.setLabel("Frequency (Hz)" if time_axis else "Frequency (1 / x unit)")
+        self.spectrum_plot.yAxis.setLabel("PSD" if method == WELCH else "Amplitude")
+        self.spectrum_plot.graph(0).setData(freqs, values, True)
+        self.spectrum_plot.rescaleAxes()
+        self.spectrum_plot.replot(QCustomPlot.rpQueuedReplot)
+
+        resolution = freqs[0] if len(freqs) else 0.0
+        self.spectrum_label.setText(
+            f"{method}, {window}, x {first:.6g} to {last:.6g}, resolution {resolution:.3g}"
+        )
+
+    def clear_spectrum(self):
+        """Forget all spectra of the previous data"""
+        self.spectrum_timer.stop()
+        self.cancel_spectrum()
+        self.spectrum_cache.clear()
+        self.spectrum_key = None
+        self.spectrum_plot.graph(0).data().clear()
+        self.spectrum_label.setText("")
+        self.spectrum_plot.replot(QCustomPlot.rpQueuedReplot)
+
     def reset_view(self):
         """Reset plot view and update marker positions"""
         if self.data_loaded:
+            # Show the full x extent first so the decimated graph covers it
+            self.plot.xAxis.setRange(self.x_axis.first, self.x_axis.last)
+            self.update_lod()
             self.plot.rescaleAxes()
 
             # if self.show_markers:
@@ -337,49 +928,529 @@ class MyCustomPlot(QMainWindow):
 
             self.plot.axisRect().setRangeZoom(Qt.Horizontal)
             self.plot.axisRect().setRangeDrag(Qt.Horizontal)
-            self.plot.replot()
+            self.request_replot()
 
     def load_data_file(self):
         """Open file dialog and load selected data file"""
         filename, _ = QFileDialog.getOpenFileName(
-            self, "Select Data File", "", "Text Files (*.txt);;All Files (*)"
+            self,
+            "Select Data File",
+            "",
+            "Text Files (*.txt);;sigrok Sessions (*.sr);;All Files (*)",
         )
 
         if not filename:
             return
 
+        self.open_file(filename)
+
+    def open_file(self, filename):
+        """Plot a file from its memmap cache, building the cache for large files"""
+        if filename.lower().endswith(".sr"):
+            self.open_session(filename)
+            return
+
+        if self.out_of_core_check.isChecked():
+            cache = open_cache(filename)
+            if cache is not None:
+                # Reopen: nothing is parsed, the cache is mapped in place
+                self.stop_loading()
+                self.set_pyramid(*cache, filename)
+                return
+            if os.path.getsize(filename) >= MyCustomPlot.OUT_OF_CORE_THRESHOLD:
+                self.start_cache_build(filename)
+                return
+
+        self.start_loading(filename)
+
+    def open_session(self, filename):
+        """Open a sigrok session lazily, summarizing it in the background"""
+        self.stop_loading()
+        self.clear_data()
         try:
-            # Read file and skip comment lines
-            with open(filename, "r") as f:
-                lines = [line.strip() for line in f if not line.startswith("===")]
+            session = SrSession(filename)
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+            self.file_label.setText(f"Error loading file: {e}")
+            return
+
+        # Only metadata and the zip directory are read here
+        self.session = session
+        channel = session.channels[0]
+        self.pyramid = channel
+        self.prefix = channel  # sums from block summaries and edge chunks
+        self.y_data = channel.y
+        self.x_axis = UniformAxis(len(session), 0.0, 1.0 / session.samplerate)
+        self.data_loaded = True
+        self.plot_data([(c.name, c) for c in session.channels], "Time (s)")
+
+        self.loader = SessionIndexer(session, self)
+        self.loader.progress.connect(self.on_session_progress)
+        self.loader.finished.connect(self.on_session_indexed)
+        self.file_label.setText(
+            f"Indexing: {os.path.basename(filename)} ({len(session)} samples, "
+            f"{len(session.channels)} channels)"
+        )
+        self.progress_bar.setValue(0)
+        self.progress_bar.show()
+        self.loader.start()
+
+    def on_session_progress(self, percent):
+        """Show the block summaries filled in so far"""
+        if self.sender() is not self.loader:
+            return
+        self.progress_bar.setValue(percent)
+        self.mark_lod_dirty()
+        self.request_replot()
+
+    def on_session_indexed(self):
+        """Report the result of summarizing a session"""
+        indexer = self.sender()
+        if indexer is not self.loader:
+            return
+
+        self.loader = None
+        self.progress_bar.hide()
+        session = indexer.session
+        if indexer.error is not None:
+            self.file_label.setText(f"Error loading file: {indexer.error}")
+            return
+        self.file_label.setText(
+            f"Loaded: {os.path.basename(session.path)} ({len(session)} samples, "
+            f"{len(session.channels)} channels, {session.samplerate:g} Hz)"
+        )
+        self.mark_lod_dirty()
+        self.request_replot()
+
+    def clear_data(self):
+        """Drop the current data before a new file is opened"""
+        self.data_loaded = False
+        self.stop_event_detection()
+        self.events = None
+        self.event_model.set_events(None, None)
+        self.event_line.setVisible(False)
+        self.event_dock.hide()
+        self.density_item.setVisible(False)
+        self.clear_spectrum()
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+        self.pyramid = MinMaxPyramid()
+        self.prefix = PrefixSums()
+        self.y_data = self.pyramid.y
+        self.x_axis = UniformAxis(0)
+        self.plot.clearPlottables()
+        self.remove_channel_rects()
+        self.channels = []
+        self.clear_all_markers()
+        self.request_replot()
+
+    def start_loading(self, filename):
+        """Parse a data file in the background, plotting chunks as they arrive"""
+        self.stop_loading()
+        self.clear_data()
+        self.follow_loading = True
+
+        self.loader = DataFileLoader(filename, self)
+        self.loader.chunk_loaded.connect(self.on_chunk_loaded)
+        self.loader.progress.connect(self.progress_bar.setValue)
+        self.loader.finished.connect(self.on_load_finished)
+
+        self.file_label.setText(f"Loading: {os.path.basename(filename)}")
+        self.progress_bar.setValue(0)
+        self.progress_bar.show()
+        self.loader.start()
+
+    def start_cache_build(self, filename):
+        """Convert a large file to its memmap cache in the background"""
+        self.stop_loading()
+        self.clear_data()
+
+        self.loader = CacheBuilder(filename, self)
+        self.loader.progress.connect(self.progress_bar.setValue)
+        self.loader.finished.connect(self.on_cache_built)
+
+        self.file_label.setText(f"Building cache: {os.path.basename(filename)}")
+        self.progress_bar.setValue(0)
+        self.progress_bar.show()
+        self.loader.start()
+
+    def on_cache_built(self):
+        """Open the freshly built cache of a large file"""
+        builder = self.sender()
+        if builder is not self.loader:
+            return
 
-            # Convert to numpy array
-            self.y_data = np.array([float(line) for line in lines if line])
-            self.x_data = np.arange(len(self.y_data))
+        self.loader = None
+        self.progress_bar.hide()
+
+        cache = None
+        if builder.error is None:
+            cache = open_cache(builder.filename)
+        if cache is None:
+            error = builder.error or "cache could not be opened"
+            self.file_label.setText(f"Error loading file: {error}")
+            return
+        self.set_pyramid(*cache, builder.filename)
+
+    def set_pyramid(self, pyramid, prefix, filename):
+        """Plot data that is already fully available as a pyramid"""
+        self.clear_data()
+        self.pyramid = pyramid
+        self.prefix = prefix
+        self.y_data = pyramid.y
+        self.x_axis = UniformAxis(len(self.y_data))
+        self.follow_loading = False
+        self.data_loaded = True
+        self.plot_data()
+        self.file_label.setText(
+            f"Loaded: {os.path.basename(filename)} ({len(self.y_data)} samples, cached)"
+        )
+
+    def open_stream(self):
+        """Ask for a live source and start streaming from it"""
+        spec, ok = QInputDialog.getText(
+            self,
+            "Live Stream",
+            "Source (udp://host:port, tcp://host:port, file or FIFO path, - for stdin)\n"
+            "append ?dtype=<i2 etc. for raw binary samples:",
+        )
+        if ok and spec.strip():
+            self.start_stream(spec.strip())
+
+    def start_stream(self, spec):
+        """Stream samples from a live source into a rolling window"""
+        self.stop_loading()
+        self.clear_data()
+
+        ring = RingBuffer(MyCustomPlot.STREAM_CAPACITY)
+        try:
+            self.stream_reader = StreamReader(spec, ring, self)
+        except ValueError as e:
+            self.file_label.setText(f"Error opening stream: {e}")
+            return
+        self.stream_reader.finished.connect(self.on_stream_finished)
+        self.pyramid = ring
+        self.prefix = None  # window statistics reduce the ring directly
+        self.stream_total = 0
+        self.follow_loading = True
+
+        self.file_label.setText(f"Streaming: {spec}")
+        self.stream_reader.start()
+        self.stream_timer.start()
+
+    def on_stream_frame(self):
+        """Show the latest samples of the ring buffer, once per frame"""
+        if self.stream_reader is None:
+            return
+        ring = self.stream_reader.ring
+        total, y = ring.snapshot()
+        if total == self.stream_total:
+            return  # nothing new, keep the last frame
+        self.stream_total = total
+
+        # x stays the absolute sample number, so a paused view stays put
+        self.y_data = y
+        self.x_axis = UniformAxis(len(y), start=total - len(y))
+
+        if not self.data_loaded:
             self.data_loaded = True
+            self.plot_data()
+        elif self.follow_loading:
+            self.plot.xAxis.setRange(self.x_axis.first, self.x_axis.last)
+            self.update_lod()
+            self.plot.graph(0).rescaleValueAxis()
+            self.request_replot()
+        else:
+            self.mark_lod_dirty()
+            self.request_replot()
 
-            # Update UI
-            self.file_label.setText(f"Loaded: {filename.split('/')[-1]}")
+        self.file_label.setText(
+            f"Streaming: {self.stream_reader.spec} ({total} samples received)"
+        )
+
+    def on_stream_finished(self):
+        """Report why a live source stopped"""
+        reader = self.sender()
+        if reader is not self.stream_reader:
+            return
+
+        self.on_stream_frame()  # show the last samples
+        self.stream_timer.stop()
+        self.stream_reader = None
+        if reader.error is not None:
+            self.file_label.setText(f"Stream error: {reader.error}")
+        else:
+            self.file_label.setText(
+                f"Stream ended: {reader.spec} ({self.stream_total} samples received)"
+            )
+
+    def stop_stream(self):
+        """Stop a running live stream"""
+        self.stream_timer.stop()
+        if self.stream_reader is not None:
+            self.stream_reader.cancel()
+            self.stream_reader.wait()
+            self.stream_reader = None
+
+    def stop_loading(self):
+        """Cancel a running background load or live stream"""
+        self.stop_stream()
+        if self.loader is not None:
+            self.loader.cancel()
+            self.loader.wait()
+            self.loader = None
+        self.progress_bar.hide()
+
+    def on_chunk_loaded(self, samples):
+        """Extend data and LOD pyramid with freshly parsed samples"""
+        if self.sender() is not self.loader:
+            return  # late chunk of a cancelled load
+
+        self.pyramid.append(samples)
+        self.prefix.append(samples)
+        self.y_data = self.pyramid.y
+        self.x_axis = UniformAxis(len(self.y_data))
+
+        if not self.data_loaded:
+            # First chunk: show a coarse view right away
+            self.data_loaded = True
             self.plot_data()
+        elif self.follow_loading:
+            self.reset_view()
+        else:
+            self.mark_lod_dirty()
+            self.request_replot()
+
+    def on_load_finished(self):
+        """Report the result of a background load"""
+        loader = self.sender()
+        if loader is not self.loader:
+            return
 
-        except Exception as e:
-            self.file_label.setText(f"Error loading file: {str(e)}")
+        self.loader = None
+        self.follow_loading = False
+        self.progress_bar.hide()
+
+        filename = os.path.basename(loader.filename)
+        if loader.error is not None:
+            self.file_label.setText(f"Error loading file: {loader.error}")
             self.data_loaded = False
+        elif not self.data_loaded:
+            self.file_label.setText(f"Error loading file: no data in {filename}")
+        else:
+            self.file_label.setText(
+                f"Loaded: {filename} ({len(self.y_data)} samples)"
+            )
+
+    def ask_event_settings(self):
+        """Ask for detector settings, defaults derived from the visible data"""
+        x_range = self.plot.xAxis.range()
+        stats = self.range_stats(x_range.lower, x_range.upper)
+        mean = stats["mean"] if stats else 0.0
+        std = np.sqrt(max(stats["rms"] ** 2 - mean**2, 0.0)) if stats else 1.0
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Detect Events")
+        form = QFormLayout(dialog)
+
+        def spin(value):
+            box = QDoubleSpinBox()
+            box.setRange(-1e15, 1e15)
+            box.setDecimals(6)
+            box.setValue(value)
+            return box
+
+        crossing_check = QCheckBox("Threshold crossings")
+        crossing_check.setChecked(True)
+        threshold = spin(mean + 3 * std)
+        peak_check = QCheckBox("Peaks above baseline")
+        peak_check.setChecked(True)
+        baseline = spin(mean)
+        height = spin(3 * std)
+        burst_check = QCheckBox("Rising-edge bursts")
+        burst_check.setChecked(True)
+        slope = spin(std)
+        gap = QSpinBox()
+        gap.setRange(1, 1_000_000_000)
+        gap.setValue(100)
+        min_edges = QSpinBox()
+        min_edges.setRange(1, 1_000_000)
+        min_edges.setValue(3)
+
+        form.addRow(crossing_check)
+        form.addRow("Threshold:", threshold)
+        form.addRow(peak_check)
+        form.addRow("Baseline:", baseline)
+        form.addRow("Peak height:", height)
+        form.addRow(burst_check)
+        form.addRow("Edge rise per sample:", slope)
+        form.addRow("Max edge gap (samples):", gap)
+        form.addRow("Min edges per burst:", min_edges)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(dialog.accept)
+        buttons.rejected.connect(dialog.reject)
+        form.addRow(buttons)
+
+        if dialog.exec_() != QDialog.Accepted:
+            return None
+        detectors = []
+        if crossing_check.isChecked():
+            detectors.append(CrossingDetector(threshold.value()))
+        if peak_check.isChecked():
+            detectors.append(PeakDetector(baseline.value(), height.value()))
+        if burst_check.isChecked():
+            detectors.append(BurstDetector(slope.value(), gap.value(), min_edges.value()))
+        return detectors
+
+    def open_event_detection(self):
+        """Ask for settings and detect events over the whole capture"""
+        if not self.data_loaded:
+            return
+        detectors = self.ask_event_settings()
+        if detectors:
+            self.start_event_detection(detectors)
+
+    def start_event_detection(self, detectors):
+        """Run the detectors in a worker thread"""
+        self.stop_event_detection()
+
+        if self.session is not None:
+            blocks = self.pyramid.iter_chunks  # own zip handle, chunk by chunk
+        else:
+            y = self.y_data
+            if self.stream_reader is not None:
+                y = np.array(y)  # the ring keeps changing
+            blocks = lambda: iter_array_blocks(y, EventDetector.BLOCK_SIZE)
+
+        self.event_axis = self.x_axis
+        self.event_detector = EventDetector(blocks, len(self.y_data), detectors, self)
+        self.event_detector.progress.connect(
+            lambda percent: self.events_btn.setText(f"Detecting Events... {percent}%")
+        )
+        self.event_detector.finished.connect(self.on_events_detected)
+        self.event_detector.start()
+
+    def stop_event_detection(self):
+        """Cancel a running event detection"""
+        if self.event_detector is not None:
+            self.event_detector.cancel()
+            self.event_detector.wait()
+            self.event_detector = None
+        self.events_btn.setText("Detect Events...")
+
+    def on_events_detected(self):
+        """Fill the event table with the detection result"""
+        detector = self.sender()
+        if detector is not self.event_detector:
+            return
 
-    def plot_data(self):
-        """Plot the loaded data"""
+        self.event_detector = None
+        self.events_btn.setText("Detect Events...")
+        if detector.error is not None:
+            self.file_label.setText(f"Event detection failed: {detector.error}")
+            return
+
+        self.events = detector.events
+        self.event_model.set_events(self.events, self.event_axis.values(self.events.index))
+        self.event_dock.setWindowTitle(f"Events ({len(self.events)})")
+        self.event_dock.show()
+        counts = ", ".join(f"{n} {kind}" for kind, n in self.events.counts().items())
+        self.cursor_stats_label.setText(f"Events: {counts} (N / P to navigate)")
+
+    def step_event(self, direction):
+        """Center the view on the next (1) or previous (-1) event"""
+        if self.events is None or len(self.events) == 0:
+            return
+        center = self.event_axis.nearest_index(self.plot.xAxis.range().center())
+        if direction > 0:
+            row = self.events.next_after(center)
+        else:
+            row = self.events.prev_before(center)
+        if row is not None:
+            self.go_to_event(row)
+
+    def go_to_event(self, row):
+        """Center the view on an event, keeping the zoom level"""
+        x = self.event_model.x_values[row]
+        self.follow_loading = False
+        self.plot.xAxis.setRange(x, self.plot.xAxis.range().size(), Qt.AlignCenter)
+        self.event_line.point1.setCoords(x, 0)
+        self.event_line.point2.setCoords(x, 1)
+        self.event_line.setVisible(True)
+        self.event_table.selectRow(row)
+        self.request_replot()
+
+    def closeEvent(self, event):
+        """Stop the loader, stream, detector and spectrum threads before closing"""
+        self.stop_event_detection()
+        for worker in self.findChildren(SpectrumWorker):  # incl. superseded ones
+            worker.cancel()
+            worker.wait()
+        self.stop_loading()
+        super().closeEvent(event)
+
+    def on_stack_toggled(self, checked):
+        """Switch a multi-channel plot between stacked and overlaid"""
+        if self.data_loaded and len(self.channels) > 1:
+            self.plot_data(self.channels, self.plot.xAxis.label())
+
+    def remove_channel_rects(self):
+        """Remove the axis rects of stacked channels"""
+        for rect in self.channel_rects:
+            self.plot.plotLayout().remove(rect)
+        self.channel_rects = []
+        self.plot.plotLayout().simplify()
+        self.plot.axisRect().setMarginGroup(QCP.msLeft | QCP.msRight, None)
+
+    def add_channel_rect(self, name, margin_group):
+        """Add an axis rect below the others, x-range locked to the main one"""
+        rect = QCPAxisRect(self.plot)
+        self.plot.plotLayout().addElement(self.plot.plotLayout().rowCount(), 0, rect)
+        rect.setMarginGroup(QCP.msLeft | QCP.msRight, margin_group)
+        rect.setRangeDrag(Qt.Horizontal)
+        rect.setRangeZoom(Qt.Horizontal)
+        rect.axis(QCPAxis.atLeft).setLabel(name)
+
+        x_axis = rect.axis(QCPAxis.atBottom)
+        x_axis.setRange(self.plot.xAxis.range())
+        self.plot.xAxis.rangeChanged.connect(x_axis.setRange)
+        x_axis.rangeChanged.connect(self.plot.xAxis.setRange)
+        self.channel_rects.append(rect)
+        return rect
+
+    def plot_data(self, channels=None, x_label="Sample Index"):
+        """Plot the loaded data, one graph per (name, pyramid) channel"""
         self.plot.clearPlottables()
+        self.remove_channel_rects()
         self.show_markers = False
         self.clear_all_markers()
+        self.channels = channels or [("BLM Data", self.pyramid)]
+
+        # Create graphs, data is set per view by update_lod
+        stacked = self.stack_check.isChecked() and len(self.channels) > 1
+        if stacked:
+            margin_group = QCPMarginGroup(self.plot)
+            self.plot.axisRect().setMarginGroup(QCP.msLeft | QCP.msRight, margin_group)
 
-        # Create graph
-        self.plot.addGraph()
-        self.plot.graph(0).setData(self.x_data, self.y_data)
-        self.plot.graph(0).setName("BLM Data")
+        for graph_no, (name, _) in enumerate(self.channels):
+            if graph_no == 0 or not stacked:
+                graph = self.plot.addGraph()
+            else:
+                rect = self.add_channel_rect(name, margin_group)
+                graph = self.plot.addGraph(
+                    rect.axis(QCPAxis.atBottom), rect.axis(QCPAxis.atLeft)
+                )
+            graph.setName(name)
+            if graph_no == 0 and self.density_check.isChecked():
+                graph.setVisible(False)  # still feeds autoscaling and the cursor
+            if len(self.channels) > 1:
+                colors = MyCustomPlot.CHANNEL_COLORS
+                graph.setPen(QPen(colors[graph_no % len(colors)]))
 
         # Configure axes
-        self.plot.xAxis.setLabel("Sample Index")
-        self.plot.yAxis.setLabel("Value")
+        self.plot.xAxis.setLabel(x_label)
+        self.plot.yAxis.setLabel(self.channels[0][0] if stacked else "Value")
+        self.plot.legend.setVisible(len(self.channels) > 1 and not stacked)
 
         # Auto-scale to show all data
         self.reset_view()
@@ -0,0 +1,45 @@
+import numpy as np
+
+
+class UniformAxis:
+    """Implicit evenly spaced x-axis, x[i] = start + i * step.
+
+    The x values are never materialized; all lookups are O(1).
+    """
+
+    def __init__(self, length, start=0.0, step=1.0):
+        if step <= 0:
+            raise ValueError("Axis step must be positive")
+        self.length = int(length)
+        self.start = start
+        self.step = step
+
+    def __len__(self):
+        return self.length
+
+    @property
+    def first(self):
+        return self.start
+
+    @property
+    def last(self):
+        return self.start + (self.length - 1) * self.step
+
+    def value(self, index):
+        """x value of a single sample"""
+        return self.start + index * self.step
+
+    def values(self, indices):
+        """x values of an index array"""
+        return self.start + np.asarray(indices) * self.step
+
+    def nearest_index(self, x):
+        """Index of the sample closest to x, clipped to the data"""
+        index = int(round((x - self.start) / self.step))
+        return min(max(index, 0), self.length - 1)
+
+    def index_range(self, lower, upper):
+        """Sample range [start, stop) covering [lower, upper] plus one sample each side"""
+        start = int(np.floor((lower - self.start) / self.step))
+        stop = int(np.ceil((upper - self.start) / self.step)) + 1
+        return max(start, 0), min(max(stop, 0), self.length)
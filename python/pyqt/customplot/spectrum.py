@@ -0,0 +1,142 @@
+from collections import OrderedDict
+
+import numpy as np
+from PyQt5.QtCore import QThread
+
+WINDOWS = {
+    "Hann": np.hanning,
+    "Hamming": np.hamming,
+    "Blackman": np.blackman,
+    "Rectangular": np.ones,
+}
+METHODS = ["Welch PSD", "rFFT"]
+WELCH, RFFT = METHODS
+
+
+class SampleRange:
+    """Samples [start, stop) of an array-like, sliced only on access.
+
+    Lazily decoded session channels read a whole slice at once, so a view
+    keeps Welch segments from pulling in the entire visible range.
+    """
+
+    def __init__(self, y, start, stop):
+        self.y = y
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, key):
+        a, b, _ = key.indices(len(self))
+        return self.y[self.start + a : self.start + b]
+
+
+def welch_psd(y, step, window="Hann", nfft=4096, max_segments=512, cancelled=None):
+    """Welch power spectral density of y, segments of nfft with 50% overlap.
+
+    Only max_segments segments, evenly spread over y, are averaged, so the
+    cost is bounded however long the range is. y only needs slicing, memmaps
+    and lazily decoded session channels are read segment by segment.
+    Returns (frequencies, PSD in units**2 / Hz), or None when cancelled.
+    """
+    n = len(y)
+    nfft = min(int(nfft), n)
+    if nfft < 2:
+        return None
+    hop = nfft // 2
+    count = (n - nfft) // hop + 1
+    offsets = np.unique(np.linspace(0, (count - 1) * hop, min(count, max_segments)).astype(np.int64))
+
+    w = WINDOWS[window](nfft)
+    scale = 1.0 / (w @ w) * step  # density scaling, sample rate 1 / step
+    psd = np.zeros(nfft // 2 + 1)
+    for a in offsets:
+        if cancelled and cancelled():
+            return None
+        segment = np.asarray(y[a : a + nfft], dtype=np.float64)
+        segment = (segment - segment.mean()) * w
+        psd += np.abs(np.fft.rfft(segment)) ** 2
+    psd *= scale / len(offsets)
+    # One-sided: fold the negative frequencies, except DC and Nyquist
+    psd[1 : (nfft + 1) // 2] *= 2
+    return np.fft.rfftfreq(nfft, step), psd
+
+
+def rfft_amplitude(y, step, window="Hann", nfft=4096, max_samples=1 << 22, cancelled=None):
+    """Amplitude spectrum of the whole of y in one windowed rFFT.
+
+    Zero-padded to at least nfft points; ranges longer than max_samples are
+    cut to their central max_samples. Amplitudes are corrected for the
+    window's coherent gain, so a sine of amplitude A peaks near A.
+    Returns (frequencies, amplitudes), or None when cancelled.
+    """
+    n = len(y)
+    if n > max_samples:
+        a = (n - max_samples) // 2
+        y = y[a : a + max_samples]
+        n = max_samples
+    if n < 2 or (cancelled and cancelled()):
+        return None
+    samples = np.asarray(y[0:n], dtype=np.float64)
+    w = WINDOWS[window](n)
+    size = max(int(nfft), 1 << int(np.ceil(np.log2(n))))
+    amplitude = np.abs(np.fft.rfft((samples - samples.mean()) * w, size)) * (2.0 / w.sum())
+    return np.fft.rfftfreq(size, step), amplitude
+
+
+class SpectrumCache:
+    """LRU of computed spectra keyed by (range, window, nfft, method)"""
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        result = self.entries.get(key)
+        if result is not None:
+            self.entries.move_to_end(key)
+        return result
+
+    def put(self, key, result):
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+class SpectrumWorker(QThread):
+    """Compute the spectrum of a sample range in a worker thread"""
+
+    def __init__(self, key, y, step, window, nfft, method, parent=None):
+        super().__init__(parent)
+        self.key = key
+        self.y = y  # the samples of the range only, e.g. a SampleRange
+        self.step = step
+        self.window = window
+        self.nfft = nfft
+        self.method = method
+        self.cancelled = False
+        self.error = None  # set when the computation fails, checked once finished
+        self.result = None  # (frequencies, values)
+
+    def cancel(self):
+        """Ask the worker to stop after the current segment"""
+        self.cancelled = True
+
+    def run(self):
+        compute = welch_psd if self.method == WELCH else rfft_amplitude
+        try:
+            self.result = compute(
+                self.y,
+                self.step,
+                self.window,
+                self.nfft,
+                cancelled=lambda: self.cancelled,
+            )
+        except Exception as e:
+            self.error = str(e)
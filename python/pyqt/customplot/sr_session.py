@@ -0,0 +1,352 @@
+import configparser
+import re
+import threading
+import zipfile
+
+import numpy as np
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from memmap_cache import TileCache
+
+
+ANALOG_MEMBER = re.compile(r"^analog-1-(\d+)-(\d+)$")
+LOGIC_MEMBER = re.compile(r"^logic-1-(\d+)$")
+SAMPLERATE_UNITS = {"hz": 1.0, "khz": 1e3, "mhz": 1e6, "ghz": 1e9}
+DUMMY_PROBE = "Dummy"  # placeholder np2srzip adds to analog-only sessions
+
+
+def parse_samplerate(text):
+    """Parse a sigrok samplerate such as '10 kHz' into Hz"""
+    match = re.match(r"^\s*([\d.]+)\s*([kmg]?hz)?\s*$", text, re.IGNORECASE)
+    if match is None:
+        raise ValueError(f"Invalid samplerate: {text}")
+    return float(match.group(1)) * SAMPLERATE_UNITS[(match.group(2) or "hz").lower()]
+
+
+class LazySamples:
+    """Array-like view of a session channel, decoding chunks on access"""
+
+    def __init__(self, channel):
+        self.channel = channel
+
+    def __len__(self):
+        return self.channel.session.length
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            return self.channel.read(start, stop)[::step]
+        index = int(key)
+        if index < 0:
+            index += len(self)
+        return self.channel.read(index, index + 1)[0]
+
+
+class SessionChannel:
+    """One channel of a sigrok session, loaded lazily chunk by chunk.
+
+    Offers the query / range_min_max interface of MinMaxPyramid and the
+    sum / sum_squares interface of PrefixSums. Coarse views use per-block
+    summaries (min, max, sum, sum of squares over SUMMARY_BLOCK samples)
+    filled in by a SessionIndexer; fine views decode only the chunks they
+    cover, through the session's tile cache. Blocks not summarized yet are
+    NaN and show up as gaps.
+    """
+
+    def __init__(self, session, number, name, members, decode):
+        self.session = session
+        self.number = number
+        self.name = name
+        self.members = members  # zip member name per chunk
+        self.decode = decode  # bytes -> 1D sample array
+        self.y = LazySamples(self)
+
+        entries = len(session.entry_starts)
+        self.mins = np.full(entries, np.nan)
+        self.maxs = np.full(entries, np.nan)
+        self.sums = np.full(entries, np.nan)
+        self.squares = np.full(entries, np.nan)
+
+    def __len__(self):
+        return self.session.length
+
+    def load_chunk(self, chunk, archive=None):
+        """Decode one chunk, from the given archive or the session's"""
+        if archive is None:
+            # The spectrum worker reads the session's archive too
+            with self.session.archive_lock:
+                raw = self.session.archive.read(self.members[chunk])
+        else:
+            raw = archive.read(self.members[chunk])
+        return self.decode(raw)
+
+    def iter_chunks(self):
+        """Yield every chunk in order, from a separate archive handle so it
+        can run in a worker thread"""
+        with zipfile.ZipFile(self.session.path) as archive:
+            for chunk in range(self.session.chunk_count):
+                yield self.load_chunk(chunk, archive)
+
+    def chunk(self, chunk):
+        """Decoded samples of one chunk, cached"""
+        data, _ = self.session.cache.get(
+            (self.number, chunk), lambda: (self.load_chunk(chunk),) * 2
+        )
+        return data
+
+    def summarize_chunk(self, chunk, data):
+        """Fill the block summaries of one decoded chunk"""
+        session = self.session
+        e0, e1 = session.chunk_entries[chunk], session.chunk_entries[chunk + 1]
+        offsets = session.entry_starts[e0:e1] - session.chunk_starts[chunk]
+        data = np.asarray(data, dtype=np.float64)
+        self.mins[e0:e1] = np.minimum.reduceat(data, offsets)
+        self.maxs[e0:e1] = np.maximum.reduceat(data, offsets)
+        self.sums[e0:e1] = np.add.reduceat(data, offsets)
+        self.squares[e0:e1] = np.add.reduceat(data * data, offsets)
+
+    def read(self, start, stop):
+        """Raw samples [start, stop), decoding the chunks they span"""
+        session = self.session
+        start, stop = max(0, start), min(session.length, stop)
+        if stop <= start:
+            return np.empty(0, dtype=np.float32)
+
+        first = int(np.searchsorted(session.chunk_starts, start, side="right")) - 1
+        last = int(np.searchsorted(session.chunk_starts, stop, side="left"))
+        parts = []
+        for chunk in range(first, last):
+            base = session.chunk_starts[chunk]
+            data = self.chunk(chunk)
+            parts.append(data[max(start - base, 0) : stop - base])
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def _whole_entries(self, start, stop):
+        """Summary entries [e0, e1) lying completely inside [start, stop)"""
+        session = self.session
+        e0 = int(np.searchsorted(session.entry_starts, start, side="left"))
+        e1 = int(np.searchsorted(session.entry_ends, stop, side="right"))
+        return e0, max(e0, e1)
+
+    def _split(self, start, stop):
+        """Split [start, stop) into whole summary entries and raw edge ranges"""
+        session = self.session
+        e0, e1 = self._whole_entries(start, stop)
+        if e0 == e1:
+            return e0, e1, [(start, stop)]
+        edges = [(start, session.entry_starts[e0]), (session.entry_ends[e1 - 1], stop)]
+        return e0, e1, [(a, b) for a, b in edges if b > a]
+
+    def range_min_max(self, start, stop):
+        """(min, max) of samples [start, stop)"""
+        e0, e1, edges = self._split(start, stop)
+        lo, hi = [], []
+        if e1 > e0:
+            lo.append(self.mins[e0:e1].min())
+            hi.append(self.maxs[e0:e1].max())
+        for a, b in edges:
+            data = self.read(a, b)
+            lo.append(data.min())
+            hi.append(data.max())
+        if not lo:
+            raise ValueError("Empty sample range")
+        return min(lo), max(hi)
+
+    def _sum(self, start, stop, summary, power):
+        e0, e1, edges = self._split(start, stop)
+        total = float(summary[e0:e1].sum())
+        for a, b in edges:
+            data = self.read(a, b).astype(np.float64)
+            total += float(np.sum(data**power))
+        return total
+
+    def sum(self, start, stop):
+        return self._sum(start, stop, self.sums, 1)
+
+    def sum_squares(self, start, stop):
+        return self._sum(start, stop, self.squares, 2)
+
+    def query(self, start, stop, max_points):
+        """Decimate samples [start, stop) to at most ~max_points points
+
+        Every channel of a session splits a range into the same blocks, so
+        all channels share the x positions of the decimated data.
+        """
+        session = self.session
+        start = max(0, int(start))
+        stop = min(session.length, int(stop))
+        if stop <= start:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        span = stop - start
+        if span <= max_points:
+            return np.arange(start, stop), self.read(start, stop)
+
+        block = -(-2 * span // max(2, max_points))
+        if block < session.SUMMARY_BLOCK:
+            # Fine view: decode the covered chunks and reduce them directly
+            data = self.read(start, stop)
+            block_starts = np.arange(start, stop, block, dtype=np.int64)
+            offsets = block_starts - start
+            mins = np.minimum.reduceat(data, offsets)
+            maxs = np.maximum.reduceat(data, offsets)
+            block_ends = np.append(block_starts[1:], stop)
+        else:
+            # Coarse view: reduce groups of block summaries
+            group = block // session.SUMMARY_BLOCK
+            e0 = int(np.searchsorted(session.entry_starts, start, side="right")) - 1
+            e1 = int(np.searchsorted(session.entry_starts, stop, side="left"))
+            groups = np.arange(e0, e1, group)
+            mins = np.minimum.reduceat(self.mins[e0:e1], groups - e0)
+            maxs = np.maximum.reduceat(self.maxs[e0:e1], groups - e0)
+            block_starts = session.entry_starts[groups]
+            block_ends = np.append(block_starts[1:], session.entry_ends[e1 - 1])
+
+        # min at block start, max at block middle
+        indices = np.empty(2 * len(mins), dtype=np.int64)
+        indices[0::2] = block_starts
+        indices[1::2] = (block_starts + block_ends) // 2
+        values = np.empty(2 * len(mins), dtype=np.float64)
+        values[0::2] = mins
+        values[1::2] = maxs
+        return indices, values
+
+
+class SrSession:
+    """A sigrok session (.sr zip) as written by np2srzip, opened lazily.
+
+    Opening only reads the metadata and the zip directory; chunk lengths come
+    from the uncompressed member sizes, so nothing is decoded up front.
+    """
+
+    SUMMARY_BLOCK = 1024  # samples per summary entry
+    CACHE_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, path):
+        self.path = path
+        self.archive = zipfile.ZipFile(path)
+        self.archive_lock = threading.Lock()
+        self.cache = TileCache(SrSession.CACHE_BYTES)
+
+        config = configparser.ConfigParser(interpolation=None, strict=False)
+        config.read_string(self.archive.read("metadata").decode("utf-8"))
+        device = config["device 1"]
+        self.samplerate = parse_samplerate(device.get("samplerate", "1 Hz"))
+        num_digital = device.getint("total probes", 0)
+        num_analog = device.getint("total analog", 0)
+        self.unitsize = device.getint("unitsize", 0)
+
+        sizes = {info.filename: info.file_size for info in self.archive.infolist()}
+        analog_chunks = {}
+        logic_chunks = {}
+        for name in sizes:
+            match = ANALOG_MEMBER.match(name)
+            if match:
+                probe, chunk = map(int, match.groups())
+                analog_chunks.setdefault(probe, {})[chunk] = name
+            match = LOGIC_MEMBER.match(name)
+            if match:
+                logic_chunks[int(match.group(1))] = name
+
+        # Chunk lengths from the first stream that has chunks
+        if analog_chunks:
+            probe = min(analog_chunks)
+            reference = analog_chunks[probe]
+            lengths = [sizes[reference[k]] // 4 for k in sorted(reference)]
+        elif logic_chunks and self.unitsize:
+            reference = logic_chunks
+            lengths = [sizes[reference[k]] // self.unitsize for k in sorted(reference)]
+        else:
+            raise ValueError(f"No sample data in session {path}")
+        chunk_numbers = sorted(reference)
+
+        self.chunk_starts = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        self.length = int(self.chunk_starts[-1])
+
+        # Summary entries never cross chunk boundaries
+        block = SrSession.SUMMARY_BLOCK
+        entry_counts = [-(-n // block) for n in lengths]
+        self.chunk_entries = np.concatenate(([0], np.cumsum(entry_counts))).astype(np.int64)
+        self.entry_starts = np.concatenate(
+            [np.arange(s, s + n, block) for s, n in zip(self.chunk_starts, lengths)]
+        ).astype(np.int64)
+        self.entry_ends = np.minimum(
+            self.entry_starts + block,
+            np.repeat(self.chunk_starts[1:], entry_counts),
+        )
+
+        self.channels = []
+        for j in range(1, num_analog + 1):
+            probe = num_digital + j
+            chunks = analog_chunks.get(probe, {})
+            name = device.get(f"analog{probe}", f"A{j - 1}")
+            if len(chunks) == len(chunk_numbers):
+                members = [chunks[k] for k in chunk_numbers]
+                self.channels.append(
+                    SessionChannel(self, len(self.channels), name, members, self._decode_analog)
+                )
+        if logic_chunks and self.unitsize:
+            members = [logic_chunks[k] for k in chunk_numbers]
+            for i in range(num_digital):
+                name = device.get(f"probe{i + 1}", f"D{i}")
+                if name == DUMMY_PROBE or i >= 8 * self.unitsize:
+                    continue
+                decode = lambda data, bit=i: self._decode_logic(data, bit)
+                self.channels.append(
+                    SessionChannel(self, len(self.channels), name, members, decode)
+                )
+        if not self.channels:
+            raise ValueError(f"No channels in session {path}")
+
+    @staticmethod
+    def _decode_analog(data):
+        return np.frombuffer(data, dtype="<f4")
+
+    def _decode_logic(self, data, bit):
+        frames = np.frombuffer(data, dtype=np.uint8).reshape(-1, self.unitsize)
+        return ((frames[:, bit // 8] >> (bit % 8)) & 1).astype(np.float32)
+
+    def __len__(self):
+        return self.length
+
+    @property
+    def chunk_count(self):
+        return len(self.chunk_starts) - 1
+
+    def close(self):
+        with self.archive_lock:
+            self.archive.close()
+
+
+class SessionIndexer(QThread):
+    """Decode a session chunk by chunk in the background to fill the summaries"""
+
+    progress = pyqtSignal(int)  # percent of chunks summarized
+
+    def __init__(self, session, parent=None):
+        super().__init__(parent)
+        self.session = session
+        self.filename = session.path
+        self.cancelled = False
+        self.error = None  # set when decoding fails, checked once finished
+
+    def cancel(self):
+        """Ask the worker to stop after the current chunk"""
+        self.cancelled = True
+
+    def run(self):
+        try:
+            # Own archive handle, the GUI thread keeps reading the session's
+            with zipfile.ZipFile(self.session.path) as archive:
+                count = self.session.chunk_count
+                percent = -1
+                for chunk in range(count):
+                    for channel in self.session.channels:
+                        if self.cancelled:
+                            return
+                        channel.summarize_chunk(chunk, channel.load_chunk(chunk, archive))
+                    if 100 * (chunk + 1) // count != percent:
+                        percent = 100 * (chunk + 1) // count
+                        self.progress.emit(percent)
+        except Exception as e:
+            self.error = str(e)
@@ -0,0 +1,255 @@
+import os
+import select
+import socket
+import sys
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+from PyQt5.QtCore import QThread
+
+from data_loader import parse_numeric_block
+
+
+class RingBuffer:
+    """Preallocated ring buffer of the latest samples of a stream.
+
+    Every sample is stored twice, at i and i + capacity, so the latest n
+    samples are always one contiguous view, copied with a single memcpy.
+    ``snapshot`` pins such a copy once per frame; ``query`` and
+    ``range_min_max`` read that pinned frame, never the live ring a writer
+    may be overwriting, so their indices stay those of the snapshot.
+    ``query`` has the same interface as ``MinMaxPyramid.query`` with indices
+    relative to the oldest sample of the frame, and decimates into scratch
+    buffers that are reused from frame to frame.
+    """
+
+    def __init__(self, capacity, dtype=np.float64):
+        self.capacity = int(capacity)
+        self.data = np.zeros(2 * self.capacity, dtype=dtype)
+        self.head = 0  # next write position in [0, capacity)
+        self.count = 0  # samples stored, at most capacity
+        self.total = 0  # samples written since creation
+        self.lock = threading.Lock()
+        self.frame = np.empty(0, dtype=dtype)  # samples of the last snapshot
+
+        self._ramp = np.empty(0, dtype=np.int64)
+        self._indices = np.empty(0, dtype=np.int64)
+        self._values = np.empty(0, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def write(self, samples):
+        """Append a block of samples, overwriting the oldest ones"""
+        samples = np.asarray(samples)
+        if len(samples) > self.capacity:
+            skipped = len(samples) - self.capacity
+            samples = samples[skipped:]
+        else:
+            skipped = 0
+        m = len(samples)
+        if m == 0:
+            return
+
+        cap = self.capacity
+        with self.lock:
+            first = min(m, cap - self.head)
+            for offset in (0, cap):
+                a = self.head + offset
+                self.data[a : a + first] = samples[:first]
+                self.data[offset : offset + m - first] = samples[first:]
+            self.head = (self.head + m) % cap
+            self.count = min(cap, self.count + m)
+            self.total += skipped + m
+
+    @property
+    def y(self):
+        """Samples of the last snapshot, oldest first"""
+        return self.frame
+
+    def _stored(self):
+        """Contiguous view of the stored samples, oldest first, under lock"""
+        start = (self.head - self.count) % self.capacity
+        return self.data[start : start + self.count]
+
+    def snapshot(self):
+        """(total samples written, copy of the stored samples) taken atomically
+
+        The copy becomes the frame read by ``query`` and ``range_min_max``;
+        later writes never change it.
+        """
+        with self.lock:
+            total, self.frame = self.total, self._stored().copy()
+        return total, self.frame
+
+    def range_min_max(self, start, stop):
+        """(min, max) of frame samples [start, stop), reduced directly"""
+        y = self.frame[max(0, int(start)) : int(stop)]
+        if len(y) == 0:
+            raise ValueError("Empty sample range")
+        return y.min(), y.max()
+
+    def _scratch(self, n):
+        if len(self._indices) < n:
+            self._ramp = np.arange(n, dtype=np.int64)
+            self._indices = np.empty(n, dtype=np.int64)
+            self._values = np.empty(n, dtype=np.float64)
+        return self._ramp[:n], self._indices[:n], self._values[:n]
+
+    def query(self, start, stop, max_points):
+        """Decimate frame samples [start, stop) to at most ~max_points points"""
+        y = self.frame
+        start = max(0, int(start))
+        stop = min(len(y), int(stop))
+        if stop <= start:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        span = stop - start
+        if span <= max_points:
+            ramp, indices, values = self._scratch(span)
+            np.add(ramp, start, out=indices)
+            values[:] = y[start:stop]
+            return indices, values
+
+        # min and max of each block, the partial tail block is dropped
+        k = -(-2 * span // max(2, max_points))
+        blocks = span // k
+        ramp, indices, values = self._scratch(2 * blocks)
+        window = y[start : start + blocks * k].reshape(blocks, k)
+        window.min(axis=1, out=values[0::2])
+        window.max(axis=1, out=values[1::2])
+        np.multiply(ramp[:blocks], k, out=indices[0::2])
+        indices[0::2] += start
+        np.add(indices[0::2], k // 2, out=indices[1::2])
+        return indices, values
+
+
+def parse_source(spec):
+    """Split a stream source spec into (kind, address, dtype)
+
+    Supported: '-' (stdin), 'udp://host:port', 'tcp://host:port' and a file
+    or FIFO path. A '?dtype=<i2' suffix selects raw binary samples instead of
+    whitespace separated text.
+    """
+    parts = urlsplit(spec)
+    dtype = parse_qs(parts.query).get("dtype", [None])[0]
+    dtype = np.dtype(dtype) if dtype else None
+
+    if parts.scheme in ("udp", "tcp"):
+        if parts.port is None:
+            raise ValueError(f"Missing port in stream source: {spec}")
+        return parts.scheme, (parts.hostname or "0.0.0.0", parts.port), dtype
+    path = spec.split("?", 1)[0]
+    if path == "-":
+        return "pipe", None, dtype
+    return "file", path, dtype
+
+
+class StreamReader(QThread):
+    """Read samples from a pipe, socket or growing file into a RingBuffer"""
+
+    READ_SIZE = 1024 * 1024
+    POLL_INTERVAL = 0.05  # seconds between checks of an idle file
+    TIMEOUT = 0.2  # socket timeout, bounds the reaction time to cancel()
+
+    def __init__(self, spec, ring, parent=None):
+        super().__init__(parent)
+        self.spec = spec
+        self.ring = ring
+        self.kind, self.address, self.dtype = parse_source(spec)
+        self.cancelled = False
+        self.error = None  # set when reading fails, checked once finished
+        self._remainder = b""
+
+    def cancel(self):
+        """Ask the worker to stop after the current read"""
+        self.cancelled = True
+
+    def feed(self, data):
+        """Parse a block of raw bytes and push the samples into the ring"""
+        data = self._remainder + data
+        if self.dtype is not None:
+            # Keep a partial trailing sample for the next block
+            cut = len(data) - len(data) % self.dtype.itemsize
+            samples = np.frombuffer(data[:cut], dtype=self.dtype)
+        else:
+            cut = data.rfind(b"\n") + 1
+            samples = parse_numeric_block(data[:cut]) if cut else None
+        self._remainder = data[cut:]
+        if samples is not None and len(samples):
+            self.ring.write(samples)
+
+    def run(self):
+        try:
+            if self.kind == "udp":
+                self._read_udp()
+            elif self.kind == "tcp":
+                self._read_tcp()
+            elif self.kind == "pipe":
+                self._read_pipe(sys.stdin.fileno(), follow=False)
+            elif os.path.isfile(self.address):
+                self._read_file()
+            else:
+                # FIFO: non-blocking open does not wait for a writer
+                fd = os.open(self.address, os.O_RDONLY | getattr(os, "O_NONBLOCK", 0))
+                try:
+                    self._read_pipe(fd, follow=True)
+                finally:
+                    os.close(fd)
+        except Exception as e:
+            self.error = str(e)
+
+    def _read_file(self):
+        """Follow a growing regular file from its current end, like tail -f"""
+        with open(self.address, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            while not self.cancelled:
+                data = f.read(StreamReader.READ_SIZE)
+                if data:
+                    self.feed(data)
+                else:
+                    time.sleep(StreamReader.POLL_INTERVAL)
+
+    def _read_pipe(self, fd, follow):
+        """Read a pipe, waking up regularly to check for cancel()"""
+        while not self.cancelled:
+            ready, _, _ = select.select([fd], [], [], StreamReader.TIMEOUT)
+            if not ready:
+                continue
+            try:
+                data = os.read(fd, StreamReader.READ_SIZE)
+            except BlockingIOError:
+                continue
+            if data:
+                self.feed(data)
+            elif follow:
+                time.sleep(StreamReader.POLL_INTERVAL)  # no writer attached
+            else:
+                break
+
+    def _read_udp(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.bind(self.address)
+            sock.settimeout(StreamReader.TIMEOUT)
+            while not self.cancelled:
+                try:
+                    data = sock.recv(65536)
+                except socket.timeout:
+                    continue
+                if self.dtype is None and not data.endswith(b"\n"):
+                    data += b"\n"  # one datagram holds whole lines
+                self.feed(data)
+
+    def _read_tcp(self):
+        with socket.create_connection(self.address, StreamReader.TIMEOUT * 10) as sock:
+            sock.settimeout(StreamReader.TIMEOUT)
+            while not self.cancelled:
+                try:
+                    data = sock.recv(StreamReader.READ_SIZE)
+                except socket.timeout:
+                    continue
+                if not data:
+                    break
+                self.feed(data)
@@ -0,0 +1,92 @@
+import numpy as np
+
+from lod import MinMaxPyramid
+
+
+class PrefixSums:
+    """Prefix sums of y and y**2, sums[i] = y[0] + ... + y[i - 1].
+
+    Sum, mean and RMS of any sample range are O(1). Like the LOD pyramid the
+    sums can be built from a complete array or grown with ``append``.
+    """
+
+    CHUNK = 1 << 22  # samples per cumsum pass when building from an array
+
+    def __init__(self, y=None):
+        self._sums = np.zeros(1)
+        self._squares = np.zeros(1)
+        self.sums = self._sums
+        self.squares = self._squares
+        if y is not None:
+            for a in range(0, len(y), PrefixSums.CHUNK):
+                self.append(y[a : a + PrefixSums.CHUNK])
+
+    @classmethod
+    def from_arrays(cls, sums, squares):
+        """Wrap prefix arrays built elsewhere, e.g. memory-mapped from a cache"""
+        prefix = cls()
+        prefix.sums = prefix._sums = sums
+        prefix.squares = prefix._squares = squares
+        return prefix
+
+    def __len__(self):
+        return len(self.sums) - 1
+
+    def append(self, samples):
+        """Extend the sums by a block of samples"""
+        samples = np.asarray(samples, dtype=np.float64)
+        if len(samples) == 0:
+            return
+
+        old = len(self.sums)
+        new = old + len(samples)
+        self._sums = MinMaxPyramid._grow(self._sums, new, old)
+        self._squares = MinMaxPyramid._grow(self._squares, new, old)
+        np.cumsum(samples, out=self._sums[old:new])
+        self._sums[old:new] += self._sums[old - 1]
+        np.cumsum(samples * samples, out=self._squares[old:new])
+        self._squares[old:new] += self._squares[old - 1]
+        self.sums = self._sums[:new]
+        self.squares = self._squares[:new]
+
+    def sum(self, start, stop):
+        return float(self.sums[stop] - self.sums[start])
+
+    def sum_squares(self, start, stop):
+        return float(self.squares[stop] - self.squares[start])
+
+
+def window_stats(pyramid, prefix, start, stop, step=None):
+    """min, max, mean, RMS and integral of samples [start, stop)
+
+    Uses the pyramid for min/max and the prefix sums for the rest. Without
+    prefix sums (live streams) the samples are reduced directly. The integral
+    uses the trapezoidal rule and needs the sample spacing step.
+    Returns None for an empty range.
+    """
+    start = max(0, int(start))
+    stop = min(len(pyramid.y), int(stop))
+    n = stop - start
+    if n <= 0:
+        return None
+
+    lo, hi = pyramid.range_min_max(start, stop)
+    if prefix is None:
+        y = np.asarray(pyramid.y[start:stop], dtype=np.float64)
+        total, squares = float(y.sum()), float(np.dot(y, y))
+    else:
+        total = prefix.sum(start, stop)
+        squares = prefix.sum_squares(start, stop)
+
+    stats = {
+        "samples": n,
+        "min": float(lo),
+        "max": float(hi),
+        "mean": total / n,
+        "rms": float(np.sqrt(max(squares, 0.0) / n)),
+        "integral": None,
+    }
+    if step is not None:
+        ends = float(pyramid.y[start]) + float(pyramid.y[stop - 1])
+        stats["integral"] = step * (total - ends / 2)
+    return stats
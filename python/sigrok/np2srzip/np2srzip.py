@@ -1,7 +1,5 @@
 import numpy as np
-import struct
 import zipfile
-import io
 import math
 from typing import Optional, List, Union
 
@@ -23,6 +21,33 @@ def _format_samplerate(rate: Union[int, float, str]) -> str:
         return f"{rate} Hz"
 
 
+def _pack_logic_chunk(
+    chunk: np.ndarray, unitsize: int, threshold: Optional[float] = None
+) -> bytes:
+    """
+    Pack a (samples, channels) chunk into `unitsize` bytes per sample.
+    Channel 0 is the LSB of byte 0; channels beyond unitsize * 8 are dropped.
+    A sample is high if nonzero, or above `threshold` when one is given.
+    """
+    bits = np.zeros((chunk.shape[0], unitsize * 8), dtype=np.uint8)
+    width = min(chunk.shape[1], unitsize * 8)
+    if threshold is None:
+        bits[:, :width] = chunk[:, :width] != 0
+    else:
+        bits[:, :width] = chunk[:, :width] > threshold
+    return np.packbits(bits, axis=1, bitorder="little").tobytes()
+
+
+def _encode_analog_chunk(
+    column: np.ndarray, scale: float = 1.0, offset: float = 0.0
+) -> bytes:
+    """Encode one analog channel chunk as little-endian float32 samples,
+    (column + offset) * scale."""
+    if scale != 1.0 or offset != 0.0:
+        column = (np.asarray(column, dtype=np.float64) + offset) * scale
+    return np.asarray(column, dtype="<f4").tobytes()
+
+
 def np2srzip(
     logic: Optional[np.ndarray],
     analog: Optional[np.ndarray],
@@ -32,11 +57,20 @@ def np2srzip(
     digital_names: Optional[List[str]] = None,
     analog_names: Optional[List[str]] = None,
     sigrok_version: str = "0.5.2",
+    analog_scale: float = 1.0,
+    analog_offset: float = 0.0,
+    logic_threshold: Optional[float] = None,
 ):
     """
     Convert logic + analog arrays to a PulseView compatible srzip file.
     Each analog channel per chunk has its own file.
     Automatically handles analog-only datasets by creating a dummy digital channel.
+
+    Inputs are only read one chunk at a time, so np.memmap arrays of raw ADC
+    counts can be passed directly; `analog_scale` is applied per chunk while
+    converting to float32, after adding `analog_offset` (-128 centers unsigned
+    8-bit samples). Likewise `logic` may hold raw values: with
+    `logic_threshold` set, samples above it are high, otherwise nonzero ones.
     """
     num_samples = 0
     num_digital = 0
@@ -52,9 +86,10 @@ def np2srzip(
                 "Logic and analog arrays must have the same number of samples"
             )
 
-    # Handle analog-only: create dummy digital channel
+    # Handle analog-only: create dummy digital channel, written as zero bytes
+    dummy_logic = False
     if (logic is None or num_digital == 0) and num_analog > 0:
-        logic = np.zeros((num_samples, 1), dtype=np.uint8)
+        dummy_logic = True
         num_digital = 1
         digital_names = ["Dummy"]
         print("Added dummy digital channel for analog-only dataset.")
@@ -101,27 +136,28 @@ def np2srzip(
             chunk_no = chunk_idx // chunk_size + 1
 
             # Digital
-            if num_digital > 0:
-                buf = io.BytesIO()
-                for row in logic[chunk_idx:chunk_end]:
-                    sample_bytes = bytearray(unitsize)
-                    for ch in range(num_digital):
-                        if row[ch]:
-                            byte_index = ch // 8
-                            bit_index = ch % 8
-                            if byte_index < unitsize:
-                                sample_bytes[byte_index] |= 1 << bit_index
-                    buf.write(sample_bytes)
-                z.writestr(f"logic-1-{chunk_no}", buf.getvalue())
+            if dummy_logic:
+                z.writestr(
+                    f"logic-1-{chunk_no}", bytes(unitsize * (chunk_end - chunk_idx))
+                )
+            elif num_digital > 0:
+                z.writestr(
+                    f"logic-1-{chunk_no}",
+                    _pack_logic_chunk(
+                        logic[chunk_idx:chunk_end], unitsize, logic_threshold
+                    ),
+                )
 
             # Analog: each channel its own file
             if num_analog > 0:
                 for ch in range(num_analog):
-                    buf = io.BytesIO()
-                    for val in analog[chunk_idx:chunk_end, ch]:
-                        buf.write(struct.pack("<f", float(val)))
                     probe_no = num_digital + ch + 1
-                    z.writestr(f"analog-1-{probe_no}-{chunk_no}", buf.getvalue())
+                    z.writestr(
+                        f"analog-1-{probe_no}-{chunk_no}",
+                        _encode_analog_chunk(
+                            analog[chunk_idx:chunk_end, ch], analog_scale, analog_offset
+                        ),
+                    )
 
     print(
         f"Written {sr_file} with {num_samples} samples, "
@@ -0,0 +1,51 @@
+import struct
+import zipfile
+
+import numpy as np
+import pytest
+
+from np2srzip.np2srzip import _encode_analog_chunk, _pack_logic_chunk, np2srzip
+
+
+def pack_per_sample(chunk, unitsize, threshold=None):
+    """The former packing, one sample and channel at a time"""
+    out = bytearray()
+    for row in chunk:
+        sample_bytes = bytearray(unitsize)
+        for ch in range(chunk.shape[1]):
+            high = row[ch] > threshold if threshold is not None else row[ch] != 0
+            if high and ch // 8 < unitsize:
+                sample_bytes[ch // 8] |= 1 << (ch % 8)
+        out += sample_bytes
+    return bytes(out)
+
+
+@pytest.mark.parametrize("channels", [1, 7, 8, 9, 16, 33])
+@pytest.mark.parametrize("threshold", [None, 0, 0.5, 128])
+def test_pack_logic_chunk_matches_per_sample_packing(channels, threshold):
+    rng = np.random.default_rng(channels)
+    chunk = rng.integers(-3, 256, size=(50, channels)).astype(np.int16)
+    unitsize = min(4, -(-channels // 8))
+    assert _pack_logic_chunk(chunk, unitsize, threshold) == pack_per_sample(chunk, unitsize, threshold)
+
+
+@pytest.mark.parametrize("dtype", ["u1", "<i2", "<f8"])
+@pytest.mark.parametrize("scale, offset", [(1.0, 0.0), (0.001, 0.0), (2.5, -128.0)])
+def test_encode_analog_chunk_scales_per_sample(dtype, scale, offset):
+    column = np.random.default_rng(1).integers(0, 256, size=100).astype(dtype)
+    expected = b"".join(struct.pack("<f", (float(v) + offset) * scale) for v in column)
+    assert _encode_analog_chunk(column, scale, offset) == expected
+
+
+def test_streamed_chunks_equal_whole_conversion(tmp_path):
+    raw = np.random.default_rng(2).integers(0, 256, size=(250, 2)).astype(np.uint8)
+    path = tmp_path / "out.sr"
+    np2srzip(None, raw, str(path), 1000, chunk_size=64, analog_scale=0.5, analog_offset=-128)
+
+    with zipfile.ZipFile(path) as z:
+        for ch in range(2):
+            members = [f"analog-1-{ch + 2}-{n}" for n in range(1, 5)]
+            values = np.concatenate([np.frombuffer(z.read(m), dtype="<f4") for m in members])
+            np.testing.assert_array_equal(values, ((raw[:, ch] - 128.0) * 0.5).astype(np.float32))
+        # The dummy logic channel is all low
+        assert z.read("logic-1-4") == bytes(250 - 3 * 64)
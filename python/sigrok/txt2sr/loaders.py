@@ -0,0 +1,251 @@
+import os
+import struct
+import zipfile
+from collections import namedtuple
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+SOURCE_FORMATS = ["auto", "text", "binary", "npy", "wav"]
+RAW_DTYPES = [
+    "int8",
+    "uint8",
+    "int16",
+    "uint16",
+    "int32",
+    "uint32",
+    "float32",
+    "float64",
+]
+ENDIANNESS = ["little", "big"]
+
+_EXTENSION_FORMATS = {
+    ".txt": "text",
+    ".dat": "text",
+    ".csv": "text",
+    ".bin": "binary",
+    ".raw": "binary",
+    ".npy": "npy",
+    ".npz": "npy",
+    ".wav": "wav",
+}
+
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_IEEE_FLOAT = 0x0003
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+WavInfo = namedtuple(
+    "WavInfo", ["samplerate", "channels", "dtype", "data_offset", "frames", "offset"]
+)
+
+
+def detect_format(path: str) -> str:
+    """Guess the source format from the file extension, defaulting to text"""
+    ext = os.path.splitext(path)[1].lower()
+    return _EXTENSION_FORMATS.get(ext, "text")
+
+
+def _as_columns(data: np.ndarray) -> np.ndarray:
+    """Return data as (samples, channels) without copying"""
+    if data.ndim == 1:
+        return data.reshape(-1, 1)
+    if data.ndim != 2:
+        raise ValueError(f"Expected 1D or 2D data, got shape {data.shape}")
+    return data
+
+
+def load_text(path: str) -> np.ndarray:
+    """Load whitespace separated text, skipping '=' comment lines"""
+    return _as_columns(np.atleast_1d(np.genfromtxt(path, dtype=float, comments="=")))
+
+
+def load_raw_binary(
+    path: str,
+    dtype: str = "int16",
+    channels: int = 1,
+    endianness: str = "little",
+) -> np.memmap:
+    """
+    Memory-map a headerless binary capture with interleaved channels.
+    Trailing bytes that do not form a whole frame are ignored.
+    """
+    if dtype not in RAW_DTYPES:
+        raise ValueError(f"Unsupported raw dtype: {dtype}")
+    if endianness not in ENDIANNESS:
+        raise ValueError(f"Unsupported endianness: {endianness}")
+    if channels < 1:
+        raise ValueError("Channel count must be at least 1")
+
+    np_dtype = np.dtype(dtype).newbyteorder("<" if endianness == "little" else ">")
+    frames = os.path.getsize(path) // (np_dtype.itemsize * channels)
+    if frames == 0:
+        raise ValueError(f"File too small for one {channels}-channel {dtype} frame")
+    return np.memmap(path, dtype=np_dtype, mode="r", shape=(frames, channels))
+
+
+def _memmap_npz_member(path: str, info: zipfile.ZipInfo) -> Optional[np.memmap]:
+    """Memory-map an uncompressed .npy member of an .npz archive in place"""
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+
+    with open(path, "rb") as f:
+        # Local file header: 30 fixed bytes, then name and extra field
+        f.seek(info.header_offset)
+        header = f.read(30)
+        name_len, extra_len = struct.unpack("<HH", header[26:30])
+        member_start = info.header_offset + 30 + name_len + extra_len
+
+        f.seek(member_start)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        elif version == (2, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        else:
+            return None
+        data_offset = f.tell()
+
+    if dtype.hasobject:
+        return None
+    return np.memmap(
+        path,
+        dtype=dtype,
+        mode="r",
+        offset=data_offset,
+        shape=shape,
+        order="F" if fortran_order else "C",
+    )
+
+
+def load_npy(path: str, key: Optional[str] = None) -> np.ndarray:
+    """
+    Load a .npy file (memory-mapped) or one array of an .npz archive.
+    Uncompressed .npz members are memory-mapped as well; compressed ones
+    have to be inflated into memory. Without `key` the first array is used.
+    """
+    if not zipfile.is_zipfile(path):
+        return _as_columns(np.load(path, mmap_mode="r"))
+
+    with zipfile.ZipFile(path) as z:
+        members = [i for i in z.infolist() if i.filename.endswith(".npy")]
+        if not members:
+            raise ValueError(f"No arrays found in {path}")
+        if key is None:
+            info = members[0]
+        else:
+            info = next((i for i in members if i.filename == f"{key}.npy"), None)
+            if info is None:
+                raise KeyError(f"Array '{key}' not found in {path}")
+
+    data = _memmap_npz_member(path, info)
+    if data is None:
+        with np.load(path) as npz:
+            data = npz[info.filename[: -len(".npy")]]
+    return _as_columns(data)
+
+
+def read_wav_header(path: str) -> WavInfo:
+    """Parse the RIFF/WAVE chunks up to the start of the sample data"""
+    with open(path, "rb") as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            raise ValueError(f"Not a RIFF/WAVE file: {path}")
+
+        fmt = None
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                raise ValueError("WAV file has no data chunk")
+            chunk_id, chunk_len = struct.unpack("<4sI", chunk_header)
+
+            if chunk_id == b"fmt ":
+                fmt = f.read(chunk_len)
+                if chunk_len % 2:
+                    f.seek(1, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                data_offset = f.tell()
+                data_len = chunk_len
+                break
+            else:
+                # Chunks are word aligned
+                f.seek(chunk_len + (chunk_len % 2), os.SEEK_CUR)
+
+    if fmt is None or len(fmt) < 16:
+        raise ValueError("WAV file has no valid fmt chunk")
+
+    format_tag, channels, samplerate, _, block_align, bits = struct.unpack(
+        "<HHIIHH", fmt[:16]
+    )
+    if format_tag == _WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+        # First two bytes of the SubFormat GUID carry the actual format tag
+        format_tag = struct.unpack("<H", fmt[24:26])[0]
+
+    offset = 0.0
+    if format_tag == _WAVE_FORMAT_PCM and bits in (8, 16, 32):
+        dtype = {8: np.dtype("u1"), 16: np.dtype("<i2"), 32: np.dtype("<i4")}[bits]
+        if bits == 8:
+            # 8-bit PCM is unsigned, silence is 128
+            offset = -128.0
+    elif format_tag == _WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64):
+        dtype = np.dtype("<f4") if bits == 32 else np.dtype("<f8")
+    else:
+        raise ValueError(
+            f"Unsupported WAV encoding (format {format_tag:#06x}, {bits} bits)"
+        )
+
+    if block_align != dtype.itemsize * channels:
+        raise ValueError("WAV block alignment does not match sample format")
+
+    # Streamed writers may leave the data length unset, then size from the file
+    available = max(0, os.path.getsize(path) - data_offset)
+    if data_len in (0, 0xFFFFFFFF):
+        data_len = available
+    frames = min(data_len, available) // block_align
+    return WavInfo(samplerate, channels, dtype, data_offset, frames, offset)
+
+
+def load_wav(path: str) -> Tuple[np.memmap, int, float]:
+    """
+    Memory-map WAV sample data, returning (samples x channels, samplerate,
+    offset). The samples are left as stored; adding `offset` centers them
+    on zero, which only matters for unsigned 8-bit PCM.
+    """
+    info = read_wav_header(path)
+    if info.frames == 0:
+        raise ValueError("WAV file contains no samples")
+    data = np.memmap(
+        path,
+        dtype=info.dtype,
+        mode="r",
+        offset=info.data_offset,
+        shape=(info.frames, info.channels),
+    )
+    return data, info.samplerate, info.offset
+
+
+def load_source(
+    path: str,
+    fmt: str = "auto",
+    dtype: str = "int16",
+    channels: int = 1,
+    endianness: str = "little",
+) -> Tuple[np.ndarray, Optional[int], float]:
+    """
+    Load any supported capture as a (samples, channels) array.
+    Binary, .npy and WAV sources are memory-mapped rather than read.
+    Returns the data, the samplerate stored in the file, if any, and the
+    offset to add to the samples to center them on zero (see load_wav).
+    """
+    if fmt == "auto":
+        fmt = detect_format(path)
+
+    if fmt == "text":
+        return load_text(path), None, 0.0
+    if fmt == "binary":
+        return load_raw_binary(path, dtype, channels, endianness), None, 0.0
+    if fmt == "npy":
+        return load_npy(path), None, 0.0
+    if fmt == "wav":
+        return load_wav(path)
+    raise ValueError(f"Unknown source format: {fmt}")
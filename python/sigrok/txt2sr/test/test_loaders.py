@@ -0,0 +1,69 @@
+import struct
+
+import numpy as np
+import pytest
+
+from txt2sr.loaders import load_source, load_wav, read_wav_header
+
+
+def write_wav(path, samples, bits, samplerate=8000, trailing=b"", data_len=None):
+    """Write a PCM WAV of (frames, channels) samples, then trailing chunks"""
+    data = samples.tobytes()
+    channels = samples.shape[1]
+    block_align = channels * bits // 8
+    fmt = struct.pack("<HHIIHH", 1, channels, samplerate, samplerate * block_align, block_align, bits)
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt
+    body += b"data" + struct.pack("<I", len(data) if data_len is None else data_len) + data
+    if len(data) % 2:
+        body += b"\0"
+    body += trailing
+    path.write_bytes(b"RIFF" + struct.pack("<I", len(body)) + body)
+
+
+LIST_CHUNK = b"LIST" + struct.pack("<I", 12) + b"INFOISFT" + struct.pack("<I", 0)
+
+
+def test_trailing_chunk_is_not_read_as_samples(tmp_path):
+    path = tmp_path / "trailing.wav"
+    samples = np.arange(10, dtype="<i2").reshape(-1, 1)
+    write_wav(path, samples, 16, trailing=LIST_CHUNK)
+    data, samplerate, offset = load_wav(str(path))
+    assert data.shape == (10, 1)
+    np.testing.assert_array_equal(data, samples)
+    assert (samplerate, offset) == (8000, 0.0)
+
+
+def test_odd_data_chunk_is_padded_before_trailing_chunk(tmp_path):
+    path = tmp_path / "odd.wav"
+    samples = np.arange(3, dtype="u1").reshape(-1, 1)
+    write_wav(path, samples, 8, trailing=LIST_CHUNK)
+    assert read_wav_header(str(path)).frames == 3
+
+
+def test_unset_data_length_reads_to_end_of_file(tmp_path):
+    path = tmp_path / "streamed.wav"
+    samples = np.arange(20, dtype="<i2").reshape(-1, 2)
+    write_wav(path, samples, 16, data_len=0xFFFFFFFF)
+    data, _, _ = load_wav(str(path))
+    np.testing.assert_array_equal(data, samples)
+
+
+def test_unsigned_8_bit_samples_are_centered(tmp_path):
+    path = tmp_path / "u8.wav"
+    samples = np.array([[0, 128], [128, 255], [255, 0]], dtype="u1")
+    write_wav(path, samples, 8, trailing=LIST_CHUNK)
+    data, _, offset = load_source(str(path))
+    assert offset == -128.0
+    np.testing.assert_array_equal(data + offset, samples.astype(np.float64) - 128)
+
+
+@pytest.mark.parametrize("fmt", ["text", "npy"])
+def test_other_sources_need_no_offset(tmp_path, fmt):
+    path = tmp_path / ("data.txt" if fmt == "text" else "data.npy")
+    if fmt == "text":
+        path.write_text("1 2\n3 4\n")
+    else:
+        np.save(path, np.array([[1, 2], [3, 4]], dtype=np.uint8))
+    data, samplerate, offset = load_source(str(path))
+    assert data.shape == (2, 2)
+    assert (samplerate, offset) == (None, 0.0)
@@ -1,11 +1,18 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, ttk
 import subprocess
-import numpy as np
 import os
 import threading
 
 from np2srzip.np2srzip import np2srzip
+from txt2sr.loaders import (
+    ENDIANNESS,
+    RAW_DTYPES,
+    SOURCE_FORMATS,
+    detect_format,
+    load_source,
+    read_wav_header,
+)
 
 
 class SRZipExporterApp:
@@ -63,6 +70,52 @@ class SRZipExporterApp:
         )
         self.type_combo.pack(side="left", padx=5)
 
+        # ==== Frame for input format and raw binary layout ====
+        format_frame = tk.Frame(root)
+        format_frame.pack(fill="x", padx=10, pady=5)
+
+        tk.Label(format_frame, text="Input Format:").pack(side="left")
+        self.input_format = tk.StringVar(value="auto")
+        ttk.Combobox(
+            format_frame,
+            textvariable=self.input_format,
+            values=SOURCE_FORMATS,
+            state="readonly",
+            width=8,
+        ).pack(side="left", padx=5)
+
+        # dtype/channels/endianness only apply to headerless binary files
+        tk.Label(format_frame, text="Raw dtype:").pack(side="left", padx=(10, 0))
+        self.raw_dtype = tk.StringVar(value="int16")
+        ttk.Combobox(
+            format_frame,
+            textvariable=self.raw_dtype,
+            values=RAW_DTYPES,
+            state="readonly",
+            width=8,
+        ).pack(side="left", padx=5)
+
+        tk.Label(format_frame, text="Channels:").pack(side="left", padx=(10, 0))
+        self.channels_entry = tk.Entry(format_frame, width=5)
+        self.channels_entry.insert(0, "1")
+        self.channels_entry.pack(side="left", padx=5)
+
+        tk.Label(format_frame, text="Endianness:").pack(side="left", padx=(10, 0))
+        self.endianness = tk.StringVar(value="little")
+        ttk.Combobox(
+            format_frame,
+            textvariable=self.endianness,
+            values=ENDIANNESS,
+            state="readonly",
+            width=8,
+        ).pack(side="left", padx=5)
+
+        # analog values are multiplied by scale while writing each chunk
+        tk.Label(format_frame, text="Scale:").pack(side="left", padx=(10, 0))
+        self.scale_entry = tk.Entry(format_frame, width=12)
+        self.scale_entry.insert(0, "1.0")
+        self.scale_entry.pack(side="left", padx=5)
+
         # ==== Frame for buttons ====
         button_frame = tk.Frame(root)
         button_frame.pack(fill="x", padx=10, pady=5)
@@ -100,9 +153,15 @@ class SRZipExporterApp:
         self.output_file = "output.sr"
 
     def browse_file(self):
-        """Browse and select input TXT file"""
+        """Browse and select input data file"""
         file = filedialog.askopenfilename(
-            filetypes=[("Text Files", "*.txt"), ("All Files", "*.*")]
+            filetypes=[
+                ("Text Files", "*.txt"),
+                ("Binary Files", "*.bin *.raw"),
+                ("NumPy Files", "*.npy *.npz"),
+                ("WAV Files", "*.wav"),
+                ("All Files", "*.*"),
+            ]
         )
         if file:
             self.file_entry.delete(0, tk.END)
@@ -118,6 +177,19 @@ class SRZipExporterApp:
             self.output_file = default_output
             self.log(f"Default output file: {default_output}")
 
+            # WAV files carry their own samplerate
+            if detect_format(file) == "wav":
+                try:
+                    info = read_wav_header(file)
+                    self.samplerate_entry.delete(0, tk.END)
+                    self.samplerate_entry.insert(0, f"{info.samplerate} Hz")
+                    self.log(
+                        f"WAV: {info.channels} channel(s), {info.dtype}, "
+                        f"{info.frames} frames @ {info.samplerate} Hz"
+                    )
+                except Exception as e:
+                    self.log(f"Error reading WAV header: {e}")
+
     def browse_output(self):
         """Browse and select output SRZip file"""
         file = filedialog.asksaveasfilename(
@@ -153,17 +225,41 @@ class SRZipExporterApp:
     def _do_export_sr(self):
         """Perform the actual export logic or analog depending on selection"""
         try:
-            raw_values = np.genfromtxt(self.data_file, dtype=float, comments="=")
+            # Binary, npy and wav sources come back memory-mapped and are
+            # streamed chunk by chunk into the srzip writer
+            raw_values, _, offset = load_source(
+                self.data_file,
+                self.input_format.get(),
+                dtype=self.raw_dtype.get(),
+                channels=int(self.channels_entry.get()),
+                endianness=self.endianness.get(),
+            )
+            scale = float(self.scale_entry.get())
             samplerate = self.samplerate_entry.get().strip()
+            self.log_async(
+                f"Source: {raw_values.shape[0]} samples x "
+                f"{raw_values.shape[1]} channel(s), {raw_values.dtype}"
+            )
 
             if self.data_type.get() == "logic":
-                # Logic: convert values >0 into 1, others 0
-                logic = (raw_values > 0).astype(np.uint8).reshape(-1, 1)
-                np2srzip(logic, None, self.output_file, samplerate)
+                # Logic: centered values >0 become 1, others 0, thresholded per chunk
+                np2srzip(
+                    raw_values,
+                    None,
+                    self.output_file,
+                    samplerate,
+                    logic_threshold=-offset,
+                )
             else:
-                # Analog: keep raw float values
-                analog = raw_values.astype(np.float32).reshape(-1, 1)
-                np2srzip(None, analog, self.output_file, samplerate)
+                # Analog: converted to float32 (and scaled) per chunk
+                np2srzip(
+                    None,
+                    raw_values,
+                    self.output_file,
+                    samplerate,
+                    analog_scale=scale,
+                    analog_offset=offset,
+                )
 
             self._finish_export(f"Exported SRZip: {self.output_file}", success=True)
         except Exception as e:
@@ -194,6 +290,10 @@ class SRZipExporterApp:
         except Exception as e:
             self.log(f"Error opening PulseView: {e}")
 
+    def log_async(self, message):
+        """Append a message to the log area from a worker thread"""
+        self.root.after(0, lambda: self.log(message))
+
     def log(self, message):
         """Append a message to the log area"""
         self.log_area.config(state="normal")
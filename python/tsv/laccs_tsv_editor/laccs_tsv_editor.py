@@ -8,7 +8,18 @@ import subprocess
 from datetime import datetime
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from fuzzywuzzy import fuzz, process
+from mvc.model.chunk_cache import ChunkCache
+from mvc.model.file_loader import FileLoader
+from mvc.model.fuzzy_search import column_index, row_texts
+from mvc.model.prefetcher import ChunkPrefetcher, ScrollPredictor
+from mvc.model.row_index import open_row_index, read_rows
+from mvc.model.search_index import INDEX_SUPPORTED, IndexBuilder
+from mvc.model.search_worker import SearchWorker
+from mvc.view.virtual_tree import VirtualTreeview
+
+
+LOAD_POLL_MS = 50  # Interval at which a loading tab takes over parsed rows
+SEARCH_DEBOUNCE_MS = 250  # Pause in typing after which the search starts
 
 
 class FileTab:
@@ -33,14 +44,26 @@ class FileTab:
 
         self.sort_column = None
         self.sort_direction = True
+        self.view_order = None  # Rows of data in the order shown after sorting, None for file order
         
         # Initialize lazy loading properties
         self.is_large_file = False
         self.file_size_threshold = 10 * 1024 * 1024  # Default 10MB threshold
         self.total_rows = 0
-        self.loaded_chunks = {}
-        self.chunk_size = 100000  # Load 100000 rows per chunk
-        self.currently_visible_range = (0, 0)
+        self.chunk_size = 100000  # Load 100000 rows per chunk, cached in parent.chunk_cache
+        self.row_index = None  # Byte offsets of every K-th row in lazy mode
+        self.scroll_predictor = ScrollPredictor(self.chunk_size)
+        self.search_texts = {}  # Searched column -> lower-cased row strings of data
+        self.search_worker = None  # SearchWorker of the running search
+        self.pending_search = None  # after() id of a search waiting for typing to pause
+        self.last_search = None  # TextMatches of the last search, to refine the next one
+        self.search_index = None  # SearchIndex of data, None while building or disabled
+        self.index_builder = None  # IndexBuilder while data is indexed in the background
+        
+        # Background loading state
+        self.tree = None
+        self.loader = None  # FileLoader while the file is being opened
+        self.progress_frame = None
         
         # Default template data
         self.template = {
@@ -116,27 +139,24 @@ class FileTab:
             # Use the threshold from parent TableManager instance
             self.file_size_threshold = self.parent.lazy_load_threshold * 1024 * 1024
             
+            self.reset_lazy_loading()
+            
             # Check file size to determine if lazy loading is needed
             file_size = os.path.getsize(self.filename)
             if file_size > self.file_size_threshold:
                 self.is_large_file = True
                 
-                # Just read headers and count total rows without loading all data
-                with open(self.filename, "r") as f:
-                    reader = csv.reader(f, delimiter="\t")
-                    # First row is always treated as headers
-                    self.headers = next(reader)
+                # Read headers and index row offsets without loading all data,
+                # reusing the saved index of an unchanged or appended file
+                headers, self.row_index = open_row_index(self.filename, skip_empty=True)
+                if headers is None:
+                    raise ValueError("File is empty")
+                # First row is always treated as headers
+                self.headers = headers
+                self.total_rows = self.row_index.rows
                     
-                    # Count total rows
-                    for _ in reader:
-                        self.total_rows += 1
-                        
-                    # Detect file format based on headers
-                    self.detect_format_and_set_template()
-                
-                messagebox.showinfo("Info", f"Loading large file: {self.filename}\n" \
-                                   f"Size: {file_size/1024/1024:.2f}MB, Total rows: {self.total_rows}\n" \
-                                   f"Using lazy loading to improve performance.")
+                # Detect file format based on headers
+                self.detect_format_and_set_template()
             else:
                 # For small files, load all data as before
                 with open(self.filename, "r") as f:
@@ -158,58 +178,190 @@ class FileTab:
             messagebox.showerror("Error", f"Error loading file: {str(e)}")
             self.data = []
             self.total_rows = 0
+        self.rebuild_search_index()
     
+    def reset_lazy_loading(self):
+        """Forget the row index and the chunks cached or queued by a previous load"""
+        self.row_index = None
+        self.parent.prefetcher.cancel(self)
+        self.parent.chunk_cache.discard(self)
+        self.scroll_predictor.reset()
+
+    def start_loading(self):
+        """Load the file in a worker thread, showing rows as they are parsed
+
+        The table is created as soon as the headers are read and grows
+        while the worker parses the file. Large files show their first rows
+        while the row index is built, then switch to lazy loading.
+        """
+        self.file_size_threshold = self.parent.lazy_load_threshold * 1024 * 1024
+        self.reset_lazy_loading()
+        self.is_large_file = False
+        self.data = []
+        self.total_rows = 0
+        try:
+            self.loader = FileLoader(self.filename, self.file_size_threshold, skip_empty=True)
+        except OSError as e:
+            messagebox.showerror("Error", f"Error loading file: {str(e)}")
+            self.create_tab_widgets()
+            return
+        self.create_progress_widgets()
+        self.loader.start()
+        self.tab_frame.after(LOAD_POLL_MS, self.poll_loader)
+
+    def create_progress_widgets(self):
+        """Progress bar and cancel button shown at the bottom while loading"""
+        self.progress_frame = tk.Frame(self.tab_frame)
+        self.progress_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=5, pady=2)
+        self.progress_label = tk.Label(self.progress_frame, text="Loading...")
+        self.progress_label.pack(side=tk.LEFT)
+        self.progress_bar = ttk.Progressbar(self.progress_frame, mode="determinate", maximum=100)
+        self.progress_bar.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        tk.Button(self.progress_frame, text="Cancel", command=self.cancel_loading, width=8).pack(
+            side=tk.RIGHT
+        )
+
+    def poll_loader(self):
+        """Take over the rows parsed since the last poll and update the progress"""
+        loader = self.loader
+        if loader is None:
+            return  # Cancelled
+        
+        # The table needs the headers, the first line of the file
+        if self.tree is None and loader.headers is not None:
+            self.headers = loader.headers
+            self.detect_format_and_set_template()
+            self.create_tab_widgets()
+            self.populate_table()
+        
+        rows = loader.take_rows()
+        if rows:
+            self.data.extend(rows)
+            self.total_rows = len(self.data)
+            if self.tree is not None:
+                self.show_loaded_rows()
+        
+        if loader.is_large_file and self.data:
+            self.progress_label.configure(text=f"Indexing {self.total_rows}+ rows...")
+        else:
+            self.progress_label.configure(text=f"Loading {self.total_rows} rows...")
+        self.progress_bar["value"] = loader.progress() * 100
+        
+        if loader.done and not rows:
+            self.finish_loading()
+        else:
+            self.tab_frame.after(LOAD_POLL_MS, self.poll_loader)
+
+    def show_loaded_rows(self):
+        """Extend the table to the rows loaded so far"""
+        self.search_texts = {}
+        # Search results stay as they are, populate_table shows everything later
+        if not self.search_var.get():
+            self.tree.set_row_count(len(self.data))
+
+    def finish_loading(self):
+        """Switch to the final state of the loaded file"""
+        loader = self.loader
+        self.loader = None
+        self.progress_frame.destroy()
+        self.progress_frame = None
+        
+        if loader.error is not None:
+            messagebox.showerror("Error", f"Error loading file: {loader.error}")
+        if self.tree is None:
+            # Empty file or error before the headers: keep the default headers
+            self.create_tab_widgets()
+        
+        if loader.row_index is not None:
+            # Large file: the first rows stay shown until the first chunk
+            # is cached, then make way for lazy loading
+            self.row_index = loader.row_index
+            self.is_large_file = True
+            self.total_rows = self.row_index.rows
+            self.prefetch(0)
+            self.populate_when_cached()
+        self.rebuild_search_index()
+        self.parent.update_title()
+
+    def populate_when_cached(self):
+        """Populate the table in lazy mode once the first chunk is in the cache"""
+        if self.row_index is None:
+            return  # Closed or reloaded meanwhile
+        if not self.parent.chunk_cache.contains(self, 0):
+            self.tab_frame.after(LOAD_POLL_MS, self.populate_when_cached)
+            return
+        self.data = []
+        self.populate_table()
+
+    def cancel_loading(self):
+        """Stop loading and close the tab"""
+        self.parent.close_tab(self, ask=False)
+
     def load_chunk(self, start_row, end_row):
         """Load a specific chunk of the file"""
         if not self.is_large_file:
             return self.data[start_row:end_row] if start_row < len(self.data) else []
         
-        # Calculate chunk key
+        # Rows are returned from the chunks covering the requested range
+        cache = self.parent.chunk_cache
+        result = []
         chunk_start = (start_row // self.chunk_size) * self.chunk_size
-        chunk_end = chunk_start + self.chunk_size - 1
-        chunk_key = (chunk_start, chunk_end)
-        
-        # Check if chunk is already loaded
-        if chunk_key in self.loaded_chunks:
-            # Return the requested portion from the loaded chunk
-            chunk_offset_start = start_row - chunk_start
-            chunk_offset_end = end_row - chunk_start
-            return self.loaded_chunks[chunk_key][chunk_offset_start:chunk_offset_end]
-        
-        # Load the chunk from file
-        try:
-            chunk_data = []
-            with open(self.filename, "r") as f:
-                reader = csv.reader(f, delimiter="\t")
-                # Skip header
-                next(reader)
-                
-                # Skip rows until chunk start
-                for _ in range(chunk_start):
-                    try:
-                        next(reader)
-                    except StopIteration:
-                        break
-                
-                # Read chunk_size rows
-                for _ in range(self.chunk_size):
-                    try:
-                        row = next(reader)
-                        if row:  # Filter empty rows
-                            chunk_data.append(row)
-                    except StopIteration:
-                        break
-            
-            # Store the loaded chunk
-            self.loaded_chunks[chunk_key] = chunk_data
+        while chunk_start < min(end_row, self.total_rows):
+            chunk_data = cache.get(self, chunk_start)
+            if chunk_data is None:
+                # Load the chunk from file, seeking straight to it via the row index
+                try:
+                    chunk_data = read_rows(self.filename, self.row_index, chunk_start, self.chunk_size)
+                except Exception as e:
+                    print(f"Error loading chunk: {str(e)}")
+                    return result
+                cache.put(self, chunk_start, chunk_data)
             
             # Return the requested portion
-            chunk_offset_start = start_row - chunk_start
+            chunk_offset_start = max(0, start_row - chunk_start)
             chunk_offset_end = end_row - chunk_start
-            return chunk_data[chunk_offset_start:chunk_offset_end]
-        except Exception as e:
-            print(f"Error loading chunk: {str(e)}")
-            return []
+            result.extend(chunk_data[chunk_offset_start:chunk_offset_end])
+            chunk_start += self.chunk_size
+        return result
+
+    def cached_rows(self, start_row, end_row):
+        """Like load_chunk, but never reads the file
+
+        Returns None if a chunk of the range is not cached yet; the missing
+        chunks are then queued in front of the prefetcher.
+        """
+        if not self.is_large_file:
+            return self.load_chunk(start_row, end_row)
+        
+        cache = self.parent.chunk_cache
+        result = []
+        missing = []
+        chunk_start = (start_row // self.chunk_size) * self.chunk_size
+        while chunk_start < min(end_row, self.total_rows):
+            chunk_data = cache.get(self, chunk_start)
+            if chunk_data is None:
+                missing.append(chunk_start)
+            elif not missing:
+                chunk_offset_start = max(0, start_row - chunk_start)
+                result.extend(chunk_data[chunk_offset_start:end_row - chunk_start])
+            chunk_start += self.chunk_size
+        if missing:
+            self.parent.prefetcher.request(
+                self, self.filename, self.row_index, self.chunk_size, missing, urgent=True
+            )
+            return None
+        return result
+
+    def prefetch(self, row):
+        """Queue the chunks around row that scrolling is predicted to reach"""
+        # Chunks loaded ahead may take up at most half of the cache budget,
+        # less the current chunk and the one behind
+        fitting = self.parent.chunk_cache.chunks_within(0.5)
+        max_ahead = 1 if fitting is None else fitting - 2
+        starts = self.scroll_predictor.chunks_to_load(row, self.total_rows, max_ahead)
+        self.parent.prefetcher.request(
+            self, self.filename, self.row_index, self.chunk_size, starts
+        )
             
         
     def detect_format_and_set_template(self):
@@ -262,7 +414,7 @@ class FileTab:
         def custom_trace(*args):
             # Only do real-time search if not a large file
             if not self.is_large_file:
-                self.parent.real_time_search(self)
+                self.schedule_search()
         
         # Set up the trace
         self.search_var.trace_add("write", custom_trace)
@@ -276,7 +428,7 @@ class FileTab:
         column_options = ["All Columns"] + self.headers
         column_menu = tk.OptionMenu(search_frame, self.search_column_var, *column_options)
         column_menu.pack(side=tk.LEFT, padx=5)
-        self.search_column_var.trace_add("write", lambda *args: self.parent.real_time_search(self))
+        self.search_column_var.trace_add("write", lambda *args: self.schedule_search())
 
         # Fuzzy search threshold slider
         self.threshold_var = tk.IntVar(value=70)
@@ -321,8 +473,8 @@ class FileTab:
         # Add row number column to headers
         self.headers_with_index = ["#"] + self.headers
         
-        # Table with index column
-        self.tree = ttk.Treeview(table_frame, columns=self.headers_with_index, show="headings")
+        # Table with index column, only the visible rows are drawn
+        self.tree = VirtualTreeview(table_frame, columns=self.headers_with_index, show="headings")
 
         # Set column headings with sorting functionality
         for col in self.headers_with_index:
@@ -436,14 +588,11 @@ class FileTab:
         # Get the data for selected rows
         self.parent.clipboard = []
         
-        # Get all current items in the treeview
-        current_items = set(self.tree.get_children())
-        
         for item in selected_items:
             # Check if item still exists in the treeview
-            if item in current_items:
+            if self.tree.exists(item):
                 try:
-                    row_index = self.tree.index(item)
+                    row_index = self.data_index(item)
                     self.parent.clipboard.append(self.data[row_index].copy())
                 except Exception as e:
                     print(f"Error copying row {item}: {e}")
@@ -460,13 +609,10 @@ class FileTab:
         self._copy_rows()
         self.parent.clipboard_is_cut = True
         
-        # Get all current items in the treeview
-        current_items = set(self.tree.get_children())
-        
         # Mark cut rows with a visual indicator (optional)
         for item in selected_items:
             # Check if item still exists in the treeview
-            if item in current_items:
+            if self.tree.exists(item):
                 try:
                     tags = list(self.tree.item(item, "tags")) if self.tree.item(item, "tags") else []
                     if "CutRow" not in tags:
@@ -487,7 +633,7 @@ class FileTab:
         focused_item = self.tree.focus()
         if focused_item:
             # Paste after the focused item
-            insert_index = self.tree.index(focused_item) + 1
+            insert_index = self.data_index(focused_item) + 1
         else:
             # If no focused item, paste at the end
             insert_index = len(self.data)
@@ -495,6 +641,7 @@ class FileTab:
         # Insert the clipboard data
         for row in self.parent.clipboard:
             self.data.insert(insert_index, row.copy())
+            self.index_row_inserted(insert_index)
             insert_index += 1
             
         # If we pasted cut rows, clear the cut visual indicators
@@ -854,11 +1001,12 @@ class FileTab:
             # Get current focused item's index
             focused_item = self.tree.focus()
             if focused_item:
-                current_index = self.tree.index(focused_item) + 1  # Add after current row
+                current_index = self.data_index(focused_item) + 1  # Add after current row
             else:
                 current_index = len(self.data)  # Add at the end
                 
             self.data.insert(current_index, new_row)
+            self.index_row_inserted(current_index)
             self.populate_table()
             
             # Restore focus to the new row
@@ -916,11 +1064,12 @@ class FileTab:
             # Get current focused item's index
             focused_item = self.tree.focus()
             if focused_item:
-                current_index = self.tree.index(focused_item)  # Add before current row
+                current_index = self.data_index(focused_item)  # Add before current row
             else:
                 current_index = 0  # Add at the beginning
                 
             self.data.insert(current_index, new_row)
+            self.index_row_inserted(current_index)
             self.populate_table()
             
             # Restore focus to the new row
@@ -968,7 +1117,7 @@ class FileTab:
         """Create an edit window for a specific item"""
         # Get row data and save row index immediately
         item_data = self.tree.item(item_id)["values"]
-        row_index = self.tree.index(item_id)
+        row_index = self.data_index(item_id)
         
         # Get item name or identifier for window title
         item_name = item_data[0] if item_data else f"Item {row_index}"
@@ -1052,6 +1201,7 @@ class FileTab:
             else:
                 # Update entire row
                 self.data[row_index] = [entries[header].get() for header in self.headers]
+            self.index_row_changed(row_index)
             self.populate_table()
             self.modified = True
             self.parent._remove_popup(edit_window)
@@ -1098,7 +1248,9 @@ class FileTab:
         
     def refresh_table(self):
         """Refresh the table data"""
-        if self.filename:
+        if self.loader is not None:
+            messagebox.showwarning("Warning", "The file is still loading")
+        elif self.filename:
             self.load_data()
             self.populate_table()
         else:
@@ -1147,9 +1299,9 @@ class FileTab:
         # Add buttons
         def on_yes():
             # Delete from end to avoid index issues
-            for item in reversed(selected_items):
-                row_index = self.tree.index(item)
+            for row_index in sorted(map(self.data_index, selected_items), reverse=True):
                 del self.data[row_index]
+                self.index_row_deleted(row_index)
 
             self.populate_table()
             self.modified = True
@@ -1230,11 +1382,8 @@ class FileTab:
 
     def get_selected_items(self):
         """Get the list of currently selected items that still exist in the treeview"""
-        # Get all current items in the treeview
-        current_items = set(self.tree.get_children())
-        
         # Return only the items that still exist
-        return [item for item in self.selected_items if item in current_items]
+        return [item for item in self.selected_items if self.tree.exists(item)]
 
     def is_full_document_selected(self):
         """Check if all items in the document are selected"""
@@ -1242,11 +1391,11 @@ class FileTab:
         return len(self.selected_items) == len(all_items)
         
     def update_current_row_style(self, current_item):
-        for item in self.tree.get_children():
+        # Only rows carrying the tags are visited, not every row of the table
+        for item in set(self.tree.tag_has("SelectionRangeEnd") + self.tree.tag_has("SelectionRangeMiddle")):
             tags = self.tree.item(item, "tags")
-            if tags:
-                new_tags = [tag for tag in tags if tag not in ["SelectionRangeEnd", "SelectionRangeMiddle"]]
-                self.tree.item(item, tags=new_tags)
+            new_tags = [tag for tag in tags if tag not in ["SelectionRangeEnd", "SelectionRangeMiddle"]]
+            self.tree.item(item, tags=new_tags)
                 
         self.clear_current_row_style()
         
@@ -1260,13 +1409,11 @@ class FileTab:
         if self.selection_mode:
             selected_items = self.selected_items
             if selected_items:
-                all_items = self.tree.get_children()
-                item_to_index = {item: idx for idx, item in enumerate(all_items)}
-                selected_indices = [item_to_index[item] for item in selected_items]
+                selected_indices = [self.tree.index(item) for item in selected_items]
                 selected_indices.sort()
                 
                 for item in selected_items:
-                    item_idx = item_to_index[item]
+                    item_idx = self.tree.index(item)
                     tags = list(self.tree.item(item, "tags")) if self.tree.item(item, "tags") else []
                     
                     if (item_idx == selected_indices[0] or item_idx == selected_indices[-1] or item == current_item):
@@ -1277,7 +1424,7 @@ class FileTab:
                     self.tree.item(item, tags=tags)
             
     def clear_current_row_style(self):
-        for item in self.tree.get_children():
+        for item in self.tree.tag_has("CurrentRow"):
             tags = self.tree.item(item, "tags")
             if tags and "CurrentRow" in tags:
                 new_tags = [tag for tag in tags if tag != "CurrentRow"]
@@ -1330,16 +1477,7 @@ class FileTab:
         self.tree.yview_moveto(new_y)
         
         # Update selection to the visible item at the top
-        items = self.tree.get_children()
-        if items:
-            # Get the first visible item
-            for item in items:
-                bbox = self.tree.bbox(item)
-                if bbox and bbox[1] >= 0:
-                    self.tree.selection_set(item)
-                    self.tree.focus(item)
-                    self.tree.see(item)
-                    break
+        self.select_first_visible()
     
     def page_down(self):
         """Page down"""
@@ -1348,16 +1486,17 @@ class FileTab:
         self.tree.yview_moveto(new_y)
         
         # Update selection to the visible item at the top of the new page
+        self.select_first_visible()
+    
+    def select_first_visible(self):
+        """Select and focus the item at the top of the table"""
         items = self.tree.get_children()
         if items:
-            # Get the first visible item after scrolling
-            for item in items:
-                bbox = self.tree.bbox(item)
-                if bbox and bbox[1] >= 0:
-                    self.tree.selection_set(item)
-                    self.tree.focus(item)
-                    self.tree.see(item)
-                    break
+            y, _ = self.tree.yview()
+            item = items[min(len(items) - 1, round(y * len(items)))]
+            self.tree.selection_set(item)
+            self.tree.focus(item)
+            self.tree.see(item)
     
     def activate_search(self):
         """Activate the search field"""
@@ -1410,159 +1549,166 @@ class FileTab:
                         # Just clear the entry without checking variables
                         child.delete(0, tk.END)
 
-    def populate_table(self, data=None):
-        """Populate table with data, using lazy loading for large files"""
-        # If search data is provided, use it directly
+    def populate_table(self, data=None, view_order=None):
+        """Populate table with data, using lazy loading for large files
+
+        The table only draws the rows in view, it asks for them with
+        get_rows(start, stop) as it scrolls. view_order shows the rows of
+        data in that order, sorting only the view; without it the rows are
+        shown in file order again.
+        """
+        self.tree.on_scroll = None
+        self.view_order = view_order if data is None and not self.is_large_file else None
+        if data is None:
+            # Every change of data ends up here, the search strings follow
+            self.search_texts = {}
         if data is not None:
-            # Clear existing data
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-                
-            # Save current lazy loading state and temporarily disable it for search results
-            was_large_file = self.is_large_file
-            self.is_large_file = False
-            
-            # Add search results with index
-            for i, row in enumerate(data):
-                tag = "EvenRow" if i % 2 == 0 else "OddRow"
-                # Add row number as first column
-                row_with_index = [str(i + 1)] + row
-                self.tree.insert("", tk.END, values=row_with_index, tags=(tag,))
-            
-            self.tree.tag_configure("OddRow", background="#ffffff")
-            self.tree.tag_configure("EvenRow", background="#f0f0f0")
-            
-            # Restore lazy loading state after search
-            self.is_large_file = was_large_file
-            return
-            
-        # Clear existing data
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        # If it's a small file or real-time search is active, load all data
-        if not self.is_large_file:
-            display_data = self.data
-            for i, row in enumerate(display_data):
-                tag = "EvenRow" if i % 2 == 0 else "OddRow"
-                # Add row number as first column
-                row_with_index = [str(i + 1)] + row
-                self.tree.insert("", tk.END, values=row_with_index, tags=(tag,))
+            # Search results, numbered from 1
+            self.tree.set_rows(
+                len(data), lambda start, stop: self.numbered_rows(data[start:stop], start), self.row_tags
+            )
+        elif self.view_order is not None:
+            # Sorted view, rows keep their row number in data
+            self.tree.set_rows(
+                len(self.view_order), lambda start, stop: self.ordered_rows(self.view_order[start:stop]), self.row_tags
+            )
+        elif not self.is_large_file:
+            # Small file or rows still loading, all in memory
+            self.tree.set_rows(
+                len(self.data), lambda start, stop: self.numbered_rows(self.data[start:stop], start), self.row_tags
+            )
         else:
-            # For large files, load initial visible portion
-            # Get visible area info
-            visible_height = self.tree.winfo_height()
-            row_height = 25  # Approximate row height from style configuration
-            visible_rows = max(10, visible_height // row_height)  # Load more than visible for smoother scrolling
-            
-            # Load initial chunk
-            initial_data = self.load_chunk(0, visible_rows * 2)
-            
-            # Add data with virtual row IDs for tracking
-            for i, row in enumerate(initial_data):
-                tag = "EvenRow" if i % 2 == 0 else "OddRow"
-                # Add row number as first column
-                row_with_index = [str(i + 1)] + row
-                self.tree.insert("", tk.END, iid=str(i), values=row_with_index, tags=(tag,))
-                
-            # Set virtual total rows for proper scrolling
-            self.tree.configure(height=min(visible_rows, self.total_rows))
-            
-            # Bind to scroll events for lazy loading
-            self.tree.bind("<Configure>", self.on_tree_configure)
-            self.tree.bind("<MouseWheel>", self.on_mouse_wheel)
-            self.tree.bind("<Button-4>", self.on_mouse_wheel)  # Linux scroll up
-            self.tree.bind("<Button-5>", self.on_mouse_wheel)  # Linux scroll down
-            self.tree.bind("<KeyPress>", self.on_key_press)
+            # Large file: rows come from the chunk cache, blank until their
+            # chunk is loaded; scrolling prefetches the chunks ahead
+            self.tree.set_rows(self.total_rows, self.lazy_rows, self.row_tags)
+            self.tree.on_scroll = lambda first, last: self.prefetch(first)
         
         self.tree.tag_configure("OddRow", background="#ffffff")
         self.tree.tag_configure("EvenRow", background="#f0f0f0")
         
-    def on_tree_configure(self, event):
-        """Handle treeview configuration changes"""
-        if self.is_large_file:
-            self.update_visible_rows()
-    
-    def on_mouse_wheel(self, event):
-        """Handle mouse wheel scrolling for lazy loading"""
-        if self.is_large_file:
-            # Schedule visible row update after scrolling completes
-            self.tree.after(10, self.update_visible_rows)
-    
-    def on_key_press(self, event):
-        """Handle keyboard navigation for lazy loading"""
-        if self.is_large_file and event.keysym in ('Up', 'Down', 'Prior', 'Next', 'Home', 'End'):
-            # Schedule visible row update after key navigation
-            self.tree.after(10, self.update_visible_rows)
-    
-    def update_visible_rows(self):
-        """Update visible rows based on current scroll position"""
-        if not self.is_large_file:
+    def numbered_rows(self, rows, start):
+        """Rows with their row number, counted from 1, as first column"""
+        return [[str(i + 1)] + row for i, row in enumerate(rows, start)]
+
+    def ordered_rows(self, indices):
+        """Rows of data at indices with their row number as first column"""
+        return [[str(i + 1)] + self.data[i] for i in indices]
+
+    def data_index(self, item):
+        """Row of data shown by a table item, when the table shows data"""
+        position = self.tree.index(item)
+        return self.view_order[position] if self.view_order is not None else position
+
+    def lazy_rows(self, start_row, end_row):
+        """Rows of a large file for the table, None until they are cached"""
+        rows = self.cached_rows(start_row, end_row)
+        return None if rows is None else self.numbered_rows(rows, start_row)
+
+    def row_tags(self, row):
+        return ("EvenRow",) if row % 2 == 0 else ("OddRow",)
+
+    def schedule_search(self):
+        """Search once typing pauses for SEARCH_DEBOUNCE_MS ms"""
+        if self.pending_search is not None:
+            self.tab_frame.after_cancel(self.pending_search)
+        self.pending_search = self.tab_frame.after(SEARCH_DEBOUNCE_MS, self._run_scheduled_search)
+
+    def _run_scheduled_search(self):
+        self.pending_search = None
+        self.parent.real_time_search(self)
+
+    def start_search(self, worker):
+        """Run a search worker, replacing the running search, and show its results"""
+        self.cancel_search()
+        self.search_worker = worker
+        worker.start()
+        self.tab_frame.after(LOAD_POLL_MS, self.poll_search)
+
+    def poll_search(self):
+        """Show the results of the search worker once it is done"""
+        worker = self.search_worker
+        if worker is None:
+            return  # Cancelled or superseded
+        if not worker.done:
+            self.tab_frame.after(LOAD_POLL_MS, self.poll_search)
             return
+        self.search_worker = None
         
-        try:
-            # Get current scroll position
-            y, _ = self.tree.yview()
-            visible_height = self.tree.winfo_height()
-            row_height = 25  # Approximate row height
-            visible_rows = max(10, visible_height // row_height)
-            
-            # Calculate current visible range
-            start_row = int(y * self.total_rows)
-            end_row = min(self.total_rows, start_row + visible_rows * 2)  # Load extra for smooth scrolling
-            
-            # Only update if the visible range has changed significantly
-            if (abs(start_row - self.currently_visible_range[0]) > visible_rows // 2 or 
-                abs(end_row - self.currently_visible_range[1]) > visible_rows // 2):
-                
-                self.currently_visible_range = (start_row, end_row)
-                
-                # Load the visible chunk
-                visible_data = self.load_chunk(start_row, end_row)
-                
-                # Get existing items
-                existing_items = set(self.tree.get_children())
-                
-                # Track which new items need to be added
-                new_items_to_add = []
-                for i, row in enumerate(visible_data):
-                    actual_row = start_row + i
-                    if str(actual_row) not in existing_items:
-                        new_items_to_add.append((actual_row, row))
-                
-                # Track current displayed rows
-                current_displayed_rows = len(self.tree.get_children())
-                
-                # Check if scrolled to bottom (near the end of current data)
-                if end_row >= current_displayed_rows - visible_rows // 2:
-                    # Calculate new load range with chunk size of row increments
-                    new_load_start = current_displayed_rows
-                    new_load_end = min(self.total_rows, current_displayed_rows + self.chunk_size)
-                    
-                    # Load new chunk
-                    new_data = self.load_chunk(new_load_start, new_load_end)
-                    
-                    # Add new rows without clearing existing ones
-                    if new_data:
-                        for i, row in enumerate(new_data):
-                            actual_row = new_load_start + i
-                            tag = "EvenRow" if actual_row % 2 == 0 else "OddRow"
-                            # Add row number as first column
-                            row_with_index = [str(actual_row + 1)] + row
-                            self.tree.insert("", tk.END, iid=str(actual_row), values=row_with_index, tags=(tag,))
-                
-                # Update visible range
-                self.currently_visible_range = (start_row, end_row)
-        except Exception as e:
-            print(f"Error updating visible rows: {str(e)}")
+        if worker.error is not None:
+            print(f"Error during search: {worker.error}")
+            return
+        if worker.cache is not None:
+            if worker.cache is not self.search_texts:
+                # The data changed during the search; while loading the
+                # results stand for the rows loaded so far
+                if self.loader is None:
+                    self.parent.real_time_search(self)
+                    return
+            else:
+                self.last_search = worker.matches
+        self.populate_table(worker.results)
+
+    def cancel_search(self):
+        """Cancel the scheduled and the running search"""
+        if self.pending_search is not None:
+            self.tab_frame.after_cancel(self.pending_search)
+            self.pending_search = None
+        if self.search_worker is not None:
+            self.search_worker.cancel()
+            self.search_worker = None
+
+    def rebuild_search_index(self):
+        """Index data for search in the background, if enabled"""
+        if self.index_builder is not None:
+            self.index_builder.cancel()
+            self.index_builder = None
+        self.search_index = None
+        if self.parent.search_index_enabled and not self.is_large_file and self.loader is None:
+            self.index_builder = IndexBuilder(self.data)
+            self.index_builder.start()
+
+    def take_search_index(self):
+        """The search index once built, None while building or disabled"""
+        builder = self.index_builder
+        if builder is not None and builder.done:
+            self.index_builder = None
+            if builder.error is not None:
+                print(f"Error indexing rows for search: {builder.error}")
+            else:
+                self.search_index = builder.index
+        return self.search_index
+
+    def index_row_inserted(self, row_index):
+        """Add a row inserted into data to the search index"""
+        if self.index_builder is not None and not self.index_builder.done:
+            self.rebuild_search_index()  # The builder saw other rows
+        elif self.take_search_index() is not None:
+            self.search_index.insert(row_index, row_texts([self.data[row_index]])[0])
+
+    def index_row_changed(self, row_index):
+        """Update the search index for an edited row of data"""
+        if self.index_builder is not None and not self.index_builder.done:
+            self.rebuild_search_index()
+        elif self.take_search_index() is not None:
+            self.search_index.replace(row_index, row_texts([self.data[row_index]])[0])
+
+    def index_row_deleted(self, row_index):
+        """Remove a row deleted from data from the search index"""
+        if self.index_builder is not None and not self.index_builder.done:
+            self.rebuild_search_index()
+        elif self.take_search_index() is not None:
+            self.search_index.delete(row_index)
 
     def update_tab_name(self, name):
         self.tab_name = name
         self.notebook.tab(self.tab_frame, text=name)
         
     def sort_by_column(self, col):
-        items = self.tree.get_children()
-        if not items:
+        """Show the rows sorted by a column, data keeps its order"""
+        if self.is_large_file or self.loader is not None:
+            messagebox.showinfo("Info", "Sorting is not available for lazily loaded or loading files")
+            return
+        if not self.data:
             return
             
         if self.sort_column == col:
@@ -1573,17 +1719,16 @@ class FileTab:
             
         col_index = self.headers.index(col)
         
-        def sort_key(item):
-            value = self.tree.item(item, "values")[col_index]
+        def sort_key(index):
+            row = self.data[index]
+            value = row[col_index] if col_index < len(row) else ""
             try:
                 return float(value)
             except ValueError:
                 return str(value).lower()
                 
-        sorted_items = sorted(items, key=sort_key, reverse=(not self.sort_direction))
-        
-        for index, item in enumerate(sorted_items):
-            self.tree.move(item, "", index)
+        order = sorted(range(len(self.data)), key=sort_key, reverse=(not self.sort_direction))
+        self.populate_table(view_order=order)
 
 class TableManager:
     def __init__(self, root):
@@ -1598,7 +1743,12 @@ class TableManager:
         self.current_tab = None
         self.active_popups = []
         self.backup_enabled = True  # Backup functionality toggle
+        self.search_index_enabled = INDEX_SUPPORTED  # Trigram index narrowing fuzzy search
         self.lazy_load_threshold = 10  # Default 10MB threshold for lazy loading
+        self.chunk_cache_limit = 256  # Default 256MB of lazily loaded rows, all tabs together
+        self.chunk_cache = ChunkCache(self.chunk_cache_limit * 1024 * 1024)
+        self.prefetcher = ChunkPrefetcher(self.chunk_cache)  # Loads chunks ahead of scrolling
+        self.prefetcher.start()
         
         # Clipboard functionality
         self.clipboard = []  # Store copied/cut rows
@@ -1670,15 +1820,15 @@ class TableManager:
         tab_name = os.path.basename(file_path)
         new_tab = FileTab(self, self.notebook, tab_name)
         new_tab.filename = file_path
-        new_tab.load_data()
-        new_tab.create_tab_widgets()  # Ensure tree is initialized first
-        new_tab.populate_table()
         
         self.notebook.add(new_tab.tab_frame, text=tab_name)
         self.notebook.select(new_tab.tab_frame)
         self.tabs.append(new_tab)
         self.current_tab = new_tab
         
+        # Parse the file in the background, the table fills in as rows arrive
+        new_tab.start_loading()
+        
         # Update recent files
         self.add_to_recent_files(file_path)
         
@@ -1688,9 +1838,10 @@ class TableManager:
     def update_title(self):
         """Update window title with current filename"""
         if self.current_tab and self.current_tab.filename:
-            self.root.title(
-                f"LACCS TSV Manager - {os.path.basename(self.current_tab.filename)}"
-            )
+            title = f"LACCS TSV Manager - {os.path.basename(self.current_tab.filename)}"
+            if self.current_tab.is_large_file:
+                title += f" ({self.current_tab.total_rows} rows, lazy loaded)"
+            self.root.title(title)
         else:
             self.root.title("LACCS TSV Manager - No file selected")
 
@@ -1921,6 +2072,7 @@ class TableManager:
                     self.current_tab.headers = next(reader)
                     # Read all remaining rows as data
                     self.current_tab.data = [row for row in reader if row]  # Filter empty rows
+                self.current_tab.rebuild_search_index()
                 
                 # Repopulate the table
                 self.current_tab.populate_table()
@@ -1948,6 +2100,9 @@ class TableManager:
         if not self.current_tab:
             messagebox.showwarning("Warning", "No active tab")
             return
+        if self.current_tab.loader is not None:
+            messagebox.showwarning("Warning", "The file is still loading")
+            return
             
         if not self.current_tab.filename:
             self.save_as_data()
@@ -1969,6 +2124,9 @@ class TableManager:
         if not self.current_tab:
             messagebox.showwarning("Warning", "No active tab")
             return
+        if self.current_tab.loader is not None:
+            messagebox.showwarning("Warning", "The file is still loading")
+            return False
             
         file_path = filedialog.asksaveasfilename(
             title="Save As",
@@ -2227,6 +2385,17 @@ class TableManager:
         )
         backup_checkbox.pack(side=tk.LEFT)
 
+        # Search index toggle switch
+        self.search_index_var = tk.BooleanVar(value=self.search_index_enabled)
+        search_index_checkbox = tk.Checkbutton(
+            backup_toggle_frame,
+            text="Search Index",
+            variable=self.search_index_var,
+            command=self._update_search_index_enabled,
+            state=tk.NORMAL if INDEX_SUPPORTED else tk.DISABLED,
+        )
+        search_index_checkbox.pack(side=tk.LEFT)
+
         # Lazy load threshold setting
         lazy_load_frame = tk.Frame(button_frame)
         lazy_load_frame.pack(side=tk.LEFT, padx=5)
@@ -2237,6 +2406,16 @@ class TableManager:
         threshold_menu.pack(side=tk.LEFT, padx=5)
         self.lazy_load_var.trace_add("write", lambda *args: self._update_lazy_load_threshold())
 
+        # Memory budget of the chunk cache shared by lazily loaded tabs
+        chunk_cache_frame = tk.Frame(button_frame)
+        chunk_cache_frame.pack(side=tk.LEFT, padx=5)
+        tk.Label(chunk_cache_frame, text="Chunk Cache:").pack(side=tk.LEFT, padx=(0, 5))
+        self.chunk_cache_var = tk.StringVar(value=f"{self.chunk_cache_limit}M")
+        cache_options = ["64M", "128M", "256M", "512M", "1024M", "2048M"]
+        cache_menu = tk.OptionMenu(chunk_cache_frame, self.chunk_cache_var, *cache_options)
+        cache_menu.pack(side=tk.LEFT, padx=5)
+        self.chunk_cache_var.trace_add("write", lambda *args: self._update_chunk_cache_limit())
+
         # Create notebook for tabs
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -2261,11 +2440,29 @@ class TableManager:
             # If parsing fails, default to 10MB
             self.lazy_load_threshold = 10
             self.lazy_load_var.set("10M")
+
+    def _update_search_index_enabled(self):
+        """Build or drop the search indexes of the open tabs"""
+        self.search_index_enabled = self.search_index_var.get()
+        for tab in self.tabs:
+            tab.rebuild_search_index()
+
+    def _update_chunk_cache_limit(self):
+        """Update the chunk cache budget when user changes the setting"""
+        try:
+            value_str = self.chunk_cache_var.get()
+            if value_str.endswith('M'):
+                self.chunk_cache_limit = int(value_str[:-1])
+        except ValueError:
+            self.chunk_cache_limit = 256
+            self.chunk_cache_var.set("256M")
+        self.chunk_cache.set_budget(self.chunk_cache_limit * 1024 * 1024)
         
     def new_tab(self):
         """Create a new blank tab"""
         new_tab = FileTab(self, self.notebook, "Untitled")
         new_tab.data = []
+        new_tab.rebuild_search_index()
         new_tab.create_tab_widgets()  # Ensure tree is initialized first
         new_tab.populate_table()
         
@@ -2357,7 +2554,16 @@ class TableManager:
         tabs_to_close = [i for i in range(len(self.tabs)) if i != keep_index]
         # Close from last to first to avoid index issues
         for i in reversed(tabs_to_close):
+            if self.tabs[i].loader is not None:
+                self.tabs[i].loader.cancel()
+                self.tabs[i].loader = None
+            self.tabs[i].cancel_search()
+            if self.tabs[i].index_builder is not None:
+                self.tabs[i].index_builder.cancel()
             self.notebook.forget(self.tabs[i].tab_frame)
+            self.tabs[i].row_index = None  # Chunks still being read are not cached
+            self.prefetcher.cancel(self.tabs[i])
+            self.chunk_cache.discard(self.tabs[i])
             del self.tabs[i]
         
         # Update current tab
@@ -2394,13 +2600,15 @@ class TableManager:
         
         return False
         
-    def close_tab(self):
-        """Close the current tab"""
-        if not self.current_tab:
+    def close_tab(self, tab=None, ask=True):
+        """Close the current tab or the given one, asking to save unless ask is False"""
+        if tab is None:
+            tab = self.current_tab
+        if not tab:
             return
             
         # Check if there are unsaved changes
-        if self.current_tab.modified:
+        if ask and tab.modified:
             response = messagebox.askyesnocancel("Save Changes", 
                 "Do you want to save changes to this file?")
             if response is None:  # Cancel
@@ -2413,9 +2621,17 @@ class TableManager:
                         return
         
         # Remove the tab from the notebook and tabs list
-        tab_to_close = self.current_tab
-        self.notebook.forget(self.current_tab.tab_frame)
-        self.tabs.remove(self.current_tab)
+        if tab.loader is not None:
+            tab.loader.cancel()
+            tab.loader = None
+        tab.cancel_search()
+        if tab.index_builder is not None:
+            tab.index_builder.cancel()
+        self.notebook.forget(tab.tab_frame)
+        tab.row_index = None  # Chunks still being read are not cached
+        self.prefetcher.cancel(tab)
+        self.chunk_cache.discard(tab)
+        self.tabs.remove(tab)
         
         # Update current tab
         if self.tabs:
@@ -2450,7 +2666,9 @@ class TableManager:
             messagebox.showwarning("Warning", "No active tab")
             return
             
-        if self.current_tab.filename:
+        if self.current_tab.loader is not None:
+            messagebox.showwarning("Warning", "The file is still loading")
+        elif self.current_tab.filename:
             self.current_tab.load_data()
             self.current_tab.populate_table()
         else:
@@ -2478,7 +2696,12 @@ class TableManager:
         self.current_tab.delete_row()
 
     def real_time_search(self, tab=None):
-        """Real-time fuzzy search with column selection"""
+        """Real-time fuzzy search with column selection
+
+        The search runs in a worker thread, replacing the one still running
+        for the tab. A query extending the previous one with the same
+        threshold and column refines its scores instead of scoring all rows.
+        """
         if not tab:
             tab = self.current_tab
             if not tab:
@@ -2492,71 +2715,33 @@ class TableManager:
         else:
             search_column = "All Columns"
 
+        tab.cancel_search()
         if not search_term:
             tab.populate_table()
             return
 
-        # Prepare data for fuzzy search
-        search_data = []
-        
+        try:
+            column = column_index(tab.headers, search_column)
+        except ValueError:
+            tab.populate_table([])
+            return
+
         # In lazy load mode, data might not be fully loaded, so we need to read from file
         if tab.is_large_file:
-            try:
-                with open(tab.filename, "r") as f:
-                    reader = csv.reader(f, delimiter="\t")
-                    # Skip header
-                    next(reader)
-                    
-                    # Search through all rows in the file
-                    for row in reader:
-                        if not row:  # Skip empty rows
-                            continue
-                            
-                        # Check if we're searching all columns or specific columns
-                        if search_column == "All Columns":
-                            # Combine all row values into one string for searching
-                            row_text = " ".join(str(cell) for cell in row).lower()
-                            score = fuzz.partial_ratio(search_term, row_text)
-                        else:
-                            # Search only in the selected column
-                            if search_column in tab.headers:
-                                column_index = tab.headers.index(search_column)
-                                if column_index < len(row):
-                                    cell_value = str(row[column_index]).lower()
-                                    score = fuzz.partial_ratio(search_term, cell_value)
-                                else:
-                                    score = 0
-                            else:
-                                score = 0
-                        
-                        if score >= threshold:
-                            search_data.append(row)
-            except Exception as e:
-                print(f"Error during search in lazy load mode: {str(e)}")
+            worker = SearchWorker(search_term, threshold, column, file_path=tab.filename, row_index=tab.row_index)
         else:
-            # For normal mode, search in memory data
-            for row in tab.data:
-                # Check if we're searching all columns or specific columns
-                if search_column == "All Columns":
-                    # Combine all row values into one string for searching
-                    row_text = " ".join(str(cell) for cell in row).lower()
-                    score = fuzz.partial_ratio(search_term, row_text)
-                else:
-                    # Search only in the selected column
-                    if search_column in tab.headers:
-                        column_index = tab.headers.index(search_column)
-                        if column_index < len(row):
-                            cell_value = str(row[column_index]).lower()
-                            score = fuzz.partial_ratio(search_term, cell_value)
-                        else:
-                            score = 0
-                    else:
-                        score = 0
-
-                if score >= threshold:
-                    search_data.append(row)
-
-        tab.populate_table(search_data)
+            # For normal mode, score all rows of memory data in batches
+            index = tab.take_search_index()
+            worker = SearchWorker(
+                search_term,
+                threshold,
+                column,
+                rows=tab.data,
+                cache=tab.search_texts,
+                previous=tab.last_search,
+                candidates=index.candidates(search_term, threshold) if index is not None else None,
+            )
+        tab.start_search(worker)
         
     def cancel_all_operations(self):
         """Cancel all operations and close all popups"""
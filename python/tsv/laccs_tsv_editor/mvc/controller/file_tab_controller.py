@@ -3,6 +3,10 @@ from tkinter import messagebox
 import os
 
 
+LOAD_POLL_MS = 50  # Interval at which a loading tab takes over parsed rows
+SEARCH_DEBOUNCE_MS = 250  # Pause in typing after which the search starts
+
+
 class FileTabController:
     """Controller for managing a single file tab"""
 
@@ -29,6 +33,15 @@ class FileTabController:
         self.chunk_size = 1000
         self.visible_rows = set()
 
+        # Background loading state
+        self.progress_frame = None
+        self.progress_label = None
+        self.progress_bar = None
+
+        # Search state
+        self.search_worker = None
+        self.pending_search = None
+
         # Setup the tab
         self.setup_tab()
 
@@ -46,13 +59,68 @@ class FileTabController:
         )
 
         # Bind search events
-        self.search_var.trace_add("write", lambda *args: self.real_time_search())
-        self.threshold_var.trace_add("write", lambda *args: self.real_time_search())
+        self.search_var.trace_add("write", lambda *args: self.schedule_search())
+        self.threshold_var.trace_add("write", lambda *args: self.schedule_search())
 
         # If there's data, create table
         if self.model.headers:
             self.create_table()
 
+        # A file loading in the background fills in the table as rows arrive
+        if self.model.loader is not None:
+            self.progress_frame, self.progress_label, self.progress_bar = (
+                self.view.create_progress_widgets(self.tab_frame, self.cancel_loading)
+            )
+            self.tab_frame.after(LOAD_POLL_MS, self.poll_loading)
+
+    def poll_loading(self):
+        """Take over the rows parsed since the last poll and update the progress"""
+        loader = self.model.loader
+        if loader is None:
+            return  # Cancelled
+
+        rows = self.model.take_loaded_rows()
+        if self.tree is None:
+            # The table needs the headers, the first line of the file
+            if self.model.headers:
+                self.create_table()
+        elif rows and not self.search_var.get().strip():
+            # Search results stay as they are, populate_table shows everything later
+            self.tree.set_row_count(len(self.model.data))
+
+        if loader.is_large_file and self.model.data:
+            self.progress_label.configure(text=f"Indexing {self.model.total_rows}+ rows...")
+        else:
+            self.progress_label.configure(text=f"Loading {self.model.total_rows} rows...")
+        self.progress_bar["value"] = loader.progress() * 100
+
+        if loader.done and not rows:
+            self.finish_loading()
+        else:
+            self.tab_frame.after(LOAD_POLL_MS, self.poll_loading)
+
+    def finish_loading(self):
+        """Switch the table to the final state of the loaded file"""
+        error = self.model.finish_loading()
+        self.progress_frame.destroy()
+        self.progress_frame = None
+
+        if error is not None:
+            self.view.show_message("Error", f"Error loading file: {error}", "error")
+        if self.tree is None:
+            self.create_table()
+        elif self.model.is_large_file:
+            # The first rows shown while indexing make way for lazy loading
+            self.populate_table()
+        if self.parent_controller:
+            self.parent_controller.update_title()
+
+    def cancel_loading(self):
+        """Stop loading and close the tab"""
+        self.model.cancel_loading()
+        if self.parent_controller:
+            self.parent_controller.close_tab(self, ask=False)
+
     def create_table(self):
         """Create the table widget and populate with data"""
         # Create table widgets
@@ -82,19 +150,21 @@ class FileTabController:
 
     def populate_table(self, search_data=None):
         """Populate the table with data, supporting lazy loading"""
+        if self.tree is None:
+            return  # Headers not loaded yet
         if search_data is not None:
             # If search data is provided, use that
             self.view.populate_table(self.tree, search_data, self.model.headers)
         else:
             # Otherwise, load from model or file
             if self.model.is_large_file:
-                # For large files, load only visible chunk
-                chunk_data = self.model.load_chunk(
-                    self.current_chunk * self.chunk_size, self.chunk_size
+                # For large files, read only the rows scrolled into view
+                self.view.populate_lazy_table(
+                    self.tree,
+                    self.model.total_rows,
+                    lambda start, stop: self.model.load_chunk(start, stop - start),
+                    self.model.headers,
                 )
-                self.view.populate_table(self.tree, chunk_data, self.model.headers)
-                # Update visible rows
-                self.update_visible_rows()
             else:
                 # For small files, load all data
                 self.view.populate_table(self.tree, self.model.data, self.model.headers)
@@ -153,8 +223,22 @@ class FileTabController:
             # Cleanup menu after selection
             context_menu.bind("<Unmap>", lambda e: context_menu.destroy())
 
+    def schedule_search(self):
+        """Search once typing pauses for SEARCH_DEBOUNCE_MS ms"""
+        if self.pending_search is not None:
+            self.tab_frame.after_cancel(self.pending_search)
+        self.pending_search = self.tab_frame.after(SEARCH_DEBOUNCE_MS, self._run_scheduled_search)
+
+    def _run_scheduled_search(self):
+        self.pending_search = None
+        self.real_time_search()
+
     def real_time_search(self):
-        """Perform real-time search based on search box input"""
+        """Perform real-time search based on search box input
+
+        The search runs in a worker thread, replacing the one still running.
+        """
+        self.cancel_search()
         search_term = self.search_var.get().strip()
         if not search_term:
             self.populate_table()
@@ -165,10 +249,44 @@ class FileTabController:
         search_column = self.search_column_var.get()
 
         # Perform search
-        search_data = self.model.search_data(search_term, threshold, search_column)
+        self.search_worker = self.model.start_search(search_term, threshold, search_column)
+        if self.search_worker is None:
+            self.populate_table([])
+            return
+        self.tab_frame.after(LOAD_POLL_MS, self.poll_search)
+
+    def poll_search(self):
+        """Update the table with the search results once the worker is done"""
+        worker = self.search_worker
+        if worker is None:
+            return  # Cancelled or superseded
+        if not worker.done:
+            self.tab_frame.after(LOAD_POLL_MS, self.poll_search)
+            return
+        self.search_worker = None
 
-        # Update table with search results
-        self.populate_table(search_data)
+        if worker.error is not None:
+            print(f"Error during search: {worker.error}")
+            return
+        if worker.cache is not None:
+            if worker.cache is not self.model.search_texts:
+                # The data changed during the search; while loading the
+                # results stand for the rows loaded so far
+                if self.model.loader is None:
+                    self.real_time_search()
+                    return
+            else:
+                self.model.last_search = worker.matches
+        self.populate_table(worker.results)
+
+    def cancel_search(self):
+        """Cancel the scheduled and the running search"""
+        if self.pending_search is not None:
+            self.tab_frame.after_cancel(self.pending_search)
+            self.pending_search = None
+        if self.search_worker is not None:
+            self.search_worker.cancel()
+            self.search_worker = None
 
     def edit_row(self, event, edit_cell=False):
         """Edit the selected row(s)"""
@@ -396,7 +514,7 @@ class FileTabController:
 
     def clear_selection_highlight(self):
         """Clear selection highlights"""
-        for item in self.tree.get_children():
+        for item in self.tree.tag_has("selected"):
             self.tree.item(item, tags=())
 
     def on_mouse_wheel(self, event):
@@ -194,10 +194,15 @@ class MainController:
                 self.current_tab_controller = tab_controller
                 return
 
-        # Create model and load data
+        # Create model and load the data in the background, the tab shows
+        # the rows as they are parsed
         tsv_file = TSVFile()
         tsv_file.lazy_load_threshold = self.lazy_load_threshold
-        tsv_file.load_data(file_path)
+        try:
+            tsv_file.start_loading(file_path)
+        except OSError as e:
+            self.view.show_message("Error", f"Error loading file: {str(e)}", "error")
+            return
 
         # Create controller
         tab_controller = FileTabController(tsv_file, self.view, self)
@@ -222,6 +227,9 @@ class MainController:
             or not self.current_tab_controller.model.filename
         ):
             return self.save_as_data()
+        if self.current_tab_controller.model.loader is not None:
+            self.view.show_message("Warning", "The file is still loading", "warning")
+            return
 
         # Create backup if enabled
         if self.backup_enabled:
@@ -240,6 +248,9 @@ class MainController:
         """Save the current file with a new name"""
         if not self.current_tab_controller:
             return False
+        if self.current_tab_controller.model.loader is not None:
+            self.view.show_message("Warning", "The file is still loading", "warning")
+            return False
 
         # Get current filename or default extension
         current_filename = self.current_tab_controller.model.filename
@@ -421,13 +432,15 @@ class MainController:
         if self.current_tab_controller:
             self.current_tab_controller.delete_row()
 
-    def close_tab(self):
-        """Close the current tab"""
-        if not self.current_tab_controller:
+    def close_tab(self, tab_controller=None, ask=True):
+        """Close the current tab or the given one, asking to save unless ask is False"""
+        if tab_controller is None:
+            tab_controller = self.current_tab_controller
+        if not tab_controller:
             return
 
         # Check if there are unsaved changes
-        if self.current_tab_controller.model.modified:
+        if ask and tab_controller.model.modified:
             response = messagebox.askyesnocancel(
                 "Save Changes", "Do you want to save changes to this file?"
             )
@@ -441,10 +454,12 @@ class MainController:
                         return
 
         # Remove the tab controller
-        self.tab_controllers.remove(self.current_tab_controller)
+        tab_controller.model.cancel_loading()
+        tab_controller.cancel_search()
+        self.tab_controllers.remove(tab_controller)
 
         # Close the tab in the view
-        self.view.close_tab(self.current_tab_controller.tab_frame)
+        self.view.close_tab(tab_controller.tab_frame)
 
         # Update current tab
         if self.tab_controllers:
@@ -556,6 +571,8 @@ class MainController:
         tabs_to_close = [i for i in range(len(self.tab_controllers)) if i != keep_index]
         # Close from last to first to avoid index issues
         for i in reversed(tabs_to_close):
+            self.tab_controllers[i].model.cancel_loading()
+            self.tab_controllers[i].cancel_search()
             self.view.close_tab(self.tab_controllers[i].tab_frame)
             del self.tab_controllers[i]
 
@@ -856,9 +873,11 @@ class MainController:
 
         if self.current_tab_controller:
             if self.current_tab_controller.model.filename:
-                filename = os.path.basename(self.current_tab_controller.model.filename)
-                modified = "*" if self.current_tab_controller.model.modified else ""
-                self.view.set_window_title(f"{filename}{modified} - {base_title}")
+                model = self.current_tab_controller.model
+                filename = os.path.basename(model.filename)
+                modified = "*" if model.modified else ""
+                lazy = f" ({model.total_rows} rows, lazy loaded)" if model.is_large_file else ""
+                self.view.set_window_title(f"{filename}{modified}{lazy} - {base_title}")
             else:
                 modified = "*" if self.current_tab_controller.model.modified else ""
                 self.view.set_window_title(f"Untitled{modified} - {base_title}")
@@ -0,0 +1,109 @@
+import sys
+import threading
+from collections import OrderedDict
+
+
+SIZE_SAMPLE_ROWS = 64  # Rows measured to estimate the size of a chunk
+
+
+def estimate_rows_size(rows):
+    """Approximate memory use of a list of rows of strings, in bytes
+
+    Only a few rows spread over the list are measured, measuring every cell
+    of a 100k-row chunk would cost about as much as reading it.
+    """
+    if not rows:
+        return sys.getsizeof(rows)
+    step = max(1, len(rows) // SIZE_SAMPLE_ROWS)
+    sample = rows[::step]
+    sample_size = sum(sys.getsizeof(row) + sum(sys.getsizeof(cell) for cell in row) for row in sample)
+    return sys.getsizeof(rows) + sample_size * len(rows) // len(sample)
+
+
+class ChunkCache:
+    """LRU cache of loaded row chunks with a memory budget
+
+    One cache is shared by all tabs. Keys are (owner, chunk start), owner
+    being the tab the chunk belongs to; when the estimated size of all
+    chunks exceeds the budget the least recently used ones are dropped.
+    Methods may be called from any thread, e.g. by a ChunkPrefetcher.
+    """
+
+    def __init__(self, budget_bytes=256 * 1024 * 1024):
+        self.budget_bytes = budget_bytes
+        self.chunks = OrderedDict()  # (owner, start) -> (rows, size)
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, owner, start):
+        """Rows of a cached chunk, or None; counts a hit or a miss"""
+        with self.lock:
+            entry = self.chunks.get((owner, start))
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.chunks.move_to_end((owner, start))
+            return entry[0]
+
+    def contains(self, owner, start):
+        """Whether a chunk is cached, without counting or touching it"""
+        with self.lock:
+            return (owner, start) in self.chunks
+
+    def put(self, owner, start, rows):
+        """Cache a chunk, evicting least recently used chunks over budget"""
+        key = (owner, start)
+        size = estimate_rows_size(rows)
+        with self.lock:
+            if key in self.chunks:
+                self.size_bytes -= self.chunks.pop(key)[1]
+            self.chunks[key] = (rows, size)
+            self.size_bytes += size
+            self._evict(keep=key)
+
+    def discard(self, owner):
+        """Drop all chunks of an owner, e.g. a closed or reloaded tab"""
+        with self.lock:
+            for key in [key for key in self.chunks if key[0] is owner]:
+                self.size_bytes -= self.chunks.pop(key)[1]
+
+    def set_budget(self, budget_bytes):
+        with self.lock:
+            self.budget_bytes = budget_bytes
+            self._evict()
+
+    def chunks_within(self, fraction):
+        """How many chunks of the current average size fit in a fraction
+        of the budget, None while the cache is empty"""
+        with self.lock:
+            if not self.chunks:
+                return None
+            average = self.size_bytes / len(self.chunks)
+            return int(self.budget_bytes * fraction / max(1.0, average))
+
+    def _evict(self, keep=None):
+        # The chunk just added stays even if it alone exceeds the budget
+        while self.size_bytes > self.budget_bytes and self.chunks:
+            key = next(iter(self.chunks))
+            if key == keep:
+                break
+            self.size_bytes -= self.chunks.pop(key)[1]
+            self.evictions += 1
+
+    def stats(self):
+        """Counters for display or logging"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "chunks": len(self.chunks),
+                "size_mb": self.size_bytes / (1024 * 1024),
+                "budget_mb": self.budget_bytes / (1024 * 1024),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
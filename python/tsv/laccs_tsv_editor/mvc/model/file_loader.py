@@ -0,0 +1,104 @@
+import csv
+import os
+import threading
+
+from .row_index import IndexCancelled, open_row_index
+
+
+LOAD_BATCH_ROWS = 5000  # Rows parsed between two hand-overs to the GUI
+FIRST_SCREEN_ROWS = 1000  # Rows shown of a lazily loaded file while it is indexed
+
+
+class FileLoader(threading.Thread):
+    """Load a delimited text file in a worker thread
+
+    Parsed rows are handed over in batches through take_rows(), so a view
+    polling the loader can show the first screen right away and grow the
+    table while the rest is read. Files over lazy_threshold bytes are not
+    read completely: only the first FIRST_SCREEN_ROWS rows are parsed, then
+    the row index is built (or reused) for lazy loading.
+
+    The loader never touches widgets. Once done is set, error holds the
+    message of a failure, otherwise headers (None for an empty file),
+    is_large_file and, for large files, row_index are final.
+    """
+
+    def __init__(self, file_path, lazy_threshold, encoding=None, delimiter="\t", skip_empty=False):
+        super().__init__(daemon=True)
+        self.file_path = file_path
+        self.encoding = encoding
+        self.delimiter = delimiter
+        self.skip_empty = skip_empty  # Blank lines are not rows
+        self.file_size = os.path.getsize(file_path)
+        self.is_large_file = self.file_size > lazy_threshold
+        self.headers = None
+        self.row_index = None
+        self.position = 0  # Bytes read or indexed so far, for progress display
+        self.rows = []  # Parsed rows not taken yet
+        self.lock = threading.Lock()
+        self.cancelled = False
+        self.error = None
+        self.done = False
+
+    def cancel(self):
+        """Ask the loader to stop at the next batch or index block"""
+        self.cancelled = True
+
+    def take_rows(self):
+        """Rows parsed since the last call"""
+        with self.lock:
+            rows, self.rows = self.rows, []
+        return rows
+
+    def progress(self):
+        """Fraction of the file processed, 0 to 1"""
+        return min(1.0, self.position / self.file_size) if self.file_size else 1.0
+
+    def run(self):
+        try:
+            self._read_rows()
+            if self.is_large_file and self.headers is not None and not self.cancelled:
+                self.position = 0
+                _, self.row_index = open_row_index(
+                    self.file_path,
+                    self.encoding,
+                    self.delimiter,
+                    skip_empty=self.skip_empty,
+                    progress=self._set_position,
+                    cancelled=lambda: self.cancelled,
+                )
+        except IndexCancelled:
+            pass
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.done = True
+
+    def _set_position(self, position):
+        self.position = position
+
+    def _read_rows(self):
+        """Parse the headers and the rows to show, in batches"""
+        limit = FIRST_SCREEN_ROWS if self.is_large_file else None
+        count = 0
+        batch = []
+        with open(self.file_path, "r", encoding=self.encoding) as f:
+            reader = csv.reader(f, delimiter=self.delimiter)
+            self.headers = next(reader, None)
+            for row in reader:
+                if self.skip_empty and not row:
+                    continue
+                batch.append(row)
+                count += 1
+                if len(batch) >= LOAD_BATCH_ROWS or count == limit:
+                    if self.cancelled:
+                        return
+                    self.position = f.buffer.tell()
+                    with self.lock:
+                        self.rows.extend(batch)
+                    batch = []
+                    if count == limit:
+                        return
+            with self.lock:
+                self.rows.extend(batch)
+            self.position = self.file_size
@@ -0,0 +1,193 @@
+import csv
+
+try:
+    import numpy as np
+    from rapidfuzz import fuzz, process
+except ImportError:
+    # Without rapidfuzz rows are scored one by one with fuzzywuzzy
+    np = None
+    process = None
+    from fuzzywuzzy import fuzz
+
+
+ALL_COLUMNS = "All Columns"
+SEARCH_BATCH_ROWS = 100000  # Rows of a file scored per batch
+SEARCH_SLICE_ROWS = 100000  # Rows scored between two checks for cancellation
+SCORE_EPSILON = 1e-3  # Slack for float rounding when comparing score bounds
+
+
+class TextMatches:
+    """Result of search_texts, kept to refine the search for a longer query
+
+    scores holds for every text its partial_ratio with query, or for the
+    texts a refinement skipped an upper bound of it (None without
+    rapidfuzz). indices are the positions of the matching texts.
+    """
+
+    def __init__(self, query, threshold, texts, scores, lengths, indices):
+        self.query = query
+        self.threshold = threshold
+        self.texts = texts
+        self.scores = scores
+        self.lengths = lengths  # Length of every text
+        self.indices = indices
+
+    def refines_to(self, query, texts, threshold):
+        """Whether a search for query can start from these matches"""
+        return (
+            self.scores is not None
+            and self.texts is texts
+            and self.threshold == threshold
+            and 0 < len(self.query) < len(query)
+            and query.startswith(self.query)
+        )
+
+
+def row_texts(rows, column=None):
+    """Lower-cased strings searched in rows
+
+    With column None all cells of a row are joined by spaces, otherwise
+    the text is the cell of that column ("" for shorter rows).
+    """
+    if column is None:
+        return [" ".join(row).lower() for row in rows]
+    return [row[column].lower() if column < len(row) else "" for row in rows]
+
+
+def column_index(headers, search_column):
+    """Column searched for a column choice, None for all columns
+
+    Raises ValueError for a column that is not in headers.
+    """
+    return None if search_column == ALL_COLUMNS else headers.index(search_column)
+
+
+def match_indices(query, texts, threshold, workers=-1):
+    """Positions of the texts whose partial_ratio with query reaches threshold
+
+    query and texts are compared as they are, lower-case both for a case
+    insensitive search. Scores are rounded to integers like fuzzywuzzy's
+    before the comparison. With rapidfuzz all texts are scored in one
+    batch on workers threads (-1 for all cores), scores are those of
+    rapidfuzz.fuzz.partial_ratio.
+    """
+    if threshold <= 0:
+        return list(range(len(texts)))
+    if process is None:
+        return [i for i, text in enumerate(texts) if fuzz.partial_ratio(query, text) >= threshold]
+
+    # A score rounds up to threshold from threshold - 0.5 on
+    cutoff = threshold - 0.5
+    scores = process.cdist(
+        [query], texts, scorer=fuzz.partial_ratio, score_cutoff=cutoff, workers=workers
+    )[0]
+    return np.flatnonzero(scores >= cutoff).tolist()
+
+
+def search_texts(query, texts, threshold, previous=None, cancelled=None, candidates=None):
+    """Match query against texts like match_indices, returning TextMatches
+
+    Returns None if cancelled() turned true meanwhile, it is checked every
+    SEARCH_SLICE_ROWS texts.
+
+    previous, the TextMatches of the same texts and threshold for a query
+    this one extends, narrows the texts scored without losing matches. For
+    a text t longer than q' = q + k added characters, rapidfuzz's
+    partial_ratio P satisfies
+
+        P(q, t) >= P(q', t) - k * (200 - P(q', t)) / len(q)
+
+    so a text whose score for q is below this bound at the threshold
+    cannot reach the threshold for q' and is skipped. Its score becomes the
+    upper bound (len(q) * P(q, t) + 200 * k) / (len(q) + k) of P(q', t),
+    which keeps refining exact over any number of keystrokes. Texts not
+    longer than q' are always scored. The matches are exactly those of a
+    full search.
+
+    candidates, the sorted positions of the texts that can match as given
+    by SearchIndex.candidates, narrows the texts scored further. Texts not
+    longer than query are scored regardless.
+    """
+    cutoff = threshold - 0.5
+    if process is None:
+        # fuzzywuzzy: no batches and no refinement
+        indices = []
+        for start in range(0, len(texts), SEARCH_SLICE_ROWS):
+            if cancelled is not None and cancelled():
+                return None
+            stop = min(len(texts), start + SEARCH_SLICE_ROWS)
+            indices.extend(i for i in range(start, stop) if fuzz.partial_ratio(query, texts[i]) >= cutoff)
+        return TextMatches(query, threshold, texts, None, None, indices)
+
+    scored = None  # Texts to score, None for all
+    if previous is not None and previous.refines_to(query, texts, threshold):
+        n = len(previous.query)
+        k = len(query) - n
+        lengths = previous.lengths
+        bound = cutoff - k * (200 - cutoff) / n - SCORE_EPSILON
+        scored = (previous.scores >= bound) | (lengths <= len(query))
+        scores = (previous.scores * n + 200 * k) / (n + k)
+    else:
+        lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+        scores = np.full(len(texts), np.inf)
+    if candidates is not None:
+        # The others score below the cutoff, which bounds their score
+        ruled_in = lengths <= len(query)
+        ruled_in[candidates] = True
+        scores[~ruled_in] = np.minimum(scores[~ruled_in], np.nextafter(cutoff, -np.inf))
+        scored = ruled_in if scored is None else scored & ruled_in
+
+    if scored is None:
+        scores = _score_texts(query, texts, cancelled)
+        if scores is None:
+            return None
+    else:
+        positions = np.flatnonzero(scored)
+        scored_scores = _score_texts(query, [texts[i] for i in positions], cancelled)
+        if scored_scores is None:
+            return None
+        scores[positions] = scored_scores
+    indices = np.flatnonzero(scores >= cutoff).tolist()
+    return TextMatches(query, threshold, texts, scores, lengths, indices)
+
+
+def _score_texts(query, texts, cancelled):
+    """partial_ratio of query with every text, in slices on all cores"""
+    slices = []
+    for start in range(0, len(texts), SEARCH_SLICE_ROWS):
+        if cancelled is not None and cancelled():
+            return None
+        slices.append(process.cdist(
+            [query], texts[start:start + SEARCH_SLICE_ROWS], scorer=fuzz.partial_ratio, workers=-1
+        )[0])
+    return np.concatenate(slices).astype(np.float64) if slices else np.zeros(0)
+
+
+def search_rows(query, rows, threshold, column=None, workers=-1):
+    """Rows of a list whose text (see row_texts) matches query, in order"""
+    return [rows[i] for i in match_indices(query, row_texts(rows, column), threshold, workers)]
+
+
+def search_file(file_path, query, threshold, column=None, encoding=None, delimiter="\t", cancelled=None):
+    """Rows of a delimited file matching query, in order
+
+    The file is read in batches of SEARCH_BATCH_ROWS rows, so memory use
+    stays bounded; the header line and empty rows are skipped. Returns
+    None if cancelled() turned true meanwhile, it is checked per batch.
+    """
+    results = []
+    with open(file_path, "r", encoding=encoding) as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        next(reader, None)  # Skip header
+        batch = []
+        for row in reader:
+            if not row:  # Skip empty rows
+                continue
+            batch.append(row)
+            if len(batch) >= SEARCH_BATCH_ROWS:
+                if cancelled is not None and cancelled():
+                    return None
+                results.extend(search_rows(query, batch, threshold, column))
+                batch = []
+        results.extend(search_rows(query, batch, threshold, column))
+    return results
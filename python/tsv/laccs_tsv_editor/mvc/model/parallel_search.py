@@ -0,0 +1,98 @@
+import bisect
+import csv
+import io
+import locale
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from .fuzzy_search import search_rows
+
+
+SEARCH_RANGE_BYTES = 16 * 1024 * 1024  # Bytes of a file scanned per task
+CANCEL_POLL_SECONDS = 0.1  # Interval at which a waiting search checks for cancellation
+
+_pool = None  # Process pool shared by all searches, started on first use
+
+
+def search_workers():
+    """Processes scanning a file at once, one per core"""
+    return os.cpu_count() or 1
+
+
+def file_ranges(index, range_bytes=SEARCH_RANGE_BYTES):
+    """(start, end) byte offsets splitting the rows of a RowIndex
+
+    Every range starts at an indexed row and spans about range_bytes, so
+    it holds whole rows and can be parsed on its own. The ranges cover
+    the data rows up to index.end_offset, in order.
+    """
+    offsets = index.offsets
+    starts = []
+    block = 0
+    while block < len(offsets):
+        starts.append(offsets[block])
+        block = max(block + 1, bisect.bisect_right(offsets, offsets[block] + range_bytes))
+    return list(zip(starts, starts[1:] + [index.end_offset]))
+
+
+def _search_range(file_path, start, end, query, threshold, column, encoding, delimiter):
+    """Rows in file_path[start:end] matching query, run in a pool process"""
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode(encoding or locale.getpreferredencoding(False))
+    rows = [row for row in csv.reader(io.StringIO(text, newline=""), delimiter=delimiter) if row]
+    # The pool already keeps every core busy
+    return search_rows(query, rows, threshold, column, workers=1)
+
+
+def _search_pool():
+    global _pool
+    if _pool is None:
+        # Spawned, not forked: the GUI runs threads that a fork would copy mid-state
+        _pool = ProcessPoolExecutor(search_workers(), mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def search_file_ranges(file_path, index, query, threshold, column=None, encoding=None, delimiter="\t",
+                       cancelled=None):
+    """Rows of an indexed file matching query, in order, like search_file
+
+    The rows are split into byte ranges aligned to the row index (see
+    file_ranges) that a pool of processes scans in parallel; the results
+    are joined in file order. With a single core the ranges are scanned in
+    this thread. Returns None if cancelled() turned true meanwhile, it is
+    checked every CANCEL_POLL_SECONDS, ranges being scanned then run to
+    their end in the background.
+    """
+    global _pool
+    tasks = [
+        (file_path, start, end, query, threshold, column, encoding, delimiter)
+        for start, end in file_ranges(index)
+    ]
+    results = []
+    if search_workers() == 1:
+        for task in tasks:
+            if cancelled is not None and cancelled():
+                return None
+            results.extend(_search_range(*task))
+        return results
+
+    futures = []
+    try:
+        futures = [_search_pool().submit(_search_range, *task) for task in tasks]
+        for future in futures:
+            if cancelled is not None and cancelled():
+                return None
+            while not wait([future], CANCEL_POLL_SECONDS).done:
+                if cancelled is not None and cancelled():
+                    return None
+            results.extend(future.result())
+    except BrokenProcessPool:
+        _pool = None  # A pool process died, start a new pool next time
+        raise
+    finally:
+        for future in futures:
+            future.cancel()
+    return results
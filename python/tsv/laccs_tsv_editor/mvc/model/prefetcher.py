@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import deque
+
+from .row_index import read_rows
+
+
+PREFETCH_SAMPLES = 8  # Scroll positions kept to estimate the scroll speed
+PREFETCH_WINDOW = 1.0  # Seconds of scroll history used for the speed
+PREFETCH_LOOKAHEAD = 2.0  # Seconds of scrolling at the current speed loaded ahead
+PREFETCH_MAX_AHEAD = 4  # Chunks loaded ahead at most, whatever the speed
+
+
+class ScrollPredictor:
+    """Predicts which chunks a scrolling view needs next
+
+    Fed with the first visible row at each scroll update, it estimates the
+    scroll speed in rows per second and returns the chunk starts to load:
+    the current chunk, enough chunks ahead to cover PREFETCH_LOOKAHEAD
+    seconds at that speed, and one chunk behind in case the user reverses.
+    """
+
+    def __init__(self, chunk_size):
+        self.chunk_size = chunk_size
+        self.samples = deque(maxlen=PREFETCH_SAMPLES)  # (time, row)
+
+    def reset(self):
+        self.samples.clear()
+
+    def velocity(self):
+        """Scroll speed in rows per second, negative when scrolling up"""
+        if len(self.samples) < 2:
+            return 0.0
+        t1, r1 = self.samples[-1]
+        recent = [(t, r) for t, r in self.samples if t1 - t <= PREFETCH_WINDOW]
+        t0, r0 = recent[0]
+        return (r1 - r0) / (t1 - t0) if t1 > t0 else 0.0
+
+    def chunks_to_load(self, row, total_rows, max_ahead=PREFETCH_MAX_AHEAD):
+        """Record the view position and return chunk starts, most urgent first"""
+        self.samples.append((time.monotonic(), row))
+        speed = self.velocity()
+        direction = -1 if speed < 0 else 1
+        ahead = 1 + int(abs(speed) * PREFETCH_LOOKAHEAD / self.chunk_size)
+        ahead = max(1, min(ahead, max_ahead, PREFETCH_MAX_AHEAD))
+
+        current = (row // self.chunk_size) * self.chunk_size
+        starts = [current]
+        for i in range(1, ahead + 1):
+            starts.append(current + direction * i * self.chunk_size)
+        starts.append(current - direction * self.chunk_size)
+        return [start for start in starts if 0 <= start < total_rows]
+
+
+class ChunkPrefetcher(threading.Thread):
+    """Background thread loading row chunks into a ChunkCache
+
+    Tabs post the chunks they expect to need; the thread reads them with
+    the row index and puts them in the cache, so the Tk thread only ever
+    takes rows from memory. A new request of an owner replaces its pending
+    ones, the latest scroll prediction being the only one that matters.
+    The thread never touches widgets.
+    """
+
+    def __init__(self, cache):
+        super().__init__(daemon=True)
+        self.cache = cache
+        self.condition = threading.Condition()
+        self.pending = []  # Jobs, most urgent first
+        self.running = True
+
+    def request(self, owner, file_path, row_index, chunk_size, starts,
+                encoding=None, delimiter="\t", urgent=False):
+        """Queue chunks of an owner for loading, dropping its older requests
+
+        Urgent requests (rows the view is waiting for) are queued in front
+        and keep the other pending requests. Loaded chunks are only cached
+        while owner.row_index is still the row_index they were read with,
+        so a reloaded tab gets no stale rows.
+        """
+        jobs = [
+            (owner, file_path, row_index, chunk_size, start, encoding, delimiter)
+            for start in starts
+            if not self.cache.contains(owner, start)
+        ]
+        starts = set(starts)
+        with self.condition:
+            self.pending = jobs + [
+                job for job in self.pending
+                if job[0] is not owner or (urgent and job[4] not in starts)
+            ]
+            self.condition.notify()
+
+    def cancel(self, owner):
+        """Drop the pending requests of an owner, e.g. a closed tab"""
+        with self.condition:
+            self.pending = [job for job in self.pending if job[0] is not owner]
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.pending = []
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.running and not self.pending:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                owner, file_path, row_index, chunk_size, start, encoding, delimiter = self.pending.pop(0)
+
+            if self.cache.contains(owner, start):
+                continue
+            try:
+                rows = read_rows(file_path, row_index, start, chunk_size, encoding, delimiter)
+            except Exception as e:
+                print(f"Error prefetching chunk: {str(e)}")
+                continue
+            if getattr(owner, "row_index", None) is row_index:
+                self.cache.put(owner, start, rows)
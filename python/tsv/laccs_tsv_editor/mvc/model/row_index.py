@@ -0,0 +1,393 @@
+import csv
+import hashlib
+import json
+import locale
+import os
+import tempfile
+from array import array
+from itertools import accumulate
+from operator import add
+
+
+INDEX_STRIDE = 1024  # Rows between two recorded byte offsets
+INDEX_VERSION = 1
+INDEX_DIR = os.path.join(tempfile.gettempdir(), "laccs_tsv_editor_index")
+CHECK_BYTES = 4096  # Bytes hashed at the start and end of the indexed part
+SCAN_BLOCK = 8 * 1024 * 1024  # Bytes read at once by the binary indexing pass
+FIND_STEPS = 32  # Newlines stepped over with find before counting again
+QUOTE_GAP = 64 * 1024  # csv keeps parsing while the next quote is at most this far
+
+
+class IndexCancelled(Exception):
+    """Raised by the indexing functions when their cancelled() returns True"""
+
+
+class OffsetRowReader:
+    """csv.reader over a binary file that also reports byte offsets
+
+    The reader is fed one physical line at a time, so when it returns a row
+    it has consumed exactly the lines of that row (several if a quoted field
+    contains newlines). Iterating yields (byte offset of the row, row).
+    """
+
+    def __init__(self, f, offset=0, encoding=None, delimiter="\t"):
+        self.f = f
+        self.encoding = encoding or locale.getpreferredencoding(False)
+        self.position = offset  # Bytes consumed so far
+        f.seek(offset)
+        self.reader = csv.reader(self._lines(), delimiter=delimiter)
+
+    def _lines(self):
+        for line in self.f:
+            self.position += len(line)
+            yield line.decode(self.encoding)
+
+    def __iter__(self):
+        start = self.position
+        for row in self.reader:
+            yield start, row
+            start = self.position
+
+
+class RowIndex:
+    """Byte offset of every stride-th data row of a delimited text file
+
+    offsets[i] is the offset of data row i * stride, so any row is reached
+    with one seek and at most stride - 1 skipped rows. Eight bytes per
+    stride rows keeps the index small even for files with millions of rows.
+    """
+
+    def __init__(self, stride=INDEX_STRIDE, skip_empty=False):
+        self.stride = stride
+        self.skip_empty = skip_empty  # Blank lines are not counted as rows
+        self.offsets = array("Q")
+        self.rows = 0
+        self.end_offset = 0  # Offset just past the last indexed row
+
+    def add_rows(self, rows):
+        """Append (byte offset, row) pairs, as yielded by OffsetRowReader"""
+        for offset, row in rows:
+            if self.skip_empty and not row:
+                continue
+            if self.rows % self.stride == 0:
+                self.offsets.append(offset)
+            self.rows += 1
+
+    def add_row_offsets(self, starts):
+        """Append the byte offsets of consecutive rows, a list"""
+        self.add_counted_rows(len(starts), starts[self.next_indexed():][::self.stride])
+
+    def add_counted_rows(self, count, offsets):
+        """Append count rows of which only the indexed ones' offsets are given
+
+        offsets holds the offsets of rows next_indexed(), + stride, ...
+        among the count rows.
+        """
+        self.offsets.extend(offsets)
+        self.rows += count
+
+    def next_indexed(self):
+        """Rows to add before the next one whose offset is recorded"""
+        return -self.rows % self.stride
+
+    def locate(self, row):
+        """(byte offset, rows to skip from there) of a data row"""
+        block = row // self.stride
+        return self.offsets[block], row - block * self.stride
+
+
+def build_row_index(file_path, encoding=None, delimiter="\t", stride=INDEX_STRIDE, skip_empty=False,
+                    progress=None, cancelled=None):
+    """Read the headers and index all data rows of a file
+
+    Returns (headers, RowIndex); headers is None for an empty file.
+    progress(bytes indexed) is called after every block, and the pass
+    raises IndexCancelled once cancelled() returns True.
+    """
+    index = RowIndex(stride, skip_empty)
+    with open(file_path, "rb") as f:
+        reader = OffsetRowReader(f, 0, encoding, delimiter)
+        first = next(iter(reader), None)
+        if first is None:
+            return None, index
+        index_rows(f, index, reader.position, encoding, delimiter, progress, cancelled)
+    return first[1], index
+
+
+def _byte_scannable(encoding):
+    """Whether newlines, quotes and tabs are single ASCII bytes in an encoding"""
+    try:
+        return '\n"\t'.encode(encoding or locale.getpreferredencoding(False)) == b'\n"\t'
+    except LookupError:
+        return False
+
+
+def index_rows(f, index, offset, encoding=None, delimiter="\t", progress=None, cancelled=None):
+    """Index the rows of a binary file from offset to its end
+
+    The file is read in large blocks searched with bytes methods, which
+    also makes the row count of a multi-GB file a matter of seconds. Only
+    around quote characters, where a quoted field could span lines, rows
+    are parsed with csv: from the start of the line holding a quote to the
+    first row after which no quote follows within QUOTE_GAP bytes of the
+    block. Sets index.end_offset.
+    """
+    if not _byte_scannable(encoding) or delimiter == "\n":
+        reader = OffsetRowReader(f, offset, encoding, delimiter)
+        index.add_rows(_checked_rows(reader, progress, cancelled))
+        index.end_offset = reader.position
+        return
+
+    f.seek(offset)
+    base = offset  # Offset of the first line of pending
+    pending = b""  # Partial last line of the previous block
+    while True:
+        if cancelled and cancelled():
+            raise IndexCancelled()
+        if progress:
+            progress(base)
+        data = f.read(SCAN_BLOCK)
+        if not data:
+            break
+        block = pending + data
+        quote = block.find(b'"')
+        if quote >= 0:
+            # Lines before the quote are scanned, csv takes over from its line
+            start = block.rfind(b"\n", 0, quote) + 1
+            _add_block_rows(index, block, start, base)
+            base = _add_quoted_rows(f, index, block, base, start, encoding, delimiter)
+            pending = b""
+            f.seek(base)
+            continue
+
+        end = block.rfind(b"\n") + 1  # Only complete lines are indexed
+        _add_block_rows(index, block, end, base)
+        pending = block[end:]
+        base += end
+
+    # A last line without newline is a row too
+    if pending and not (index.skip_empty and pending == b"\r"):
+        index.add_row_offsets([base])
+    index.end_offset = base + len(pending)
+
+
+def _add_block_rows(index, block, end, base):
+    """Index the lines of block[:end], which holds no quote, as rows"""
+    if index.skip_empty and (b"\n\n" in block or block[:1] == b"\n" or (
+            b"\r" in block and (b"\n\r\n" in block or block[:2] == b"\r\n"))):
+        # Blank lines are not rows, every line has to be looked at
+        lines = block[:end].split(b"\n")[:-1]
+        starts = map(add, accumulate(map(len, lines), initial=0), range(base, base + len(lines)))
+        index.add_row_offsets([start for start, line in zip(starts, lines) if line and line != b"\r"])
+    else:
+        _add_line_rows(index, block, end, base)
+
+
+def _add_quoted_rows(f, index, block, base, start, encoding, delimiter):
+    """Index rows with csv from block[start:], a line holding a quote
+
+    Parsing goes on past every quote that follows within QUOTE_GAP bytes
+    and stops at the first row boundary after which none does, or past the
+    block. Returns the offset reached, always beyond the first quote.
+    """
+    reader = OffsetRowReader(f, base + start, encoding, delimiter)
+    quote = block.find(b'"', start)
+    for item in reader:
+        index.add_rows([item])
+        position = reader.position - base
+        if position >= len(block):
+            break
+        if position > quote:
+            quote = block.find(b'"', position)
+            if quote < 0 or quote - position > QUOTE_GAP:
+                break
+    return reader.position
+
+
+def _add_line_rows(index, block, end, base):
+    """Index every line of block[:end] as a row, block starting at base
+
+    Lines are counted with bytes.count; only the rows whose offsets are
+    recorded are located.
+    """
+    count = block.count(b"\n", 0, end)
+    if not count:
+        return
+    line_length = max(1, end // count)
+    offsets = []
+    row = index.next_indexed()
+    pos = newlines = 0  # Newlines in block[:pos]
+    while row < count:
+        if row:
+            pos = _nth_newline(block, pos, row - newlines, line_length) + 1
+            newlines = row
+        offsets.append(base + pos)
+        row += index.stride
+    index.add_counted_rows(count, offsets)
+
+
+def _nth_newline(block, pos, n, line_length):
+    """Offset of the n-th newline at or after pos, which must exist
+
+    Guesses where it is from the average line length, counts the newlines
+    up to there and corrects the guess with a few find calls.
+    """
+    width = max(1, n * line_length)
+    while True:
+        end = min(len(block), pos + width)
+        found = block.count(b"\n", pos, end)
+        if found < n - FIND_STEPS:
+            pos, n = end, n - found
+        elif found < n:
+            p = end - 1
+            for _ in range(n - found):
+                p = block.find(b"\n", p + 1)
+            return p
+        elif found - n < FIND_STEPS:
+            p = end
+            for _ in range(found - n + 1):
+                p = block.rfind(b"\n", pos, p)
+            return p
+        else:
+            width //= 2
+
+
+def _checked_rows(reader, progress, cancelled, every=10000):
+    """Rows of an OffsetRowReader, reporting progress every so many rows"""
+    for i, item in enumerate(reader):
+        if i % every == 0:
+            if cancelled and cancelled():
+                raise IndexCancelled()
+            if progress:
+                progress(reader.position)
+        yield item
+
+
+def read_rows(file_path, index, start_row, num_rows, encoding=None, delimiter="\t"):
+    """Read num_rows data rows starting at start_row, seeking via the index"""
+    if start_row >= index.rows or num_rows <= 0:
+        return []
+    offset, skip = index.locate(start_row)
+    result = []
+    with open(file_path, "rb") as f:
+        for _, row in OffsetRowReader(f, offset, encoding, delimiter):
+            if index.skip_empty and not row:
+                continue
+            if skip:
+                skip -= 1
+                continue
+            result.append(row)
+            if len(result) >= num_rows:
+                break
+    return result
+
+
+def index_path_for(file_path):
+    """Sidecar index file of a data file, in the shared index directory"""
+    key = hashlib.sha1(os.path.abspath(file_path).encode("utf-8")).hexdigest()
+    return os.path.join(INDEX_DIR, key + ".idx")
+
+
+def _edge_digest(f, end):
+    """Hash of the first and last CHECK_BYTES bytes before end"""
+    digest = hashlib.sha1()
+    f.seek(0)
+    digest.update(f.read(min(end, CHECK_BYTES)))
+    f.seek(max(0, end - CHECK_BYTES))
+    digest.update(f.read(end - max(0, end - CHECK_BYTES)))
+    return digest.hexdigest()
+
+
+def save_row_index(file_path, headers, index, encoding, delimiter):
+    """Write the index next to a JSON header line, keyed by size and mtime"""
+    stat = os.stat(file_path)
+    with open(file_path, "rb") as f:
+        digest = _edge_digest(f, index.end_offset)
+    meta = {
+        "version": INDEX_VERSION,
+        "path": os.path.abspath(file_path),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "encoding": encoding,
+        "delimiter": delimiter,
+        "stride": index.stride,
+        "skip_empty": index.skip_empty,
+        "rows": index.rows,
+        "end_offset": index.end_offset,
+        "digest": digest,
+        "headers": headers,
+    }
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    path = index_path_for(file_path)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(json.dumps(meta).encode("utf-8") + b"\n")
+        index.offsets.tofile(f)
+    os.replace(tmp, path)  # Readers never see a partial index
+
+
+def _read_saved_index(file_path):
+    """(meta, RowIndex) of the saved index of a file, or None"""
+    try:
+        with open(index_path_for(file_path), "rb") as f:
+            meta = json.loads(f.readline())
+            offsets = array("Q")
+            offsets.frombytes(f.read())
+    except (OSError, ValueError):
+        return None
+    if meta.get("version") != INDEX_VERSION or meta.get("path") != os.path.abspath(file_path):
+        return None
+    index = RowIndex(meta["stride"], meta["skip_empty"])
+    index.offsets = offsets
+    index.rows = meta["rows"]
+    index.end_offset = meta["end_offset"]
+    return meta, index
+
+
+def open_row_index(file_path, encoding=None, delimiter="\t", stride=INDEX_STRIDE, skip_empty=False,
+                   progress=None, cancelled=None):
+    """Like build_row_index, but reuses the sidecar index of earlier opens
+
+    An unchanged file (same size and mtime) is not read at all. A file that
+    only grew, with the indexed part unchanged, is indexed from the old end
+    offset on. Everything else is indexed from scratch and saved again.
+    """
+    stat = os.stat(file_path)
+    saved = _read_saved_index(file_path)
+    if saved is not None:
+        meta, index = saved
+        settings = (meta["encoding"], meta["delimiter"], meta["stride"], meta["skip_empty"])
+        if settings == (encoding, delimiter, stride, skip_empty):
+            if meta["size"] == stat.st_size and meta["mtime"] == stat.st_mtime:
+                return meta["headers"], index
+            if _is_append(file_path, meta, stat):
+                with open(file_path, "rb") as f:
+                    index_rows(f, index, index.end_offset, encoding, delimiter, progress, cancelled)
+                _save_quietly(file_path, meta["headers"], index, encoding, delimiter)
+                return meta["headers"], index
+
+    headers, index = build_row_index(file_path, encoding, delimiter, stride, skip_empty, progress, cancelled)
+    if headers is not None:
+        _save_quietly(file_path, headers, index, encoding, delimiter)
+    return headers, index
+
+
+def _is_append(file_path, meta, stat):
+    """Whether a file only had data appended since it was indexed"""
+    end = meta["end_offset"]
+    if stat.st_size <= meta["size"] or end == 0:
+        return False
+    with open(file_path, "rb") as f:
+        # The indexed part must end with a complete line
+        f.seek(end - 1)
+        if f.read(1) != b"\n":
+            return False
+        return _edge_digest(f, end) == meta["digest"]
+
+
+def _save_quietly(file_path, headers, index, encoding, delimiter):
+    """Save an index, a read-only cache directory only costs the speedup"""
+    try:
+        save_row_index(file_path, headers, index, encoding, delimiter)
+    except OSError as e:
+        print(f"Error saving row index: {str(e)}")
@@ -0,0 +1,205 @@
+import threading
+
+from .fuzzy_search import SCORE_EPSILON, np, process, row_texts
+
+
+GRAM_SIZE = 3  # At most 3, a gram id packs its 21 bit code points in 63 bits
+INDEX_SLICE_ROWS = 100000  # Rows indexed between two checks for cancellation
+INDEX_SUPPORTED = process is not None  # The bounds hold for rapidfuzz's partial_ratio
+
+
+def min_shared_grams(length, threshold):
+    """Fewest trigrams of a query of length characters found in a match
+
+    Counts the trigrams of the query by position, the texts it matches at
+    threshold contain at least that many of them (see SearchIndex). 0 or
+    less when the trigrams cannot tell.
+    """
+    cutoff = threshold - 0.5 - SCORE_EPSILON
+    if cutoff <= 0 or length < GRAM_SIZE:
+        return 0
+    lost = 0
+    for deleted in range(length + 1):
+        common = length - deleted
+        # 200 * common / (length + common + inserted) >= cutoff
+        inserted = min(deleted, int(200 * common / cutoff) - length - common)
+        if inserted < 0:
+            break
+        lost = max(lost, GRAM_SIZE * deleted + (GRAM_SIZE - 1) * inserted)
+    return length - GRAM_SIZE + 1 - lost
+
+
+def _gram_ids(texts):
+    """Ids of the trigrams of texts at every position and the text they are in"""
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    codes = np.frombuffer(
+        "\0".join(texts).encode("utf-32-le", "surrogatepass"), dtype=np.uint32
+    ).astype(np.int64)
+    count = len(codes) - GRAM_SIZE + 1
+    if count <= 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    grams = codes[:count]
+    for i in range(1, GRAM_SIZE):
+        grams = (grams << 21) | codes[i:count + i]
+    # Drop the grams running into the next text
+    rows = np.repeat(np.arange(len(texts)), lengths + 1)[:count]
+    starts = np.cumsum(lengths + 1) - (lengths + 1)
+    inside = np.arange(count) - starts[rows] <= lengths[rows] - GRAM_SIZE
+    return grams[inside], rows[inside]
+
+
+def _text_grams(texts):
+    """Distinct (gram id, text) pairs of texts, sorted by gram id"""
+    grams, rows = _gram_ids(texts)
+    order = np.lexsort((rows, grams))
+    grams, rows = grams[order], rows[order]
+    first = np.ones(len(grams), dtype=bool)
+    first[1:] = (grams[1:] != grams[:-1]) | (rows[1:] != rows[:-1])
+    return grams[first], rows[first]
+
+
+class SearchIndex:
+    """Trigram inverted index of the search strings of rows
+
+    candidates() narrows a fuzzy search to the rows sharing enough
+    trigrams with the query, without losing matches: a row is left out
+    only if its trigrams prove that its partial_ratio with the query stays
+    below the threshold.
+
+    For a query of m characters, a text longer than it scores the best
+    window w of the text, 200 * (m - d) / (2m - d + i) where d characters
+    of the query are deleted and i inserted to get w, i <= d. Each deleted
+    character breaks at most 3 of the m - 2 trigrams of the query, each
+    inserted one at most 2, so a text reaching the cutoff threshold - 0.5
+    contains at least min_shared_grams(m, threshold) of them. The bound
+    only narrows the search from thresholds of about 85 on: below 80 a
+    match may share no trigram with the query at all ("abXdeXghXj" scores
+    70 against "abcdefghij"), and the index returns None. Texts not longer
+    than the query are scored with windows of the query instead and are
+    not covered; search_texts always scores them.
+
+    Rows are indexed with their texts for all columns. The cell of a
+    column is part of that text, so the candidates hold for searches of a
+    single column as well.
+
+    Rows are kept as slots, an edited row gets a new slot; insert(),
+    replace() and delete() mirror the edits of the rows.
+    """
+
+    def __init__(self, keys, offsets, postings, count):
+        self.keys = keys  # Sorted gram ids of the rows indexed by build()
+        self.offsets = offsets  # postings[offsets[i]:offsets[i + 1]] have keys[i]
+        self.postings = postings
+        self.added = {}  # Gram id -> slots of the rows indexed since
+        self.slots = list(range(count))  # Slot of every row
+        self.slot_count = count
+        self._positions = None  # Row of every slot, -1 for replaced or deleted rows
+
+    @classmethod
+    def build(cls, texts, cancelled=None):
+        """Index texts, returns None if cancelled() turned true meanwhile"""
+        grams = [np.zeros(0, dtype=np.int64)]
+        rows = [np.zeros(0, dtype=np.int64)]
+        for start in range(0, len(texts), INDEX_SLICE_ROWS):
+            if cancelled is not None and cancelled():
+                return None
+            slice_grams, slice_rows = _text_grams(texts[start:start + INDEX_SLICE_ROWS])
+            grams.append(slice_grams)
+            rows.append(slice_rows + start)
+        grams = np.concatenate(grams)
+        rows = np.concatenate(rows)
+        order = np.argsort(grams)
+        grams = grams[order]
+        starts = np.flatnonzero(np.r_[True, grams[1:] != grams[:-1]]) if len(grams) else np.zeros(0, dtype=np.int64)
+        return cls(grams[starts], np.append(starts, len(grams)), rows[order].astype(np.int32), len(texts))
+
+    def insert(self, index, text):
+        """Index the text of a row inserted at index"""
+        self.slots.insert(index, self._add(text))
+        self._positions = None
+
+    def replace(self, index, text):
+        """Index the new text of the row at index"""
+        self.slots[index] = self._add(text)
+        self._positions = None
+
+    def delete(self, index):
+        """Forget the row at index"""
+        del self.slots[index]
+        self._positions = None
+
+    def _add(self, text):
+        slot = self.slot_count
+        self.slot_count += 1
+        grams, _ = _text_grams([text])
+        for gram in grams.tolist():
+            self.added.setdefault(gram, []).append(slot)
+        return slot
+
+    def positions(self):
+        """Row of every slot, -1 for the slots of replaced or deleted rows"""
+        if self._positions is None:
+            self._positions = np.full(self.slot_count, -1, dtype=np.int64)
+            self._positions[np.array(self.slots, dtype=np.int64)] = np.arange(len(self.slots))
+        return self._positions
+
+    def candidates(self, query, threshold):
+        """Sorted rows that can match query at threshold
+
+        Returns None when the trigrams cannot narrow the search. Rows whose
+        text is not longer than query are not covered, see above.
+        """
+        need = min_shared_grams(len(query), threshold)
+        if need <= 0:
+            return None
+        grams, counts = np.unique(_gram_ids([query])[0], return_counts=True)
+
+        # Weigh the slots of every gram by its occurrences in the query
+        found = [np.zeros(0, dtype=np.int64)]
+        weights = [np.zeros(0, dtype=np.int64)]
+        keys = np.searchsorted(self.keys, grams)
+        for gram, count, key in zip(grams.tolist(), counts.tolist(), keys.tolist()):
+            slots = []
+            if key < len(self.keys) and self.keys[key] == gram:
+                slots.append(self.postings[self.offsets[key]:self.offsets[key + 1]])
+            if gram in self.added:
+                slots.append(np.array(self.added[gram], dtype=np.int64))
+            for part in slots:
+                found.append(part)
+                weights.append(np.full(len(part), count, dtype=np.int64))
+        shared = np.bincount(np.concatenate(found), np.concatenate(weights), minlength=self.slot_count)
+
+        rows = self.positions()[shared >= need]
+        return np.sort(rows[rows >= 0])
+
+
+class IndexBuilder(threading.Thread):
+    """Build the SearchIndex of rows in a worker thread
+
+    The builder never touches widgets. Once done is set, error holds the
+    message of a failure, otherwise index holds the SearchIndex, or None
+    if the build was cancelled. rows must not change meanwhile, cancel
+    the builder and start another one instead.
+    """
+
+    def __init__(self, rows):
+        super().__init__(daemon=True)
+        self.rows = rows
+        self.index = None
+        self.cancelled = False
+        self.error = None
+        self.done = False
+
+    def cancel(self):
+        """Ask the builder to stop at the next slice of rows"""
+        self.cancelled = True
+
+    def run(self):
+        try:
+            texts = row_texts(self.rows)
+            if not self.cancelled:
+                self.index = SearchIndex.build(texts, cancelled=lambda: self.cancelled)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.done = True
@@ -0,0 +1,87 @@
+import threading
+
+from .fuzzy_search import row_texts, search_file, search_texts
+from .parallel_search import search_file_ranges
+
+
+class SearchWorker(threading.Thread):
+    """Run a fuzzy search in a worker thread
+
+    Searches rows in memory, or with file_path the rows of a file, scanned
+    in parallel when its row_index is given. For rows
+    in memory the lower-cased row strings are taken from cache, a dict
+    keyed by column, or built and stored there; matches then holds the
+    TextMatches to pass as previous to the search for a longer query, and
+    candidates from SearchIndex.candidates narrow the rows scored.
+
+    The worker never touches widgets. Once done is set, error holds the
+    message of a failure, otherwise results holds the matching rows in
+    order, or None if the search was cancelled.
+    """
+
+    def __init__(self, query, threshold, column=None, rows=None, cache=None, previous=None,
+                 candidates=None, file_path=None, row_index=None, encoding=None, delimiter="\t"):
+        super().__init__(daemon=True)
+        self.query = query
+        self.threshold = threshold
+        self.column = column  # None for all columns
+        self.rows = rows
+        self.cache = cache
+        self.previous = previous
+        self.candidates = candidates
+        self.file_path = file_path
+        self.row_index = row_index
+        self.encoding = encoding
+        self.delimiter = delimiter
+        self.results = None
+        self.matches = None
+        self.cancelled = False
+        self.error = None
+        self.done = False
+
+    def cancel(self):
+        """Ask the worker to stop at the next slice of rows"""
+        self.cancelled = True
+
+    def run(self):
+        try:
+            if self.row_index is not None:
+                self.results = search_file_ranges(
+                    self.file_path,
+                    self.row_index,
+                    self.query,
+                    self.threshold,
+                    self.column,
+                    self.encoding,
+                    self.delimiter,
+                    cancelled=lambda: self.cancelled,
+                )
+            elif self.file_path is not None:
+                self.results = search_file(
+                    self.file_path,
+                    self.query,
+                    self.threshold,
+                    self.column,
+                    self.encoding,
+                    self.delimiter,
+                    cancelled=lambda: self.cancelled,
+                )
+            else:
+                texts = self.cache.get(self.column)
+                if texts is None:
+                    texts = row_texts(self.rows, self.column)
+                    self.cache[self.column] = texts
+                self.matches = search_texts(
+                    self.query,
+                    texts,
+                    self.threshold,
+                    self.previous,
+                    cancelled=lambda: self.cancelled,
+                    candidates=self.candidates,
+                )
+                if self.matches is not None:
+                    self.results = [self.rows[i] for i in self.matches.indices]
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.done = True
@@ -4,6 +4,13 @@ import json
 import datetime
 import os
 
+from .file_loader import FileLoader
+from .fuzzy_search import column_index, match_indices, row_texts
+from .parallel_search import search_file_ranges
+from .row_index import open_row_index, read_rows
+from .search_index import INDEX_SUPPORTED, IndexBuilder
+from .search_worker import SearchWorker
+
 class TSVFile:
     """Model for handling TSV file operations and data manipulation"""
     
@@ -19,6 +26,13 @@ class TSVFile:
         self.loaded_chunks = {}
         self.chunk_size = 100000  # Load 100000 rows per chunk
         self.currently_visible_range = (0, 0)
+        self.row_index = None  # Byte offsets of every K-th row in lazy mode
+        self.loader = None  # FileLoader while a file is loaded in the background
+        self.search_texts = {}  # Searched column -> lower-cased row strings of data
+        self.last_search = None  # TextMatches of the last search, to refine the next one
+        self.search_index_enabled = INDEX_SUPPORTED  # Trigram index narrowing fuzzy search
+        self.search_index = None  # SearchIndex of data, None while building or disabled
+        self.index_builder = None  # IndexBuilder while data is indexed in the background
         
         # Default template data
         self.template = {
@@ -120,20 +134,20 @@ class TSVFile:
         file_size = os.path.getsize(file_path)
         self.is_large_file = file_size > self.file_size_threshold
         
-        # Read headers first
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f, delimiter='\t')
-            try:
-                self.headers = next(reader)  # Read the first row as headers
-                # Count total rows for large files
-                if self.is_large_file:
-                    self.total_rows = 1  # Count the header row
-                    for _ in reader:
-                        self.total_rows += 1
-            except StopIteration:
-                # Empty file, set default headers
-                self.headers = ['Column 1']
-                self.total_rows = 0
+        # Read headers first, for large files also index the row offsets
+        # (reusing the saved index of an unchanged or appended file)
+        self.row_index = None
+        if self.is_large_file:
+            headers, self.row_index = open_row_index(file_path, encoding='utf-8')
+            self.total_rows = self.row_index.rows
+        else:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                headers = next(csv.reader(f, delimiter='\t'), None)
+        if headers is None:
+            # Empty file, set default headers
+            headers = ['Column 1']
+            self.total_rows = 0
+        self.headers = headers
         
         # Detect file format and set appropriate template
         self.detect_format_and_set_template()
@@ -142,51 +156,86 @@ class TSVFile:
             # Normal load for smaller files
             with open(file_path, 'r', encoding='utf-8') as f:
                 reader = csv.reader(f, delimiter='\t')
-                next(reader)  # Skip headers
+                next(reader, None)  # Skip headers
                 self.data = list(reader)
                 self.total_rows = len(self.data)
         else:
             # For large files, just read the headers and leave data loading to chunks
             self.data = []
-            
-            # Display message about large file loading
-            import tkinter as tk
-            from tkinter import messagebox
-            root = tk.Tk()
-            root.withdraw()  # Hide the main window
-            messagebox.showinfo("Info", f"Loading large file: {os.path.basename(file_path)}\n" \
-                               f"Size: {file_size/1024/1024:.2f}MB, Total rows: {self.total_rows}\n" \
-                               f"Using lazy loading to improve performance.")
-            root.destroy()
+        self.search_texts = {}
+        self.rebuild_search_index()
         
         self.modified = False
     
+    def start_loading(self, file_path):
+        """Start loading a file in a worker thread
+
+        The caller polls take_loaded_rows() until loader.done is set, then
+        calls finish_loading(). Until then data holds the rows parsed so
+        far, for large files only the first screen of rows.
+        """
+        self.filename = file_path
+        self.file_size_threshold = self.lazy_load_threshold * 1024 * 1024
+        self.row_index = None
+        self.is_large_file = False
+        self.data = []
+        self.search_texts = {}
+        self.total_rows = 0
+        self.modified = False
+        self.loader = FileLoader(file_path, self.file_size_threshold, encoding='utf-8')
+        self.loader.start()
+        self.rebuild_search_index()  # Drops the index of the previous data
+        return self.loader
+    
+    def take_loaded_rows(self):
+        """Append the rows parsed since the last call to data and return them"""
+        if not self.headers and self.loader.headers is not None:
+            self.headers = self.loader.headers
+            self.detect_format_and_set_template()
+        rows = self.loader.take_rows()
+        self.data.extend(rows)
+        self.search_texts = {}
+        self.total_rows = len(self.data)
+        return rows
+    
+    def finish_loading(self):
+        """Apply the final state of a finished load, returns its error or None"""
+        loader = self.loader
+        self.loader = None
+        if not self.headers:
+            # Empty file, set default headers
+            self.headers = ['Column 1']
+        if loader.row_index is not None:
+            # Large file, data is loaded in chunks from now on
+            self.row_index = loader.row_index
+            self.is_large_file = True
+            self.total_rows = self.row_index.rows
+            self.data = []
+            self.search_texts = {}
+        self.rebuild_search_index()
+        return loader.error
+    
+    def cancel_loading(self):
+        """Stop a background load or indexing"""
+        if self.loader is not None:
+            self.loader.cancel()
+            self.loader = None
+        if self.index_builder is not None:
+            self.index_builder.cancel()
+            self.index_builder = None
+    
     def load_chunk(self, start_row, num_rows):
         """Load a specific chunk of data from the file"""
         if not self.filename:
             return []
         
+        if self.row_index is None:
+            return self.data[start_row:start_row + num_rows]
+        
         result = []
         try:
-            with open(self.filename, 'r', encoding='utf-8') as f:
-                reader = csv.reader(f, delimiter='\t')
-                # Skip headers
-                next(reader)
-                
-                # Skip to the start row
-                for _ in range(start_row):
-                    try:
-                        next(reader)
-                    except StopIteration:
-                        break
-                
-                # Read num_rows rows
-                for _ in range(num_rows):
-                    try:
-                        row = next(reader)
-                        result.append(row)
-                    except StopIteration:
-                        break
+            # Seek straight to the nearest indexed row
+            result = read_rows(self.filename, self.row_index, start_row, num_rows, encoding='utf-8')
         except Exception as e:
             print(f"Error loading data chunk: {str(e)}")
         
@@ -275,6 +324,8 @@ class TSVFile:
             row_data.append('')
         
         self.data.append(row_data)
+        self.search_texts = {}
+        self.index_row_inserted(len(self.data) - 1)
         self.modified = True
         return True
     
@@ -286,6 +337,8 @@ class TSVFile:
                 row_data.append('')
             
             self.data[row_index] = row_data
+            self.search_texts = {}
+            self.index_row_changed(row_index)
             self.modified = True
             return True
         return False
@@ -294,64 +347,114 @@ class TSVFile:
         """Delete a row from the data"""
         if 0 <= row_index < len(self.data):
             del self.data[row_index]
+            self.search_texts = {}
+            self.index_row_deleted(row_index)
             self.modified = True
             return True
         return False
     
+    def rebuild_search_index(self):
+        """Index data for search in the background, if enabled"""
+        if self.index_builder is not None:
+            self.index_builder.cancel()
+            self.index_builder = None
+        self.search_index = None
+        if self.search_index_enabled and not self.is_large_file and self.loader is None:
+            self.index_builder = IndexBuilder(self.data)
+            self.index_builder.start()
+    
+    def take_search_index(self):
+        """The search index once built, None while building or disabled"""
+        builder = self.index_builder
+        if builder is not None and builder.done:
+            self.index_builder = None
+            if builder.error is not None:
+                print(f"Error indexing rows for search: {builder.error}")
+            else:
+                self.search_index = builder.index
+        return self.search_index
+    
+    def index_row_inserted(self, row_index):
+        """Add a row inserted into data to the search index"""
+        if self.index_builder is not None and not self.index_builder.done:
+            self.rebuild_search_index()  # The builder saw other rows
+        elif self.take_search_index() is not None:
+            self.search_index.insert(row_index, row_texts([self.data[row_index]])[0])
+    
+    def index_row_changed(self, row_index):
+        """Update the search index for an edited row of data"""
+        if self.index_builder is not None and not self.index_builder.done:
+            self.rebuild_search_index()
+        elif self.take_search_index() is not None:
+            self.search_index.replace(row_index, row_texts([self.data[row_index]])[0])
+    
+    def index_row_deleted(self, row_index):
+        """Remove a row deleted from data from the search index"""
+        if self.index_builder is not None and not self.index_builder.done:
+            self.rebuild_search_index()
+        elif self.take_search_index() is not None:
+            self.search_index.delete(row_index)
+    
+    def row_search_texts(self, column):
+        """Lower-cased search strings of the rows of data, built once per column"""
+        if column not in self.search_texts:
+            self.search_texts[column] = row_texts(self.data, column)
+        return self.search_texts[column]
+    
     def search_data(self, search_term, threshold=70, search_column="All Columns"):
         """Search data with fuzzy matching"""
-        from fuzzywuzzy import fuzz
-        
-        search_data = []
         search_term_lower = search_term.lower()
+        try:
+            column = column_index(self.headers, search_column)
+        except ValueError:
+            return []
         
         if self.is_large_file:
-            # For large files, search directly from the file
+            # For large files, search directly from the file on all cores
             try:
-                with open(self.filename, "r", encoding='utf-8') as f:
-                    reader = csv.reader(f, delimiter="\t")
-                    next(reader)  # Skip header
-                    
-                    for row in reader:
-                        if not row:  # Skip empty rows
-                            continue
-                        
-                        if search_column == "All Columns":
-                            row_text = " ".join(str(cell) for cell in row).lower()
-                            score = fuzz.partial_ratio(search_term_lower, row_text)
-                        else:
-                            if search_column in self.headers:
-                                column_index = self.headers.index(search_column)
-                                if column_index < len(row):
-                                    cell_value = str(row[column_index]).lower()
-                                    score = fuzz.partial_ratio(search_term_lower, cell_value)
-                                else:
-                                    score = 0
-                            else:
-                                score = 0
-                        
-                        if score >= threshold:
-                            search_data.append(row)
+                return search_file_ranges(
+                    self.filename, self.row_index, search_term_lower, threshold, column, encoding='utf-8'
+                )
             except Exception as e:
                 print(f"Error during search in lazy load mode: {str(e)}")
-        else:
-            # For normal mode, search in memory data
-            for row in self.data:
-                if search_column == "All Columns":
-                    row_text = " ".join(str(cell) for cell in row).lower()
-                    score = fuzz.partial_ratio(search_term_lower, row_text)
-                else:
-                    if search_column in self.headers:
-                        column_index = self.headers.index(search_column)
-                        if column_index < len(row):
-                            cell_value = str(row[column_index]).lower()
-                            score = fuzz.partial_ratio(search_term_lower, cell_value)
-                        else:
-                            score = 0
-                    else:
-                        score = 0
-                
-                if score >= threshold:
-                    search_data.append(row)
+                return []
         
-        return search_data
\ No newline at end of file
+        # For normal mode, score all rows of memory data in one batch
+        indices = match_indices(search_term_lower, self.row_search_texts(column), threshold)
+        return [self.data[i] for i in indices]
+    
+    def start_search(self, search_term, threshold=70, search_column="All Columns"):
+        """Start search_data in a worker thread and return the SearchWorker
+
+        Returns None for a column that is not in headers. The caller polls
+        worker.done, then sets last_search to worker.matches if
+        worker.cache is still search_texts.
+        """
+        search_term_lower = search_term.lower()
+        try:
+            column = column_index(self.headers, search_column)
+        except ValueError:
+            return None
+        
+        if self.is_large_file:
+            worker = SearchWorker(
+                search_term_lower,
+                threshold,
+                column,
+                file_path=self.filename,
+                row_index=self.row_index,
+                encoding='utf-8',
+            )
+        else:
+            index = self.take_search_index()
+            worker = SearchWorker(
+                search_term_lower,
+                threshold,
+                column,
+                rows=self.data,
+                cache=self.search_texts,
+                previous=self.last_search,
+                candidates=index.candidates(search_term_lower, threshold) if index is not None else None,
+            )
+        worker.start()
+        return worker
@@ -2,6 +2,8 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import os
 
+from .virtual_tree import VirtualTreeview
+
 
 class BaseView:
     """Base class for all views, providing common UI functionality"""
@@ -28,8 +30,8 @@ class BaseView:
         return tk.Frame(parent, **kwargs)
 
     def create_treeview(self, parent, columns, show="headings"):
-        """Create a standard treeview widget"""
-        tree = ttk.Treeview(parent, columns=columns, show=show)
+        """Create a standard treeview widget, drawing only the visible rows"""
+        tree = VirtualTreeview(parent, columns=columns, show=show)
 
         # Configure treeview style
         style = ttk.Style()
@@ -177,20 +177,43 @@ class TableView(BaseView):
     
     def populate_table(self, tree, data, columns):
         """Populate the table with data"""
-        # Clear existing items
-        for item in tree.get_children():
-            tree.delete(item)
-        
-        # Insert new items
-        for i, row in enumerate(data):
-            # Ensure row has the same length as columns
-            while len(row) < len(columns):
-                row.append('')
-            
-            # Truncate long strings for display
-            display_row = [str(cell)[:100] + '...' if len(str(cell)) > 100 else str(cell) for cell in row]
-            
-            tree.insert('', tk.END, iid=str(i), values=display_row)
+        self.populate_lazy_table(tree, len(data), lambda start, stop: data[start:stop], columns)
+    
+    def populate_lazy_table(self, tree, row_count, load_rows, columns):
+        """Populate the table with row_count rows, load_rows(start, stop)
+        being called for the rows scrolled into view only"""
+        def get_rows(start, stop):
+            rows = load_rows(start, stop)
+            return None if rows is None else [self.display_row(row, columns) for row in rows]
+        
+        tree.set_rows(row_count, get_rows)
+    
+    def display_row(self, row, columns):
+        """Values shown for a row"""
+        # Ensure row has the same length as columns
+        row = row + [''] * (len(columns) - len(row))
+        
+        # Truncate long strings for display
+        return [str(cell)[:100] + '...' if len(str(cell)) > 100 else str(cell) for cell in row]
+    
+    def create_progress_widgets(self, parent, cancel_callback):
+        """Create a progress bar with a cancel button at the bottom of a tab"""
+        progress_frame = self.create_frame(parent)
+        progress_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=5, pady=2)
+        
+        # Status text
+        label = tk.Label(progress_frame, text="Loading...")
+        label.pack(side=tk.LEFT)
+        
+        # Progress bar in percent
+        progress_bar = ttk.Progressbar(progress_frame, mode="determinate", maximum=100)
+        progress_bar.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        
+        # Cancel button
+        cancel_button = self.create_button(progress_frame, "Cancel", cancel_callback, width=8)
+        cancel_button.pack(side=tk.RIGHT)
+        
+        return progress_frame, label, progress_bar
     
     def create_edit_window(self, title, headers, row_data=None):
         """Create a window for editing rows"""
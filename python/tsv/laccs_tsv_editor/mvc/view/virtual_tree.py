@@ -0,0 +1,382 @@
+import tkinter as tk
+from tkinter import ttk
+from collections.abc import Sequence
+
+
+BINDTAG = "VirtualTreeview"  # Bind tag of the scrolling and keyboard handlers
+RETRY_MS = 50  # Delay before rows that were not available are asked for again
+WHEEL_ROWS = 3  # Rows scrolled per mouse wheel step
+
+
+class RowIds(Sequence):
+    """Item ids "0" to str(count - 1) of a VirtualTreeview, without building them"""
+
+    def __init__(self, count):
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [str(row) for row in range(*i.indices(self.count))]
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("row index out of range")
+        return str(i)
+
+    def __iter__(self):
+        return map(str, range(self.count))
+
+    def __contains__(self, item):
+        return isinstance(item, str) and item.isdigit() and int(item) < self.count
+
+    def index(self, item, *args):
+        if item not in self:
+            raise ValueError(f"{item!r} is not a row id")
+        return int(item)
+
+
+class VirtualTreeview(ttk.Treeview):
+    """Treeview showing any number of rows with a fixed pool of items
+
+    Only as many real items as fit in the widget exist. Scrolling refills
+    them from a row source, so drawing costs the same for ten rows or ten
+    million. Rows are not inserted one by one but given as a whole with
+    set_rows(): a row count and get_rows(start, stop) returning the values
+    of those rows, or None while they are not available (the rows are then
+    asked for again every RETRY_MS ms).
+
+    Rows have the item ids "0", "1", ... and the usual item, selection,
+    focus, see, bbox, identify_row and tag_has methods accept them whether
+    the row is on screen or not. Tags set with item() are kept per row,
+    other rows get row_tags(row). The vertical scroll command receives the
+    position among all rows, and yview takes it back.
+    """
+
+    def __init__(self, master=None, **kw):
+        self.row_count = 0
+        self.get_rows = None  # get_rows(start, stop) -> values of the rows, or None
+        self.row_tags = None  # row_tags(row) -> tags of a row without tags of its own
+        self.on_scroll = None  # on_scroll(first, last) after other rows came into view
+        self.first = 0  # Row shown by the top pool item
+        self.pool = []  # Ids of the real items, top to bottom
+        self.shown = 0  # Pool items attached, the rest is detached
+        self.tags = {}  # row -> tags set with item()
+        self.selected = set()  # Selected rows
+        self.focus_row = None
+        self.yscroll = kw.pop("yscrollcommand", kw.pop("yscroll", None))
+        self.pending_refresh = None
+        self.notified_first = None
+        super().__init__(master, **kw)
+
+        if not self.bind_class(BINDTAG):
+            for sequence, handler in (
+                ("<Configure>", "_on_configure"),
+                ("<Destroy>", "_on_destroy"),
+                ("<ButtonPress-1>", "_on_click"),
+                ("<MouseWheel>", "_on_wheel"),
+                ("<Button-4>", "_on_wheel"),
+                ("<Button-5>", "_on_wheel"),
+                ("<Key-Up>", "_on_key"),
+                ("<Key-Down>", "_on_key"),
+                ("<Key-Prior>", "_on_key"),
+                ("<Key-Next>", "_on_key"),
+                ("<Key-Home>", "_on_key"),
+                ("<Key-End>", "_on_key"),
+            ):
+                self.bind_class(BINDTAG, sequence, lambda event, name=handler: getattr(event.widget, name)(event))
+        bindtags = list(self.bindtags())
+        bindtags.insert(1, BINDTAG)
+        self.bindtags(tuple(bindtags))
+
+        self._resize_pool(int(str(self.cget("height"))))
+
+    # Rows
+
+    def set_rows(self, row_count, get_rows, row_tags=None):
+        """Show new rows, like deleting all items and inserting them again
+
+        Selection, focus and row tags are reset, the scroll position is kept.
+        """
+        self.row_count = row_count
+        self.get_rows = get_rows
+        self.row_tags = row_tags
+        self.tags = {}
+        self.selected = set()
+        self.focus_row = None
+        self.scroll_to(self.first)
+
+    def set_row_count(self, row_count):
+        """Change the number of rows of the current source, e.g. while it is loading"""
+        if row_count < self.row_count:
+            self.tags = {row: tags for row, tags in self.tags.items() if row < row_count}
+            self.selected = {row for row in self.selected if row < row_count}
+            if self.focus_row is not None and self.focus_row >= row_count:
+                self.focus_row = None
+        self.row_count = row_count
+        self.scroll_to(self.first)
+
+    def scroll_to(self, row):
+        """Show row at the top, or as close to the top as the last rows allow"""
+        self.first = max(0, min(row, self.row_count - len(self.pool)))
+        self.refresh()
+
+    def refresh(self):
+        """Fill the pool items with the rows from first on"""
+        if self.pending_refresh is not None:
+            self.after_cancel(self.pending_refresh)
+            self.pending_refresh = None
+
+        shown = max(0, min(len(self.pool), self.row_count - self.first))
+        rows = self.get_rows(self.first, self.first + shown) if shown else []
+        if rows is None:
+            # Blank rows until the source has them
+            rows = []
+            self.pending_refresh = self.after(RETRY_MS, self._retry_refresh)
+
+        if shown > self.shown:
+            for k in range(self.shown, shown):
+                super().move(self.pool[k], "", k)
+        elif shown < self.shown:
+            super().detach(*self.pool[shown:self.shown])
+        self.shown = shown
+
+        for k in range(shown):
+            row = self.first + k
+            values = rows[k] if k < len(rows) else ()
+            super().item(self.pool[k], values=values, tags=self._tags_of(row))
+        self._show_selection()
+        self._update_scrollbar()
+
+        if self.on_scroll is not None and self.first != self.notified_first:
+            self.notified_first = self.first
+            self.on_scroll(self.first, self.first + shown)
+
+    def _retry_refresh(self):
+        self.pending_refresh = None
+        self.refresh()
+
+    def _resize_pool(self, size):
+        """Create or delete pool items so that size rows are shown"""
+        size = max(1, size)
+        if size == len(self.pool):
+            return
+        while len(self.pool) < size:
+            iid = f"pool{len(self.pool)}"
+            super().insert("", tk.END, iid=iid)
+            super().detach(iid)
+            self.pool.append(iid)
+        if len(self.pool) > size:
+            super().delete(*self.pool[size:])
+            del self.pool[size:]
+            self.shown = min(self.shown, size)
+        self.scroll_to(self.first)
+
+    def _row(self, item):
+        """Row of an item id, raising TclError like Treeview for unknown ids"""
+        item = str(item)
+        if item.isdigit() and int(item) < self.row_count:
+            return int(item)
+        raise tk.TclError(f"Item {item} not found")
+
+    def _pool_item(self, row):
+        """Pool item showing row, or None if it is not on screen"""
+        if self.first <= row < self.first + self.shown:
+            return self.pool[row - self.first]
+        return None
+
+    def _tags_of(self, row):
+        if row in self.tags:
+            return self.tags[row]
+        return self.row_tags(row) if self.row_tags is not None else ()
+
+    def _show_selection(self):
+        super().selection_set(
+            [self.pool[k] for k in range(self.shown) if self.first + k in self.selected]
+        )
+        if self.focus_row is not None and self._pool_item(self.focus_row) is not None:
+            super().focus(self._pool_item(self.focus_row))
+
+    def _update_scrollbar(self):
+        if self.yscroll is not None:
+            self.yscroll(*self.yview())
+
+    # Treeview methods taking row ids
+
+    def get_children(self, item=None):
+        return RowIds(self.row_count) if not item else ()
+
+    def exists(self, item):
+        return item in RowIds(self.row_count)
+
+    def index(self, item):
+        return self._row(item)
+
+    def item(self, item, option=None, **kw):
+        row = self._row(item)
+        if kw:
+            if set(kw) != {"tags"}:
+                raise tk.TclError("Only the tags of rows can be changed")
+            tags = kw["tags"]
+            self.tags[row] = (tags,) if isinstance(tags, str) else tuple(tags)
+            if self._pool_item(row) is not None:
+                super().item(self._pool_item(row), tags=self.tags[row])
+            return None
+
+        values = ""
+        if option in (None, "values") and self.get_rows is not None:
+            rows = self.get_rows(row, row + 1)
+            if rows:
+                values = tuple(rows[0])
+        data = {"text": "", "image": "", "values": values, "open": 0, "tags": self._tags_of(row)}
+        return data if option is None else data[option]
+
+    def tag_has(self, tagname, item=None):
+        """Rows having tagname, only tags set with item() are looked at"""
+        if item is not None:
+            return tagname in self._tags_of(self._row(item))
+        return tuple(str(row) for row in sorted(self.tags) if tagname in self.tags[row])
+
+    def selection(self):
+        return tuple(str(row) for row in sorted(self.selected))
+
+    def selection_set(self, *items):
+        self.selected = set(self._rows(items))
+        self._show_selection()
+
+    def selection_add(self, *items):
+        self.selected.update(self._rows(items))
+        self._show_selection()
+
+    def selection_remove(self, *items):
+        self.selected.difference_update(self._rows(items))
+        self._show_selection()
+
+    def selection_toggle(self, *items):
+        self.selected.symmetric_difference_update(self._rows(items))
+        self._show_selection()
+
+    def _rows(self, items):
+        if len(items) == 1 and isinstance(items[0], (tuple, list)):
+            items = items[0]
+        return [self._row(item) for item in items]
+
+    def focus(self, item=None):
+        if item is None:
+            return str(self.focus_row) if self.focus_row is not None else ""
+        self.focus_row = self._row(item)
+        if self._pool_item(self.focus_row) is not None:
+            super().focus(self._pool_item(self.focus_row))
+
+    def see(self, item):
+        row = self._row(item)
+        if row < self.first:
+            self.scroll_to(row)
+        elif row >= self.first + len(self.pool):
+            self.scroll_to(row - len(self.pool) + 1)
+
+    def bbox(self, item, column=None):
+        pool_item = self._pool_item(self._row(item))
+        return super().bbox(pool_item, column) if pool_item is not None else ""
+
+    def identify_row(self, y):
+        pool_item = super().identify_row(y)
+        if pool_item in self.pool[:self.shown]:
+            return str(self.first + self.pool.index(pool_item))
+        return ""
+
+    # Scrolling over all rows
+
+    def yview(self, *args):
+        if not args:
+            if not self.row_count:
+                return (0.0, 1.0)
+            return (self.first / self.row_count, min(1.0, (self.first + len(self.pool)) / self.row_count))
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * self.row_count))
+        elif args[0] == "scroll":
+            step = len(self.pool) if args[2].startswith("page") else 1
+            self.scroll_to(self.first + int(args[1]) * step)
+
+    def yview_moveto(self, fraction):
+        self.yview("moveto", fraction)
+
+    def yview_scroll(self, number, what):
+        self.yview("scroll", number, what)
+
+    def configure(self, cnf=None, **kw):
+        if isinstance(cnf, str):
+            return super().configure(cnf)
+        kw = dict(cnf or {}, **kw)
+        if "yscrollcommand" in kw or "yscroll" in kw:
+            self.yscroll = kw.pop("yscrollcommand", kw.pop("yscroll", None))
+            self._update_scrollbar()
+            if not kw:
+                return None
+        return super().configure(**kw)
+
+    config = configure
+
+    # Event handlers, bound to BINDTAG in front of the Treeview class bindings
+
+    def _on_configure(self, event):
+        style = ttk.Style(self)
+        try:
+            row_height = max(1, int(style.lookup(str(self.cget("style")) or "Treeview", "rowheight")))
+        except (TypeError, ValueError):
+            row_height = 20
+        bbox = super().bbox(self.pool[0]) if self.shown else ""
+        if bbox:
+            top = bbox[1]
+        else:
+            top = row_height if "headings" in str(self.cget("show")) else 0
+        self._resize_pool((event.height - top) // row_height)
+
+    def _on_destroy(self, event):
+        if self.pending_refresh is not None:
+            self.after_cancel(self.pending_refresh)
+            self.pending_refresh = None
+
+    def _on_click(self, event):
+        # Plain, Control and Shift clicks on rows select like Treeview does,
+        # but on all rows; headings and separators keep the class bindings
+        if self.identify_region(event.x, event.y) not in ("cell", "tree"):
+            return None
+        item = self.identify_row(event.y)
+        if not item:
+            return None
+        self.focus_set()
+        if event.state & 0x1 and self.focus_row is not None:
+            # Shift: extend from the focused row, which stays the anchor
+            start, end = sorted((self.focus_row, int(item)))
+            self.selected.update(range(start, end + 1))
+            self._show_selection()
+            return "break"
+        if event.state & 0x4:
+            self.selection_toggle(item)
+        else:
+            self.selection_set(item)
+        self.focus(item)
+        return "break"
+
+    def _on_wheel(self, event):
+        up = event.num == 4 or event.delta > 0
+        self.yview_scroll(-WHEEL_ROWS if up else WHEEL_ROWS, "units")
+        return "break"
+
+    def _on_key(self, event):
+        if event.keysym == "Home":
+            self.yview_moveto(0)
+        elif event.keysym == "End":
+            self.yview_moveto(1)
+        elif event.keysym in ("Prior", "Next"):
+            self.yview_scroll(-1 if event.keysym == "Prior" else 1, "pages")
+        elif self.row_count:
+            row = self.focus_row if self.focus_row is not None else self.first
+            row = max(0, min(self.row_count - 1, row + (-1 if event.keysym == "Up" else 1)))
+            self.selection_set(str(row))
+            self.focus(str(row))
+            self.see(str(row))
+        return "break"
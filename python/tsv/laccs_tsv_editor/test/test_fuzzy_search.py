@@ -0,0 +1,41 @@
+import random
+
+import pytest
+
+from mvc.model.fuzzy_search import match_indices, process, search_texts
+
+
+pytestmark = pytest.mark.skipif(process is None, reason="refinement needs rapidfuzz")
+
+
+def random_texts(rng, count):
+    words = ["".join(rng.choice("abcde_1") for _ in range(rng.randint(0, 12))) for _ in range(count)]
+    return [" ".join(rng.sample(words, rng.randint(1, 3))) for _ in range(count)]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_refined_search_equals_fresh_search(seed):
+    rng = random.Random(seed)
+    texts = random_texts(rng, 400)
+    threshold = rng.randint(0, 100)
+    word = "".join(rng.choice("abcde_1 ") for _ in range(rng.randint(2, 14)))
+
+    previous = None
+    end = 1
+    while end <= len(word):
+        query = word[:end]
+        refined = search_texts(query, texts, threshold, previous)
+        fresh = search_texts(query, texts, threshold)
+        expected = match_indices(query, texts, threshold)
+        assert refined.indices == fresh.indices == expected, (query, threshold)
+        previous = refined
+        end += rng.choice([1, 1, 2, 4])  # Typed or pasted characters
+
+
+def test_refinement_skips_texts_that_cannot_match():
+    texts = ["zzzzzzzzzzzzzzzz", "abcdefghijklmnop"]
+    previous = search_texts("abc", texts, 90)
+    refined = search_texts("abcd", texts, 90, previous)
+    assert refined.indices == match_indices("abcd", texts, 90) == [1]
+    # The skipped text keeps an upper bound of its score, below the cutoff
+    assert refined.scores[0] < 89.5
@@ -0,0 +1,152 @@
+import csv
+import io
+import os
+import random
+
+import pytest
+
+from mvc.model import row_index
+from mvc.model.row_index import RowIndex, build_row_index, index_rows, open_row_index
+
+
+def csv_row_starts(data, skip_empty=False):
+    """Byte offsets of the rows csv.reader parses out of data"""
+    starts = []
+    position = 0
+    lines = io.BytesIO(data)
+
+    def decoded():
+        nonlocal position
+        for line in lines:
+            position += len(line)
+            yield line.decode("utf-8")
+
+    start = 0
+    for row in csv.reader(decoded(), delimiter="\t"):
+        if row or not skip_empty:
+            starts.append(start)
+        start = position
+    return starts
+
+
+def scanned(data, stride=1, skip_empty=False):
+    index = RowIndex(stride, skip_empty)
+    index_rows(io.BytesIO(data), index, 0, "utf-8")
+    return index
+
+
+def assert_indexed(index, data, skip_empty=False):
+    starts = csv_row_starts(data, skip_empty)
+    assert index.rows == len(starts)
+    assert list(index.offsets) == starts[::index.stride]
+    assert index.end_offset == len(data)
+
+
+def random_tsv(rng, rows, newline=b"\n", quotes=True, blank=0.0):
+    lines = []
+    for _ in range(rows):
+        if rng.random() < blank:
+            lines.append(b"")
+            continue
+        fields = []
+        for _ in range(rng.randint(1, 4)):
+            text = "".join(rng.choice("ab c,x") for _ in range(rng.randint(0, 8)))
+            if quotes and rng.random() < 0.1:
+                inner = text + rng.choice(["\n", "\r\n", '""', "\t"]) + text
+                fields.append('"' + inner + '"')
+            else:
+                fields.append(text)
+        lines.append("\t".join(fields).encode("utf-8"))
+    data = newline.join(lines)
+    return data if rng.random() < 0.5 else data + newline
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    monkeypatch.setattr(row_index, "SCAN_BLOCK", 16)
+    monkeypatch.setattr(row_index, "QUOTE_GAP", 8)
+
+
+@pytest.mark.parametrize("newline", [b"\n", b"\r\n"])
+@pytest.mark.parametrize("stride", [1, 3, 1024])
+@pytest.mark.parametrize("skip_empty", [False, True])
+def test_random_files_match_csv(small_blocks, newline, stride, skip_empty):
+    rng = random.Random(f"{newline}{stride}{skip_empty}")
+    for _ in range(50):
+        data = random_tsv(rng, rng.randint(0, 40), newline, blank=0.2)
+        assert_indexed(scanned(data, stride, skip_empty), data, skip_empty)
+
+
+@pytest.mark.parametrize("block", range(1, 12))
+def test_crlf_split_across_blocks(monkeypatch, block):
+    monkeypatch.setattr(row_index, "SCAN_BLOCK", block)
+    data = b"ab\r\n\r\ncd\r\n\r\n\r\nef\r\ngh"
+    assert_indexed(scanned(data), data)
+    assert_indexed(scanned(data, skip_empty=True), data, skip_empty=True)
+
+
+def test_skip_empty_leaves_out_blank_lines():
+    data = b"\na\tb\n\n\r\nc\n\n"
+    index = scanned(data, skip_empty=True)
+    assert list(index.offsets) == [1, 8]
+    assert index.end_offset == len(data)
+
+
+def test_quoted_newlines_span_blocks(small_blocks):
+    data = b'a\tb\n"line one\nline two\n\nend"\tc\nd\te\n"x""y"\tz\n'
+    assert_indexed(scanned(data), data)
+
+
+def test_csv_parses_only_around_quotes(monkeypatch):
+    starts = []
+
+    class RecordingReader(row_index.OffsetRowReader):
+        def __init__(self, f, offset=0, encoding=None, delimiter="\t"):
+            starts.append(offset)
+            super().__init__(f, offset, encoding, delimiter)
+
+    monkeypatch.setattr(row_index, "OffsetRowReader", RecordingReader)
+    monkeypatch.setattr(row_index, "QUOTE_GAP", 16)
+    plain = b"row\tvalue\n" * 100
+    quoted = b'"two\nlines"\tvalue\n'
+    data = plain + quoted + plain + quoted + plain
+    index = scanned(data)
+    assert_indexed(index, data)
+    # csv starts at the lines of the quotes, the plain rows are scanned as bytes
+    assert starts == [len(plain), 2 * len(plain) + len(quoted)]
+
+
+def test_build_row_index_reads_headers(small_blocks, tmp_path):
+    path = tmp_path / "data.tsv"
+    path.write_bytes(b'h1\t"h\n2"\n1\t2\n"3\n"\t4\n')
+    headers, index = build_row_index(str(path), "utf-8", stride=1)
+    assert headers == ["h1", "h\n2"]
+    assert list(index.offsets) == [9, 13]
+    assert index.rows == 2
+
+
+def test_appended_file_reuses_sidecar(monkeypatch, tmp_path):
+    monkeypatch.setattr(row_index, "INDEX_DIR", str(tmp_path / "index"))
+    path = tmp_path / "data.tsv"
+    rng = random.Random(44)
+    path.write_bytes(b"a\tb\n" + random_tsv(rng, 200) + b"\n")
+    headers, first = open_row_index(str(path), "utf-8", stride=4)
+    end = first.end_offset
+
+    with open(path, "ab") as f:
+        f.write(random_tsv(rng, 200) + b"\n")
+    offsets = []
+    real_index_rows = row_index.index_rows
+
+    def recording_index_rows(f, index, offset, *args):
+        offsets.append(offset)
+        return real_index_rows(f, index, offset, *args)
+
+    monkeypatch.setattr(row_index, "index_rows", recording_index_rows)
+    reopened_headers, reopened = open_row_index(str(path), "utf-8", stride=4)
+
+    assert offsets == [end]  # Only the appended part is indexed
+    assert reopened_headers == headers == ["a", "b"]
+    _, fresh = build_row_index(str(path), "utf-8", stride=4)
+    assert list(reopened.offsets) == list(fresh.offsets)
+    assert (reopened.rows, reopened.end_offset) == (fresh.rows, os.path.getsize(path))
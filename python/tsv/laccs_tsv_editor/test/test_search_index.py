@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from mvc.model.fuzzy_search import match_indices, row_texts, search_texts
+from mvc.model.search_index import INDEX_SUPPORTED, SearchIndex, min_shared_grams
+
+
+pytestmark = pytest.mark.skipif(not INDEX_SUPPORTED, reason="the index needs rapidfuzz")
+
+
+def random_row(rng):
+    return [
+        "".join(rng.choice("abcdef_12") for _ in range(rng.randint(0, 14))),
+        rng.choice(["x", "yy", ""]),
+    ]
+
+
+def random_query(rng, rows):
+    """A mutated piece of some row, so that many rows nearly match"""
+    text = " ".join(rng.choice(rows)).lower()
+    start = rng.randint(0, len(text))
+    query = list(text[start:start + rng.randint(1, 12)] or "ab")
+    for _ in range(rng.randint(0, 2)):
+        query[rng.randrange(len(query))] = rng.choice("abcdef_12")
+    return "".join(query)
+
+
+def assert_equivalent(index, rows, query, threshold, column):
+    texts = row_texts(rows, column)
+    candidates = index.candidates(query, threshold)
+    indexed = search_texts(query, texts, threshold, candidates=candidates)
+    unindexed = search_texts(query, texts, threshold)
+    expected = match_indices(query, texts, threshold)
+    assert indexed.indices == unindexed.indices == expected, (query, threshold, column)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_indexed_search_equals_unindexed_search(seed):
+    rng = random.Random(seed)
+    rows = [random_row(rng) for _ in range(500)]
+    index = SearchIndex.build(row_texts(rows))
+    for threshold in range(0, 101, 5):
+        for column in (None, 0, 1):
+            assert_equivalent(index, rows, random_query(rng, rows), threshold, column)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_index_stays_exact_through_edits(seed):
+    rng = random.Random(seed)
+    rows = [random_row(rng) for _ in range(300)]
+    index = SearchIndex.build(row_texts(rows))
+    for _ in range(100):
+        edit = rng.choice(["insert", "replace", "delete"]) if rows else "insert"
+        if edit == "insert":
+            position = rng.randint(0, len(rows))
+            rows.insert(position, random_row(rng))
+            index.insert(position, row_texts(rows[position:position + 1])[0])
+        elif edit == "replace":
+            position = rng.randrange(len(rows))
+            rows[position] = random_row(rng)
+            index.replace(position, row_texts(rows[position:position + 1])[0])
+        else:
+            position = rng.randrange(len(rows))
+            del rows[position]
+            index.delete(position)
+        threshold = rng.choice([rng.randint(0, 100), rng.randint(80, 100)])
+        assert_equivalent(index, rows, random_query(rng, rows), threshold, rng.choice([None, 0]))
+
+
+def test_index_prunes_at_high_thresholds():
+    rows = [["pv_temp_0001"], ["pv_volt_0002"], ["unrelated"]] * 10
+    index = SearchIndex.build(row_texts(rows))
+    assert index.candidates("pv_temp_0001", 95).tolist() == list(range(0, 30, 3))
+    assert index.candidates("pv_temp_0001", 50) is None
+    assert min_shared_grams(12, 50) <= 0 < min_shared_grams(12, 95)